@@ -1,2 +1,3 @@
 def main() -> None:
-    print("Hello from wadoh-raccoon!")
+    from wadoh_raccoon.cli import main as cli_main
+    cli_main()
@@ -0,0 +1,373 @@
+"""
+Command line interface for batch matching, and for the matching service (`wadoh-raccoon serve`, see
+`wadoh_raccoon.server`).
+
+```
+wadoh-raccoon match SOURCE REFERENCE --first-name first_name --last-name last_name \
+    --dob birth_date --spec-col-date src_collection_date:ref_collection_date \
+    --key submission_number --output results/
+```
+
+Sources and references are scanned lazily (Parquet, CSV or IPC, chosen by file extension; globs
+are allowed). The four result sets are written to `OUTPUT/{exact_matched,fuzzy_matched,
+fuzzy_unmatched,no_demo}.parquet` and a JSON summary of timings and row counts is printed to stdout.
+
+To spread a large match over several machines sharing a directory, partition it once, start any number of
+workers on the machines, then merge their results:
+
+```
+wadoh-raccoon partition SOURCE REFERENCE /shared/rematch --partitions 256 --first-name first_name ...
+wadoh-raccoon worker /shared/rematch            # on each node, as many as wanted
+wadoh-raccoon merge /shared/rematch --output results/
+```
+
+Polars is only imported once the arguments are parsed, so that `--threads` can size its thread pool.
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+RESULTS = ['exact_matched', 'fuzzy_matched', 'fuzzy_unmatched', 'no_demo']
+MEMORY_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+MEMORY_LIMIT_HELP = (
+    "cap the process virtual address space, e.g. '64G' (POSIX only). This is not a cap on resident memory: "
+    "polars and its allocator reserve much more address space than they use, so allocations fail well "
+    "below the limit unless it is set generously above the expected memory use"
+)
+KEY_HASH = '__key_hash'
+
+
+def column(value: str) -> str | tuple[str, str]:
+    """A column mapping: `name` when the source and reference share a name, else `source:reference`"""
+    source, sep, reference = value.partition(':')
+    if not source or (sep and not reference):
+        raise argparse.ArgumentTypeError(f"expected 'name' or 'source_name:reference_name', got '{value}'")
+    return (source, reference) if sep else source
+
+
+def holiday(value: str) -> str | date:
+    """A bundled holiday calendar name, or a YYYY-MM-DD date"""
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return value
+
+
+def memory_size(value: str) -> int:
+    """A memory size in bytes, e.g. `8G`, `512M` or `1073741824`"""
+    number, unit = value.upper().rstrip('B'), ''
+    if number and number[-1] in MEMORY_UNITS:
+        number, unit = number[:-1], number[-1]
+    try:
+        return int(float(number) * MEMORY_UNITS[unit])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a size such as '8G' or '512M', got '{value}'")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='wadoh-raccoon',
+        description='Link pathogen sequencing/subtyping submissions to case data.'
+    )
+    commands = parser.add_subparsers(dest='command', required=True)
+    match = commands.add_parser(
+        'match',
+        help='match a source file against a reference file',
+        description='Exact and fuzzy match a source file against a reference file with DataFrameMatcher. '
+                    'Columns are given as NAME, or SOURCE_NAME:REFERENCE_NAME when they differ.'
+    )
+    match.add_argument('source', help='source (submissions) file: .parquet, .csv or .ipc/.arrow; globs allowed')
+    match.add_argument('reference', help='reference (cases) file: .parquet, .csv or .ipc/.arrow; globs allowed')
+    match.add_argument('-o', '--output', required=True, type=Path, help='directory to write results to')
+
+    add_matcher_arguments(match)
+
+    resources = match.add_argument_group('resources')
+    resources.add_argument('--threads', type=int, help='size of the polars thread pool (default: all cores)')
+    resources.add_argument('--chunk-size', type=int,
+                           help='match the source in chunks of about this many rows (rows with the same key '
+                                'stay in one chunk) to bound memory use')
+    resources.add_argument('--memory-limit', type=memory_size,
+                           help=MEMORY_LIMIT_HELP)
+    resources.add_argument('-v', '--verbose', action='store_true', help='print the matcher summary to stderr')
+
+    partition = commands.add_parser(
+        'partition',
+        help='split a match into partitions on a shared directory, for workers to match',
+        description='Clean the source and reference and write them to partitions by date of birth (and block '
+                    'values) in DIRECTORY, with the matcher settings and a manifest. Run `wadoh-raccoon worker '
+                    'DIRECTORY` on any node that mounts it, then `wadoh-raccoon merge`.'
+    )
+    partition.add_argument('source', help='source (submissions) file: .parquet, .csv or .ipc/.arrow; globs allowed')
+    partition.add_argument('reference', help='reference (cases) file: .parquet, .csv or .ipc/.arrow; globs allowed')
+    partition.add_argument('directory', type=Path, help='directory shared with the workers')
+    add_matcher_arguments(partition)
+    partition.add_argument('--partitions', type=int, default=64, help='number of partitions (default: 64)')
+    partition.add_argument('--chunk-size', type=int, default=1_000_000,
+                           help='split the files into partitions this many rows at a time (default: 1000000)')
+    partition.add_argument('--threads', type=int, help='size of the polars thread pool (default: all cores)')
+    partition.add_argument('--memory-limit', type=memory_size,
+                           help=MEMORY_LIMIT_HELP)
+
+    worker = commands.add_parser(
+        'worker',
+        help='match the partitions of a shared directory until none is left',
+        description='Claim and match partitions written by `wadoh-raccoon partition`. Workers on several '
+                    'nodes can share a directory; each partition is matched once.'
+    )
+    worker.add_argument('directory', type=Path, help='directory given to `wadoh-raccoon partition`')
+    worker.add_argument('--threads', type=int, help='size of the polars thread pool (default: all cores)')
+    worker.add_argument('--memory-limit', type=memory_size,
+                        help=MEMORY_LIMIT_HELP)
+
+    merge = commands.add_parser(
+        'merge',
+        help='put together the results of the partitions of a shared directory',
+        description='Write the four result sets of a partitioned match, once every partition is matched, '
+                    'and check them for data leaks.'
+    )
+    merge.add_argument('directory', type=Path, help='directory given to `wadoh-raccoon partition`')
+    merge.add_argument('-o', '--output', required=True, type=Path, help='directory to write results to')
+    merge.add_argument('--threads', type=int, help='size of the polars thread pool (default: all cores)')
+    merge.add_argument('--memory-limit', type=memory_size,
+                       help=MEMORY_LIMIT_HELP)
+    merge.add_argument('-v', '--verbose', action='store_true', help='print the matcher summary to stderr')
+
+    serve = commands.add_parser(
+        'serve',
+        help='serve matches against a reference kept in memory',
+        description='Load and prepare a reference once, then match records posted as JSON to '
+                    'http://HOST:PORT/match. POST {"path": ...} to /reload to swap in a new reference snapshot.'
+    )
+    serve.add_argument('reference', help='reference (cases) file: .parquet, .csv or .ipc/.arrow; globs allowed')
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8765)
+    add_matcher_arguments(serve)
+    serve.add_argument('--threads', type=int, help='size of the polars thread pool (default: all cores)')
+    serve.add_argument('--memory-limit', type=memory_size,
+                       help=MEMORY_LIMIT_HELP)
+    return parser
+
+
+def add_matcher_arguments(parser: argparse.ArgumentParser) -> None:
+    """The column and scoring options shared by the subcommands"""
+    columns = parser.add_argument_group('columns')
+    columns.add_argument('--first-name', required=True, type=column)
+    columns.add_argument('--last-name', required=True, type=column)
+    columns.add_argument('--dob', required=True, type=column)
+    columns.add_argument('--spec-col-date', required=True, type=column)
+    columns.add_argument('--block', action='append', type=column, help='additional blocking column (repeatable)')
+    columns.add_argument('--key', action='append', help='source key column (repeatable)')
+
+    scoring = parser.add_argument_group('scoring')
+    scoring.add_argument('--threshold', type=float, default=80)
+    scoring.add_argument('--day-max', type=int)
+    scoring.add_argument('--business-day-max', type=int)
+    scoring.add_argument('--holidays', action='append', type=holiday,
+                         help="holiday calendar ('us_federal', 'wa_state' or 'us_wa') or YYYY-MM-DD date skipped "
+                              "when counting business days (repeatable)")
+    scoring.add_argument('--scorer', default='ratio', help="registered name scorer (default: 'ratio')")
+    scoring.add_argument('--scoring', choices=['threshold', 'probabilistic'], default='threshold')
+    scoring.add_argument('--model', type=Path, help='saved FellegiSunterModel for probabilistic scoring')
+
+
+def matcher_options(args: argparse.Namespace) -> dict:
+    """The DataFrameMatcher parameters given by `add_matcher_arguments`"""
+    return {
+        'first_name': args.first_name,
+        'last_name': args.last_name,
+        'dob': args.dob,
+        'spec_col_date': args.spec_col_date,
+        'block': args.block,
+        'key': args.key,
+        'threshold': args.threshold,
+        'day_max': args.day_max,
+        'business_day_max': args.business_day_max,
+        'holidays': args.holidays,
+        'scorer': args.scorer,
+        'scoring': args.scoring,
+        'model': args.model,
+    }
+
+
+def set_resources(threads: int | None, memory_limit: int | None) -> None:
+    """
+    Apply the thread and memory options; must run before polars is imported
+
+    The memory limit is RLIMIT_AS, which caps virtual address space rather than resident memory. Polars
+    (through jemalloc) and its thread stacks reserve large virtual regions up front, so a limit close to
+    the memory a match really needs makes allocations fail spuriously.
+    """
+    if threads is not None:
+        if 'polars' in sys.modules:
+            print("Warning: polars is already imported, --threads is ignored", file=sys.stderr)
+        os.environ['POLARS_MAX_THREADS'] = str(threads)
+    if memory_limit is not None:
+        import resource
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard))
+
+
+def scan(path: str):
+    """Lazily scan a Parquet, CSV or IPC file by extension, exiting with a message for other files"""
+    from wadoh_raccoon.utils.helpers import scan_file
+
+    try:
+        return scan_file(path)
+    except ValueError as e:
+        raise SystemExit(f"wadoh-raccoon: {e}")
+
+
+def chunks(df_src, key: list[str] | None, chunk_size: int | None, directory: Path) -> list:
+    """
+    Split the source into chunks, keeping every row of a key in the same chunk
+
+    The source plan runs once: it is staged in `directory`, then split into one folder per chunk, reading
+    `chunk_size` rows of the staged file at a time.
+    """
+    import polars as pl
+    from wadoh_raccoon.utils import helpers
+
+    if chunk_size is None:
+        return [df_src]
+    directory.mkdir(exist_ok=True)
+    staging = directory / 'source.parquet'
+    if key is not None:
+        df_src = df_src.with_columns(pl.struct(key).hash(seed=0).alias(KEY_HASH))
+    helpers.sink_parquet(df_src, staging)
+    staged = pl.scan_parquet(staging, glob=False)
+    n_rows = staged.select(pl.len()).collect().item()
+    n_chunks = math.ceil(n_rows / chunk_size)
+    if key is None:
+        return [staged.slice(i * chunk_size, chunk_size) for i in range(n_chunks)]
+    if n_chunks <= 1:
+        return [staged.drop(KEY_HASH)]
+
+    for part_index, offset in enumerate(range(0, n_rows, chunk_size)):
+        part = staged.slice(offset, chunk_size).with_columns(pl.col(KEY_HASH) % n_chunks).collect()
+        for (i,), rows in part.partition_by(KEY_HASH, as_dict=True).items():
+            folder = directory / f'chunk-{i:05d}'
+            folder.mkdir(exist_ok=True)
+            rows.drop(KEY_HASH).write_parquet(folder / f'part-{part_index:05d}.parquet')
+    folders = [directory / f'chunk-{i:05d}' for i in range(n_chunks)]
+    return [pl.scan_parquet(sorted(folder.iterdir()), glob=False) for folder in folders if folder.exists()]
+
+
+def run_match(args: argparse.Namespace) -> dict:
+    """Run DataFrameMatcher over the source in chunks and write the results"""
+    import polars as pl
+    from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+    from wadoh_raccoon.utils import helpers
+
+    timings = {}
+    start = time.perf_counter()
+    args.output.mkdir(parents=True, exist_ok=True)
+    with contextlib.ExitStack() as stack:
+        # Keep stdout for the summary; the matcher's own messages go to stderr (or nowhere)
+        log = sys.stderr if args.verbose else stack.enter_context(open(os.devnull, 'w'))
+        stack.enter_context(contextlib.redirect_stdout(log))
+        parts_dir = stack.enter_context(tempfile.TemporaryDirectory(dir=args.output))
+
+        df_src, df_ref = scan(args.source), scan(args.reference)
+        source_chunks = chunks(df_src, args.key, args.chunk_size, Path(parts_dir) / 'source')
+        timings['scan'] = time.perf_counter() - start
+
+        timings['match'] = 0.0
+        for i, source_chunk in enumerate(source_chunks):
+            # Collect each chunk's results together so the shared parts of the plan run once
+            chunk_start = time.perf_counter()
+            matcher = DataFrameMatcher(df_src=source_chunk, df_ref=df_ref, **matcher_options(args))
+            output = matcher.match(verbose=args.verbose)
+            frames = pl.collect_all([getattr(output, name).lazy() for name in RESULTS])
+            for name, frame in zip(RESULTS, frames):
+                frame.write_parquet(Path(parts_dir) / f'{name}-{i:05d}.parquet')
+            timings['match'] += time.perf_counter() - chunk_start
+
+        # Stitch the chunks of each result set into one file
+        write_start = time.perf_counter()
+        counts = {}
+        for name in RESULTS:
+            parts = sorted(Path(parts_dir).glob(f'{name}-*.parquet'))
+            result = pl.concat([pl.scan_parquet(part) for part in parts], how='diagonal_relaxed')
+            helpers.sink_parquet(result, args.output / f'{name}.parquet')
+            counts[name] = pl.scan_parquet(args.output / f'{name}.parquet').select(pl.len()).collect().item()
+        timings['write'] = time.perf_counter() - write_start
+
+    timings['total'] = time.perf_counter() - start
+    return {
+        'source': args.source,
+        'reference': args.reference,
+        'output': {name: str(args.output / f'{name}.parquet') for name in RESULTS},
+        'counts': counts,
+        'chunks': len(source_chunks),
+        'threads': pl.thread_pool_size(),
+        'seconds': {step: round(seconds, 3) for step, seconds in timings.items()},
+    }
+
+
+def run_partition(args: argparse.Namespace) -> dict:
+    """Write the partitions of a match for `wadoh-raccoon worker`"""
+    from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+
+    start = time.perf_counter()
+    matcher = DataFrameMatcher(df_src=scan(args.source), df_ref=scan(args.reference), **matcher_options(args))
+    manifest = matcher.partition(args.directory, n_partitions=args.partitions, chunk_size=args.chunk_size)
+    return {'directory': str(args.directory), **manifest, 'seconds': round(time.perf_counter() - start, 3)}
+
+
+def run_worker(args: argparse.Namespace) -> dict:
+    """Match partitions until none is left"""
+    from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stderr):
+        partitions = DataFrameMatcher.run_worker(args.directory)
+    return {'directory': str(args.directory), 'partitions': partitions,
+            'seconds': round(time.perf_counter() - start, 3)}
+
+
+def run_merge(args: argparse.Namespace) -> dict:
+    """Write the results of every partition"""
+    import polars as pl
+    from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+    from wadoh_raccoon.utils import helpers
+
+    start = time.perf_counter()
+    args.output.mkdir(parents=True, exist_ok=True)
+    with contextlib.ExitStack() as stack:
+        log = sys.stderr if args.verbose else stack.enter_context(open(os.devnull, 'w'))
+        stack.enter_context(contextlib.redirect_stdout(log))
+        output = DataFrameMatcher.merge_partitions(args.directory, verbose=args.verbose)
+        counts = {}
+        for name in RESULTS:
+            helpers.sink_parquet(getattr(output, name), args.output / f'{name}.parquet')
+            counts[name] = pl.scan_parquet(args.output / f'{name}.parquet').select(pl.len()).collect().item()
+    return {
+        'directory': str(args.directory),
+        'output': {name: str(args.output / f'{name}.parquet') for name in RESULTS},
+        'counts': counts,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Entry point of the `wadoh-raccoon` script"""
+    args = build_parser().parse_args(argv)
+    set_resources(args.threads, args.memory_limit)
+    if args.command == 'match':
+        summary = run_match(args)
+        print(json.dumps(summary, indent=2))
+    elif args.command in ('partition', 'worker', 'merge'):
+        run = {'partition': run_partition, 'worker': run_worker, 'merge': run_merge}[args.command]
+        print(json.dumps(run(args), indent=2))
+    elif args.command == 'serve':
+        from wadoh_raccoon.server import MatchService, serve
+        service = MatchService(scan(args.reference), **matcher_options(args))
+        serve(service, args.host, args.port)
@@ -1,8 +1,41 @@
+import contextlib
+import copy
+import json
+import os
+import re
+import shutil
+import tempfile
+import uuid
 import polars as pl
-from thefuzz import fuzz
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from pathlib import Path
 from pydantic import BaseModel
+from typing import TYPE_CHECKING, Any
+from wadoh_raccoon.holidays import holiday_dates
 from wadoh_raccoon.utils import helpers
 
+# Arrow and DuckDB inputs are converted by helpers.to_polars; neither package is needed otherwise.
+# The scorers, the probabilistic model and the duckdb backend are imported by the methods that use them.
+if TYPE_CHECKING:
+    import duckdb
+    import pyarrow as pa
+    from wadoh_raccoon import duckdb_backend, scorers
+    from wadoh_raccoon.probabilistic import FellegiSunterModel
+
+
+RESULT_SETS = ['exact_matched', 'fuzzy_matched', 'fuzzy_unmatched', 'no_demo']
+
+# Partition columns of the results written by DataFrameMatcherResults.sink, and their value for nulls
+HIVE_SCHEMA = {'match_category': pl.String, 'collection_month': pl.String}
+HIVE_NULL = '__HIVE_DEFAULT_PARTITION__'
+# Rows of a staged result set split into partitions at a time by DataFrameMatcherResults.sink
+SINK_CHUNK_SIZE = 1_000_000
+
+# Name of the temporary bucket column of DataFrameMatcher.partition, and of the file listing the partitions
+BUCKET = '___bucket___'
+MANIFEST = 'manifest.json'
+
 
 class DataFrameMatcherResults(BaseModel):
     exact_matched: pl.DataFrame | pl.LazyFrame
@@ -15,6 +48,172 @@ class DataFrameMatcherResults(BaseModel):
         'arbitrary_types_allowed': True
     }
 
+    def sink(
+        self,
+        path: str | Path,
+        date_col: str = 'submitted_collection_date',
+        overwrite: bool = False
+    ) -> dict[str, int]:
+        """
+        Write the results to Hive-partitioned Parquet, by match category and collection month.
+
+        Each run adds files to the partitions it has rows for, laid out as
+        `path/match_category=fuzzy_matched/collection_month=2024-11/part-<run>-<chunk>.parquet`.
+        LazyFrames are streamed to a staging file without collecting them in memory, as far as the polars
+        streaming engine supports their plan (otherwise one result set at a time is collected), then split
+        into months a million rows at a time.
+
+        The first run fixes the columns and types of each match category; later runs are cast to them,
+        so a column that is all null in one run keeps its type. A column that was all null in every
+        previous run (and so stored as a string) takes the type of the first run with values in it, and
+        the files of the previous runs are rewritten with that type.
+
+        Parameters
+        ----------
+        path: str | Path
+            The root directory of the dataset.
+        date_col: str
+            The date column that gives the collection month. Records without one go to the
+            `__HIVE_DEFAULT_PARTITION__` partition.
+        overwrite: bool
+            Remove the previous runs of each match category before writing, instead of adding to them.
+
+        Returns
+        -------
+        dict[str, int]
+            the number of rows written for each match category
+
+        Examples
+        --------
+        ```python
+        output = instance.match()
+        output.sink('results/')
+
+        # later, or in another process
+        fuzzy_matched = DataFrameMatcherResults.load('results/').fuzzy_matched
+        fuzzy_matched.filter(pl.col('collection_month') == '2024-11').collect()
+        ```
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        run = f"{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        month = '___collection_month___'  # Name for temp partition col
+        label = pl.col(date_col).dt.strftime('%Y-%m').fill_null(HIVE_NULL).alias(month)
+        counts = {}
+        with tempfile.TemporaryDirectory(dir=path, prefix='.sink-') as staging_dir:
+            for name in RESULT_SETS:
+                directory = path / f'match_category={name}'
+                if overwrite and directory.exists():
+                    shutil.rmtree(directory)
+                result = _conform_schema(getattr(self, name).lazy(), directory)
+
+                # Run the plan once into a staging file, then split it into months a chunk at a time
+                if isinstance(getattr(self, name), pl.LazyFrame):
+                    staging = Path(staging_dir) / f'{name}.parquet'
+                    helpers.sink_parquet(result, staging)
+                    staged = pl.scan_parquet(staging)
+                    n_rows = staged.select(pl.len()).collect().item()
+                    chunks = (staged.slice(offset, SINK_CHUNK_SIZE).collect()
+                              for offset in range(0, n_rows, SINK_CHUNK_SIZE))
+                else:
+                    chunks = [result.collect()]
+
+                counts[name] = 0
+                for chunk_index, chunk in enumerate(chunks):
+                    counts[name] += chunk.height
+                    parts = chunk.with_columns(label).partition_by(month, as_dict=True, include_key=False)
+                    for (partition,), part in parts.items():
+                        folder = directory / f'collection_month={partition}'
+                        folder.mkdir(parents=True, exist_ok=True)
+                        part.write_parquet(folder / f'part-{run}-{chunk_index:05d}.parquet')
+        return counts
+
+    @classmethod
+    def load(cls, path: str | Path) -> 'DataFrameMatcherResults':
+        """
+        Scan results written by `sink` back as LazyFrames.
+
+        Each LazyFrame has `match_category` and `collection_month` ('YYYY-MM') columns from the partitions;
+        filters on them skip the other partitions' files, and filters on other columns are pushed down to the Parquet reader.
+        A match category that was never written is an empty LazyFrame.
+
+        Parameters
+        ----------
+        path: str | Path
+            The root directory given to `sink`.
+
+        Returns
+        -------
+        DataFrameMatcherResults
+            the result sets across every run written to `path`
+        """
+        results = {}
+        for name in RESULT_SETS:
+            directory = Path(path) / f'match_category={name}'
+            if _partition_schema(directory) is None:
+                results[name] = pl.LazyFrame(schema=HIVE_SCHEMA)
+            else:
+                results[name] = pl.scan_parquet(
+                    directory / '*' / '*.parquet', hive_partitioning=True, hive_schema=HIVE_SCHEMA
+                )
+        return cls(**results)
+
+
+class MatchLookup(BaseModel):
+    """
+    The result of `DataFrameMatcher.lookup` for a single record.
+
+    Parameters
+    ----------
+    match_category: str
+        The result set the record belongs to: 'exact_matched', 'fuzzy_matched', 'fuzzy_unmatched' or 'no_demo'.
+    record: dict
+        The record's row in that result set: the looked up and cleaned values, the reference columns and,
+        for fuzzy results, the scores.
+    candidates: int
+        The number of reference records sharing the record's date of birth (and block values).
+    """
+    match_category: str
+    record: dict
+    candidates: int = 0
+
+
+class MatchReference(BaseModel):
+    """
+    A named reference dataframe with its own column mapping.
+
+    Used when passing several references to `DataFrameMatcher` via a dict. Any column
+    left as None falls back to the reference column name given to `DataFrameMatcher`
+    (the second element of a tuple, or the shared name).
+
+    Parameters
+    ----------
+    df: pl.DataFrame | pl.LazyFrame | pa.Table | pa.RecordBatchReader | duckdb.DuckDBPyRelation
+        Reference dataframe containing patient demographics (see `DataFrameMatcher` for the Arrow and DuckDB
+        inputs).
+    first_name: str (optional)
+        The first name column name in this reference.
+    last_name: str (optional)
+        The last name column name in this reference.
+    dob: str (optional)
+        The birthdate column name in this reference.
+    spec_col_date: str (optional)
+        The specimen collection date column name in this reference.
+    block: str | list[str] (optional)
+        The reference block column(s), in the same order as the source block columns.
+    """
+    df: Any
+    first_name: str | None = None
+    last_name: str | None = None
+    dob: str | None = None
+    spec_col_date: str | None = None
+    block: str | list[str] | None = None
+
+    # Required when using polars dataframes
+    model_config = {
+        'arbitrary_types_allowed': True
+    }
+
 
 class DataFrameMatcher:
     """
@@ -26,10 +225,18 @@ class DataFrameMatcher:
 
     Parameters
     -----------
-    df_src: pl.DataFrame | pl.LazyFrame
+    df_src: pl.DataFrame | pl.LazyFrame | pa.Table | pa.RecordBatchReader | duckdb.DuckDBPyRelation
         Source dataframe containing any Key(s) and patient demographics.
-    df_ref: pl.DataFrame | pl.LazyFrame
-        Reference queried dataframe containing patient demographics. 
+    df_ref: pl.DataFrame | pl.LazyFrame | pa.Table | pa.RecordBatchReader | duckdb.DuckDBPyRelation | dict
+        Reference queried dataframe containing patient demographics. To match the source against
+        several references in one pass, pass a dict of reference name to dataframe (or `MatchReference`
+        when a reference uses different column names). The source is cleaned and split only once,
+        and `match()` returns results per reference or combined across references.
+
+        Both also accept Arrow and DuckDB data, converted by `helpers.to_polars`: pyarrow Tables share
+        their buffers with a polars DataFrame, DuckDB relations become LazyFrames streaming record batches,
+        and record batch readers (or other Arrow C streams) are written batch by batch to a temporary
+        Arrow IPC file that is scanned lazily.
     first_name: str | tuple[str, str]
         The first name demographic column name in the source and reference dataframes.
         If the names are different, they should be provided in a tuple containing the
@@ -56,14 +263,48 @@ class DataFrameMatcher:
         a distinct record to be matched.
     threshold: int | float (optional)
         The inclusive fuzzy scoring threshold used to filter fuzzy matches. Matches with a score 
-        at or above the threshold will be returned in the fuzzy matched object. Defaults to 80.
+        at or above the threshold will be returned in the fuzzy matched object. With probabilistic
+        scoring, this is the match probability as a percentage (0-100). Defaults to 80.
     day_max: int (optional)
         The max number of days between reference and source specimen collection dates a fuzzy matched record
         can have and be returned as a match
     business_day_max: int (optional)
         The max number of business days between reference and source specimen collection dates a fuzzy matched
-        record can have and be returned as a match. Business days are counted as weekdays (holidays are
-        not accounted for).
+        record can have and be returned as a match. Business days are counted as weekdays that are not
+        in `holidays`.
+
+        With `day_max` and/or `business_day_max`, reference records collected outside the window are dropped
+        when candidates are generated, before any names are scored. A record whose only candidates fall outside
+        the window is returned in `fuzzy_unmatched` with empty reference columns and zero scores, the same as a
+        record without any candidate.
+    scorer: str | BatchScorer | dict[str, str | BatchScorer] (optional)
+        The batch scorer used to compare names. Can be the name of a registered scorer ('ratio',
+        'jaro_winkler', 'token_sort_ratio', 'damerau_levenshtein', or any scorer added with
+        `scorers.register_scorer`) or a batch scorer function. To use a different scorer per comparison,
+        pass a dict keyed by 'first_name', 'last_name', 'reverse_first_name' and/or 'reverse_last_name';
+        comparisons left out use 'ratio'. Defaults to 'ratio'.
+    scoring: str (optional)
+        How fuzzy matches are scored. 'threshold' compares the average of the first and last name scores
+        against `threshold`. 'probabilistic' weighs each field by how informative it is with a Fellegi-Sunter
+        model (see `probabilistic.FellegiSunterModel`) and compares the match probability against `threshold`.
+        Defaults to 'threshold'.
+    model: FellegiSunterModel | str | Path (optional)
+        The Fellegi-Sunter model used for probabilistic scoring, or the path to a saved model. A fitted model
+        only scores; an unfitted model is fitted with expectation-maximization on the candidate pairs the
+        first time it is needed (once per reference when matching several references). Defaults to a new
+        unfitted `FellegiSunterModel`.
+    holidays: str | date | list[str | date] (optional)
+        The holidays skipped when counting business days between collection dates: bundled calendar names
+        ('us_federal', 'wa_state' or 'us_wa', see `holidays.list_calendars`) and/or extra dates, e.g.
+        `['us_wa', date(2024, 12, 24)]`. Defaults to None, counting every weekday.
+    backend: str | DuckDBBackend (optional)
+        Where the joins run: 'polars' (the default) or 'duckdb', which runs the exact join and the
+        candidate join in an embedded DuckDB database that spills to disk, for sources and references whose
+        candidate pairs do not fit in memory. Pass a `duckdb_backend.DuckDBBackend` to set its memory limit,
+        threads or directory. The results are the same; the duckdb backend returns them collected (as
+        LazyFrames over the collected results for a lazy source), needs a single reference, and for
+        probabilistic scoring a fitted model without term frequencies, since it scores the candidates in
+        batches. Requires the `duckdb` extra.
 
     Returns
     -------
@@ -155,10 +396,19 @@ class DataFrameMatcher:
 
     """
 
+    # Name comparisons scored during fuzzy matching: (source name, reference name, output column)
+    # WDRS is known to switch first and last names, so the reverse comparisons are scored too
+    COMPARISONS = {
+        'first_name': ('first_name', 'first_name', 'first_name_result'),
+        'last_name': ('last_name', 'last_name', 'last_name_result'),
+        'reverse_first_name': ('first_name', 'last_name', 'reverse_first_name_result'),
+        'reverse_last_name': ('last_name', 'first_name', 'reverse_last_name_result'),
+    }
+
     def __init__(
         self, 
-        df_src: pl.DataFrame | pl.LazyFrame, 
-        df_ref: pl.DataFrame | pl.LazyFrame,
+        df_src: 'pl.DataFrame | pl.LazyFrame | pa.Table | pa.RecordBatchReader | duckdb.DuckDBPyRelation',
+        df_ref: 'pl.DataFrame | pl.LazyFrame | pa.Table | pa.RecordBatchReader | duckdb.DuckDBPyRelation | dict',
         first_name: str | tuple[str, str],
         last_name: str | tuple[str, str],
         dob: str | tuple[str, str],
@@ -168,11 +418,17 @@ class DataFrameMatcher:
         threshold: int | float = 80,
         day_max: int | None = None,
         business_day_max: int | None = None,
+        scorer: 'str | scorers.BatchScorer | dict[str, str | scorers.BatchScorer]' = 'ratio',
+        scoring: str = 'threshold',
+        model: 'FellegiSunterModel | str | Path | None' = None,
+        holidays: str | date | list[str | date] | None = None,
+        backend: 'str | duckdb_backend.DuckDBBackend' = 'polars',
     ):
+        from wadoh_raccoon import scorers
 
         # Source and reference data
-        self.df_src = df_src
-        self.df_ref = df_ref
+        self.df_src = helpers.to_polars(df_src)
+        self.df_ref = df_ref if isinstance(df_ref, dict) else helpers.to_polars(df_ref)
 
         # Column names
         if isinstance(first_name, str):
@@ -194,6 +450,13 @@ class DataFrameMatcher:
         # blocking
         self.block_left, self.block_right = self.__normalize_blocks(block)
 
+        # named references (only when matching against several references at once)
+        self.references = None
+        if isinstance(df_ref, dict):
+            self.references = {
+                name: self.__normalize_reference(ref) for name, ref in df_ref.items()
+            }
+
         # submission key
         if key is None:
             self.key_isnone = True
@@ -212,6 +475,91 @@ class DataFrameMatcher:
         self.day_max = day_max
         self.business_day_max = business_day_max
 
+        # holidays skipped when counting business days
+        self.holidays = holiday_dates(holidays)
+
+        # name scorers per comparison
+        if not isinstance(scorer, dict):
+            scorer = {comparison: scorer for comparison in self.COMPARISONS}
+        unknown = set(scorer) - set(self.COMPARISONS)
+        if unknown:
+            raise ValueError(f"Unknown scorer comparisons: {sorted(unknown)}. Use: {list(self.COMPARISONS)}")
+        self.scorers = {comparison: scorer.get(comparison, 'ratio') for comparison in self.COMPARISONS}
+        for comparison_scorer in self.scorers.values():
+            scorers.get_scorer(comparison_scorer)  # fail early on unknown scorer names
+
+        # probabilistic scoring
+        if scoring not in ('threshold', 'probabilistic'):
+            raise ValueError(f"scoring must be one of: 'threshold', 'probabilistic'. Got: '{scoring}'")
+        self.scoring = scoring
+        self.model = model
+        if scoring == 'probabilistic' or model is not None:
+            from wadoh_raccoon.probabilistic import FellegiSunterModel
+            if isinstance(model, (str, Path)):
+                model = FellegiSunterModel.load(model)
+            self.model = model if model is not None else FellegiSunterModel()
+        # models fitted per reference when an unfitted model is used with several references
+        self.reference_models = {}
+
+        # cleaned references kept in memory by prepare(), by reference name (None for a single reference)
+        self.prepared_refs = {}
+
+        # in-memory indexes used by lookup(), by reference name
+        self.lookup_indexes = {}
+
+        # execution backend: None runs everything in polars
+        if isinstance(backend, str):
+            if backend not in ('polars', 'duckdb'):
+                raise ValueError(f"backend must be one of: 'polars', 'duckdb'. Got: '{backend}'")
+            if backend == 'duckdb':
+                from wadoh_raccoon import duckdb_backend
+                backend = duckdb_backend.DuckDBBackend()
+            else:
+                backend = None
+        self.backend = backend
+
+    def prepare(self) -> 'DataFrameMatcher':
+        """
+        Clean the reference(s) once and keep them in memory.
+
+        Later matches (including on matchers from `with_source`) reuse the cleaned reference
+        instead of cleaning it again. Use this when many sources are matched against the same
+        reference, e.g. in a long-running matching service.
+
+        Returns
+        -------
+        DataFrameMatcher
+            The matcher itself.
+        """
+        for reference in (self.references or [None]):
+            self.prepared_refs.pop(reference, None)
+            ref_prep = self.clean_ref(reference)
+            if isinstance(ref_prep, pl.LazyFrame):
+                ref_prep = ref_prep.collect()
+            self.prepared_refs[reference] = ref_prep.rechunk()
+        return self
+
+    def with_source(
+        self, df_src: 'pl.DataFrame | pl.LazyFrame | pa.Table | duckdb.DuckDBPyRelation'
+    ) -> 'DataFrameMatcher':
+        """
+        A copy of the matcher for a new source, sharing its settings and prepared references.
+
+        Parameters
+        ----------
+        df_src: pl.DataFrame | pl.LazyFrame | pa.Table | duckdb.DuckDBPyRelation
+            The new source dataframe, with the same columns as the original source.
+
+        Returns
+        -------
+        DataFrameMatcher
+            A matcher for `df_src`.
+        """
+        matcher = copy.copy(self)
+        df_src = helpers.to_polars(df_src)
+        matcher.df_src = df_src.with_row_index(name=self.key[0]) if self.key_isnone else df_src
+        return matcher
+
     @staticmethod
     def __normalize_blocks(b):
         if b is None:
@@ -229,6 +577,26 @@ class DataFrameMatcher:
                 right.append(col[1])
         return left, right
 
+    def __normalize_reference(self, ref):
+        if not isinstance(ref, MatchReference):
+            ref = MatchReference(df=ref)
+        if ref.block is None:
+            block_right = self.block_right
+        else:
+            block_right = [ref.block] if isinstance(ref.block, str) else list(ref.block)
+        if len(block_right) != len(self.block_left):
+            raise ValueError(
+                f"Reference block columns {block_right} do not line up with source block columns {self.block_left}"
+            )
+        return {
+            'df': helpers.to_polars(ref.df),
+            'first_name': ref.first_name or self.first_name_ref,
+            'last_name': ref.last_name or self.last_name_ref,
+            'dob': ref.dob or self.dob_ref,
+            'spec_col_date': ref.spec_col_date or self.spec_col_date_ref,
+            'block': block_right
+        }
+
     @staticmethod
     def __prep_df(df, first_name, last_name, spec_col_date, dob, output_spec_col_name, output_dob_name):
 
@@ -246,15 +614,35 @@ class DataFrameMatcher:
 
         return clean_df
 
-    def clean_all(self) -> (pl.DataFrame | pl.LazyFrame, pl.DataFrame | pl.LazyFrame):
+    def clean_ref(self, reference: str | None = None) -> pl.DataFrame | pl.LazyFrame:
+        """Clean a reference dataframe. `reference` names one of several references, if given."""
+
+        if reference in self.prepared_refs:
+            ref_prep = self.prepared_refs[reference]
+            return ref_prep.lazy() if isinstance(self.df_src, pl.LazyFrame) else ref_prep
+
+        if reference is None:
+            if self.references is not None:
+                raise ValueError(
+                    f"The matcher has several references; clean one with clean_ref(name), name being one of "
+                    f"{list(self.references)}"
+                )
+            df = self.df_ref
+            first_name, last_name = self.first_name_ref, self.last_name_ref
+            spec_col_date, dob = self.spec_col_date_ref, self.dob_ref
+        else:
+            ref = self.references[reference]
+            df = ref['df']
+            first_name, last_name = ref['first_name'], ref['last_name']
+            spec_col_date, dob = ref['spec_col_date'], ref['dob']
 
         ref_prep = (
             self.__prep_df(
-                df=self.df_ref,
-                first_name=self.first_name_ref,
-                last_name=self.last_name_ref,
-                spec_col_date=self.spec_col_date_ref,
-                dob=self.dob_ref,
+                df=df,
+                first_name=first_name,
+                last_name=last_name,
+                spec_col_date=spec_col_date,
+                dob=dob,
                 output_spec_col_name='reference_collection_date',
                 output_dob_name='reference_dob'
             )
@@ -264,8 +652,15 @@ class DataFrameMatcher:
                 (pl.col('last_name_clean').is_not_null())
             )
         )
+        # The source decides whether matching is lazy, e.g. for an Arrow table source and a DuckDB reference
+        if isinstance(self.df_src, pl.LazyFrame):
+            return ref_prep.lazy()
+        return ref_prep.collect() if isinstance(ref_prep, pl.LazyFrame) else ref_prep
 
-        submissions_to_fuzzy_prep = (
+    def clean_src(self) -> pl.DataFrame | pl.LazyFrame:
+        """Clean the source dataframe."""
+
+        return (
             self.__prep_df(
                 df=self.df_src,
                 first_name=self.first_name_src,
@@ -277,6 +672,15 @@ class DataFrameMatcher:
             )
         )
 
+    def clean_all(self) -> (pl.DataFrame | pl.LazyFrame | dict, pl.DataFrame | pl.LazyFrame):
+        """Clean the reference and the source. With several references, they are returned in a dict by name."""
+
+        if self.references is not None:
+            ref_prep = {name: self.clean_ref(name) for name in self.references}
+        else:
+            ref_prep = self.clean_ref()
+        submissions_to_fuzzy_prep = self.clean_src()
+
         return ref_prep, submissions_to_fuzzy_prep
 
     def filter_demo(self, submissions_to_fuzzy_prep) -> (pl.DataFrame | pl.LazyFrame, pl.DataFrame | pl.LazyFrame):
@@ -305,15 +709,36 @@ class DataFrameMatcher:
 
         return fuzzy_with_demo, fuzzy_without_demo
 
-    def find_exact_match(self, ref_prep, fuzzy_with_demo) -> (pl.DataFrame | pl.LazyFrame, pl.DataFrame | pl.LazyFrame):
+    def find_exact_match(
+        self,
+        ref_prep,
+        fuzzy_with_demo,
+        reference: str | None = None
+    ) -> (pl.DataFrame | pl.LazyFrame, pl.DataFrame | pl.LazyFrame):
+
+        exact_match, dob_match = self.__find_exact_match(ref_prep, fuzzy_with_demo, reference)
+
+        # Drop key if created during matching
+        if self.key_isnone:
+            exact_match = exact_match.drop(self.key)
+
+        return exact_match, dob_match
+
+    def __find_exact_match(self, ref_prep, fuzzy_with_demo, reference=None):
+
+        # Each named reference can block on its own column names
+        block_right = self.block_right if reference is None else self.references[reference]['block']
 
         indicator = '___indicator___'  # Name for temp indicator col to determine join outcome
+        # Temp row numbers of both sides, which break ties in collection date like the duckdb backend
+        left_row, right_row = '___left_row___', '___right_row___'
 
         potential_matches = (
             fuzzy_with_demo
-            .join(ref_prep.with_columns(pl.lit(True).alias(indicator)),  # Add indicator column to determine join
+            .with_row_index(left_row)
+            .join(ref_prep.with_columns(pl.lit(True).alias(indicator)).with_row_index(right_row),
                 left_on=['first_name_clean','last_name_clean','submitted_dob'] + self.block_left,
-                right_on=['first_name_clean','last_name_clean','reference_dob'] + self.block_right,
+                right_on=['first_name_clean','last_name_clean','reference_dob'] + block_right,
                 how="left",
                 suffix="_em"
             )
@@ -321,8 +746,9 @@ class DataFrameMatcher:
                 date_subtract = (pl.col('submitted_collection_date') - pl.col('reference_collection_date')).abs()
             )
             # for ones with multiple matches, pull the closest match based on collection date
-            .sort(by=self.key+['date_subtract'], nulls_last=True)
+            .sort(by=self.key+['date_subtract', left_row, right_row], nulls_last=True)
             .unique(subset=self.key, keep='first')
+            .drop(left_row, right_row)
         )
 
         exact_match = (
@@ -331,10 +757,6 @@ class DataFrameMatcher:
             .drop(indicator)  # Drop the temp indicator col
         )
 
-        # Drop key if created during matching
-        if self.key_isnone:
-            exact_match = exact_match.drop(self.key)
-
         needs_fuzzy_match = (
             potential_matches
             .filter(pl.col(indicator).is_null())  # Keep only fields with ref_prep not joined
@@ -347,62 +769,128 @@ class DataFrameMatcher:
         # find all the records in the reference df that match based on dob
         # this will give us a smaller pool to actually fuzzy match the names against,
         # as opposed to fuzzy matching one name vs thousands
-        dob_match = (
+        if self.day_max or self.business_day_max:
+            dob_match = self.__window_join(needs_fuzzy_match, ref_prep, block_right)
+        else:
+            dob_match = (
+                needs_fuzzy_match
+                .join(
+                    ref_prep,
+                    left_on=['submitted_dob'] + self.block_left,
+                    right_on=['reference_dob'] + block_right,
+                    how='left'
+                )
+            )
+
+        return exact_match, dob_match
+
+    def __window_join(self, needs_fuzzy_match, ref_prep, block_right):
+        # With a day limit, the dob join only pairs records with reference records collected within the
+        # window, so candidates outside it are never scored. Records left without any candidate keep a
+        # single row with empty reference columns, the same as records without any reference record
+        # sharing their date of birth. Rows are put in the order of the left join without a window.
+        src_row, ref_row = '___left_row___', '___right_row___'  # Names for temp cols keeping the join order
+        left_on, right_on = ['submitted_dob'] + self.block_left, ['reference_dob'] + block_right
+        join_keys = [f'___join_key_{i}___' for i in range(len(right_on))]  # right keys, renamed to not clash
+        window_start, window_end = self.__collection_window()
+
+        source_columns = needs_fuzzy_match.collect_schema().names()
+        reference_columns = [
+            f'{col}_right' if col in source_columns else col
+            for col in ref_prep.collect_schema().names() if col not in right_on
+        ]
+        needs_fuzzy_match = needs_fuzzy_match.with_row_index(src_row)
+        candidates = (
             needs_fuzzy_match
-            .join(
-                ref_prep,
-                left_on=['submitted_dob'] + self.block_left,
-                right_on=['reference_dob'] + self.block_right,
-                how='left'
+            .with_columns(window_start, window_end)
+            .join_where(
+                ref_prep.with_row_index(ref_row).rename(dict(zip(right_on, join_keys))),
+                *[pl.col(left).eq(pl.col(right)) for left, right in zip(left_on, join_keys)],
+                pl.col('reference_collection_date').ge(pl.col(window_start.meta.output_name())),
+                pl.col('reference_collection_date').le(pl.col(window_end.meta.output_name()))
             )
+            .select([src_row] + source_columns + [ref_row] + reference_columns)
+        )
+        no_candidate = needs_fuzzy_match.join(candidates.select(self.key), on=self.key, how='anti')
+        return (
+            pl.concat([candidates, no_candidate], how='diagonal')
+            .sort(src_row, ref_row, nulls_last=True)
+            .drop(src_row, ref_row)
         )
 
-        return exact_match, dob_match
+    def __collection_window(self):
+        # The first and last reference collection dates within day_max days and business_day_max business
+        # days of the submitted collection date. Rolling to a business day first makes the business day
+        # bounds agree with business_day_count, which counts from the earlier date up to the later one.
+        submitted = pl.col('submitted_collection_date')
+        starts, ends = [], []
+        if self.day_max:
+            starts.append(submitted.sub(pl.duration(days=self.day_max)))
+            ends.append(submitted.add(pl.duration(days=self.day_max)))
+        if self.business_day_max:
+            starts.append(submitted.dt.add_business_days(-self.business_day_max, roll='backward',
+                                                         holidays=self.holidays))
+            ends.append(submitted.dt.add_business_days(self.business_day_max, roll='forward',
+                                                       holidays=self.holidays))
+        return (
+            pl.max_horizontal(starts).alias('___window_start___'),
+            pl.min_horizontal(ends).alias('___window_end___')
+        )
 
     @staticmethod
-    def score(df):
-        return (
-            df
-            .with_columns(
+    def score(
+        df,
+        scorer: 'dict[str, str | scorers.BatchScorer] | None' = None,
+        token_columns: dict[str, tuple[str, str]] | None = None
+    ):
+        """
+        Score the name similarity of each candidate pair.
 
-                # First get the fuzz ratio with the first name
-                pl.struct(['first_name_clean', 'first_name_clean_right'])
-                .map_elements(
-                    lambda cols: fuzz.ratio(cols['first_name_clean'], cols['first_name_clean_right']),
-                    skip_nulls=False,
-                    return_dtype=pl.Int64
-                )
-                .alias('first_name_result'),
-
-                # Now get the fuzz ratio with the last name
-                pl.struct(['last_name_clean', 'last_name_clean_right'])
-                .map_elements(
-                    lambda cols: fuzz.ratio(cols['last_name_clean'], cols['last_name_clean_right']),
-                    skip_nulls=False,
-                    return_dtype=pl.Int64
-                )
-                .alias('last_name_result'),
-
-                # Now reverse - WDRS is known to switch first and last names
-                # First get the fuzz ratio with the first name
-                pl.struct(['first_name_clean', 'last_name_clean_right'])
-                .map_elements(
-                    lambda cols: fuzz.ratio(cols['first_name_clean'], cols['last_name_clean_right']),
-                    skip_nulls=False,
-                    return_dtype=pl.Int64
-                )
-                .alias('reverse_first_name_result'),
-
-                # Now get the fuzz ratio with the last name
-                pl.struct(['last_name_clean', 'first_name_clean_right'])
-                .map_elements(
-                    lambda cols: fuzz.ratio(cols['last_name_clean'], cols['first_name_clean_right']),
-                    skip_nulls=False,
-                    return_dtype=pl.Int64
-                )
-                .alias('reverse_last_name_result'),
+        Parameters
+        ----------
+        df: pl.DataFrame | pl.LazyFrame
+            candidate pairs with `first_name_clean`, `last_name_clean`, `first_name_clean_right` and
+            `last_name_clean_right` columns
+        scorer: dict[str, str | BatchScorer] (optional)
+            the scorer per comparison (see `DataFrameMatcher.COMPARISONS`). Defaults to 'ratio' for all.
+        token_columns: dict[str, tuple[str, str]] (optional)
+            the raw (source, reference) name columns for 'first_name' and 'last_name', used by tokenized
+            scorers so they can compare whole words. Without them tokenized scorers use the cleaned names.
+
+        Returns
+        -------
+        pl.DataFrame | pl.LazyFrame
+            `df` with a 0-100 result per comparison, plus `match_ratio` and `reverse_match_ratio`
+        """
+        from wadoh_raccoon import scorers
+
+        scorer = scorer or {}
 
+        def score_pairs(comparison_scorer):
+            # batch scorers take and return whole columns
+            return lambda pairs: scorers.apply_scorer(
+                comparison_scorer, pairs.struct.field('left'), pairs.struct.field('right')
             )
+
+        results = []
+        for comparison, (src_name, ref_name, output) in DataFrameMatcher.COMPARISONS.items():
+            comparison_scorer = scorer.get(comparison, 'ratio')
+            if token_columns and scorers.is_tokenized(comparison_scorer):
+                # keep word breaks so token scorers can split multi-word and hyphenated names
+                left = helpers.clean_name(token_columns[src_name][0], keep_spaces=True)
+                right = helpers.clean_name(token_columns[ref_name][1], keep_spaces=True)
+            else:
+                left = pl.col(f'{src_name}_clean')
+                right = pl.col(f'{ref_name}_clean_right')
+            results.append(
+                pl.struct(left.alias('left'), right.alias('right'))
+                .map_batches(score_pairs(comparison_scorer), return_dtype=pl.Int64, is_elementwise=True)
+                .alias(output)
+            )
+
+        return (
+            df
+            .with_columns(results)
             .with_columns(
                 # Now get the ratios between first and last name matches
                 pl.mean_horizontal('first_name_result', 'last_name_result').alias('match_ratio'),
@@ -411,6 +899,28 @@ class DataFrameMatcher:
             )
         )
 
+    def __token_columns(self, dob_match, reference=None):
+        # Raw name columns for tokenized scorers. Reference columns that clash with
+        # source columns are suffixed with '_right' by the dob join.
+        from wadoh_raccoon import scorers
+
+        if not any(scorers.is_tokenized(comparison_scorer) for comparison_scorer in self.scorers.values()):
+            return None
+        if reference is None:
+            first_name_ref, last_name_ref = self.first_name_ref, self.last_name_ref
+        else:
+            first_name_ref = self.references[reference]['first_name']
+            last_name_ref = self.references[reference]['last_name']
+        names = dob_match.collect_schema().names()
+
+        def ref_column(col):
+            return f'{col}_right' if f'{col}_right' in names else col
+
+        return {
+            'first_name': (self.first_name_src, ref_column(first_name_ref)),
+            'last_name': (self.last_name_src, ref_column(last_name_ref)),
+        }
+
     def fuzzy_match(self, dob_match) -> (pl.DataFrame | pl.LazyFrame, pl.DataFrame | pl.LazyFrame):
         """ 
 
@@ -467,61 +977,77 @@ class DataFrameMatcher:
 
         """
 
+        fuzzy_matched, fuzzy_unmatched = self.__fuzzy_match(dob_match)
+
+        if self.key_isnone:
+            fuzzy_matched = fuzzy_matched.drop(self.key)
+            fuzzy_unmatched = fuzzy_unmatched.drop(self.key)
+
+        return fuzzy_matched, fuzzy_unmatched
+
+    def __fuzzy_match(self, dob_match, reference=None):
+
         # ------- Fuzzy Matching ------- #
-        multiple_matches_ratios = (
-            self.score(dob_match)
-            # Get a date range calculation of days between submitted collection date and ref collection date
-            .with_columns(
-                day_count=
-                pl.col('reference_collection_date').sub(pl.col('submitted_collection_date')).dt.total_days().abs(),
-                business_day_count=
-                pl.business_day_count(start='submitted_collection_date', end='reference_collection_date').abs()
+        scored = self.score(dob_match, self.scorers, self.__token_columns(dob_match, reference))
+
+        if self.scoring == 'probabilistic':
+            model = self.__model(reference)
+            scored = model.comparison_vectors(scored)
+            if not model.is_fitted:
+                model.fit(scored)
+            scored = model.score(scored)
+            passes_threshold = pl.col('match_probability').mul(100).ge(self.threshold)
+        else:
+            passes_threshold = (
+                pl.col('match_ratio').ge(self.threshold) | pl.col('reverse_match_ratio').ge(self.threshold)
             )
-        )
 
-        # Get ones that matched on ratio >= threshold and pass day checks (if applicable)
-        multiple_matches_ratios_final = multiple_matches_ratios.filter(
-            pl.col('match_ratio').ge(self.threshold) | pl.col('reverse_match_ratio').ge(self.threshold)
+        # Day counts are only needed to filter and rank the candidates that pass the threshold, and to break
+        # ties between the best candidates of the other groups, so they are computed for those rows alone
+        matches = scored.filter(passes_threshold).with_columns(
+            day_count=self.__day_count(),
+            business_day_count=self.__business_day_count()
         )
 
         if self.day_max:
-            multiple_matches_ratios_final = multiple_matches_ratios_final.filter(
-                pl.col('day_count').le(self.day_max)
-            )
+            matches = matches.filter(pl.col('day_count').le(self.day_max))
 
         if self.business_day_max:
-            multiple_matches_ratios_final = multiple_matches_ratios_final.filter(
-                pl.col('business_day_count').le(self.business_day_max)
-            )
+            matches = matches.filter(pl.col('business_day_count').le(self.business_day_max))
 
         # get the top matches of the groups with no score meeting the threshold
+        business_days, days = '___business_day_count___', '___day_count___'  # Names for temp tie-break cols
+        best = pl.col(self.__rank_col).max().over(self.key)
         fuzzy_unmatched = (
-            multiple_matches_ratios
+            scored
             # Remove any groups that had a match >= the threshold
-            .join(multiple_matches_ratios_final, on=self.key, how='anti')
-            # Get the max between the two ratio methods
+            .join(matches, on=self.key, how='anti')
+            # Get the max between the two ratio methods, and keep the candidates tied at the best of each group
             .with_columns(pl.max_horizontal('match_ratio', 'reverse_match_ratio').alias('max_ratio'))
+            .filter(pl.col(self.__rank_col).eq(best) | best.is_null())
+            # Day counts only break the ties. They are columns rather than sort_by expressions, which polars
+            # does not evaluate per group for business_day_count
+            .with_columns(
+                self.__business_day_count().alias(business_days),
+                self.__day_count().alias(days)
+            )
             # Select the match with the highest ratio within each group
-            .group_by(self.key)
+            .group_by(self.key, maintain_order=True)
             .agg(
                 pl.all()
-                .sort_by(['max_ratio', 'business_day_count', 'day_count'], descending=[True, False, False], nulls_last=True)
+                .sort_by([self.__rank_col, business_days, days], descending=[True, False, False], nulls_last=True)
                 .first()
             )
-            .drop('max_ratio', 'day_count', 'business_day_count')
+            .drop('max_ratio', business_days, days)
         )
 
         # here we need to group by key and select row with the closest collection date difference
         fuzzy_matched = (
-            multiple_matches_ratios_final
-            .group_by(self.key)
+            matches
+            .group_by(self.key, maintain_order=True)
             .agg(pl.all().sort_by(['business_day_count', 'day_count'], nulls_last=True).first())
         )
 
-        if self.key_isnone:
-            fuzzy_matched = fuzzy_matched.drop(self.key)
-            fuzzy_unmatched = fuzzy_unmatched.drop(self.key)
-
         return fuzzy_matched, fuzzy_unmatched
 
     def __output_summary(
@@ -596,8 +1122,590 @@ class DataFrameMatcher:
             helpers.lazy_height(submissions_to_fuzzy_df)
         )
 
-    def match(self, verbose=True):
-        
+    def __lookup_columns(self, reference=None):
+        # Raw reference name columns and reference block columns of a reference
+        if reference is None:
+            return self.first_name_ref, self.last_name_ref, self.block_right
+        ref = self.references[reference]
+        return ref['first_name'], ref['last_name'], ref['block']
+
+    def build_lookup_index(self, reference: str | None = None) -> dict:
+        """
+        Build the in-memory index used by `lookup`, if it is not built yet.
+
+        The index holds the cleaned reference, its rows grouped by date of birth (and block values) as
+        compact candidate lists, and its rows by exact cleaned name, date of birth and block values.
+        It is built from the prepared reference when `prepare` was called.
+
+        Parameters
+        ----------
+        reference: str (optional)
+            The name of the reference to index, when matching against several references.
+
+        Returns
+        -------
+        dict
+            The index.
+        """
+        import numpy as np
+        from wadoh_raccoon import scorers
+
+        if reference in self.lookup_indexes:
+            return self.lookup_indexes[reference]
+
+        ref = self.clean_ref(reference)
+        if isinstance(ref, pl.LazyFrame):
+            ref = ref.collect()
+        first_name_ref, last_name_ref, block_right = self.__lookup_columns(reference)
+        row = '___row___'  # Name for temp col holding the reference row number
+        ref = ref.with_row_index(row)
+
+        # tokenized scorers compare the names with word breaks kept
+        tokens = []
+        if any(scorers.is_tokenized(comparison_scorer) for comparison_scorer in self.scorers.values()):
+            tokens = ['___first_name_tokens___', '___last_name_tokens___']
+            ref = ref.with_columns(
+                helpers.clean_name(first_name_ref, keep_spaces=True).alias(tokens[0]),
+                helpers.clean_name(last_name_ref, keep_spaces=True).alias(tokens[1])
+            )
+
+        n_blocks = 1 + len(block_right)
+        blocks = (
+            ref
+            .group_by(['reference_dob'] + block_right, maintain_order=True)
+            .agg(row, 'first_name_clean', 'last_name_clean', 'reference_collection_date', *tokens)
+        )
+        exact = (
+            ref
+            .group_by(['first_name_clean', 'last_name_clean', 'reference_dob'] + block_right, maintain_order=True)
+            .agg(row)
+        )
+        index = {
+            'ref': ref.drop(row, *tokens),
+            'blocks': {values[:n_blocks]: values[n_blocks:] for values in blocks.iter_rows()},
+            'exact': {values[:-1]: values[-1] for values in exact.iter_rows()},
+            'business_days': np.busdaycalendar(holidays=np.array(self.holidays, dtype='datetime64[D]')),
+        }
+        self.lookup_indexes[reference] = index
+        return index
+
+    def lookup(
+        self,
+        first_name: str | None,
+        last_name: str | None,
+        dob: date | str | None,
+        spec_col_date: date | str | None,
+        reference: str | None = None,
+        **blocks
+    ) -> MatchLookup:
+        """
+        Match a single record, without building any dataframes.
+
+        Gives the same result as matching a one-record source with `match`, but probes the in-memory
+        index (see `build_lookup_index`) and only scores the reference records sharing the record's date
+        of birth, taking well under a millisecond for typical blocks. The index is built on the first lookup.
+        Probabilistic scoring needs a fitted model, and scores the candidates as a small dataframe instead.
+
+        Parameters
+        ----------
+        first_name: str
+            The first name.
+        last_name: str
+            The last name.
+        dob: date | str
+            The date of birth, as a date or a string in any format `helpers.date_format` reads.
+        spec_col_date: date | str
+            The specimen collection date.
+        reference: str (optional)
+            The reference to look up in, when matching against several references.
+        **blocks
+            The value of each source block column, by column name.
+
+        Returns
+        -------
+        MatchLookup
+            The result set the record belongs to and its row there.
+
+        Examples
+        --------
+        ```python
+        result = fuzzy_init.lookup('DAVIS', 'SMITHDAVIS', date(1989, 7, 15), '2024-11-29')
+        result.match_category, result.record['CASE_ID']
+        ```
+        """
+        import numpy as np
+        from wadoh_raccoon import scorers
+
+        if self.references is not None and reference not in self.references:
+            raise ValueError(f"Unknown reference: {reference}. Use one of: {list(self.references)}")
+        missing = [col for col in self.block_left if col not in blocks]
+        if missing:
+            raise ValueError(f"Missing values for the block columns {missing}")
+
+        query = {
+            self.first_name_src: first_name,
+            self.last_name_src: last_name,
+            self.dob_src: dob,
+            self.spec_col_date_src: spec_col_date,
+            **{col: blocks[col] for col in self.block_left},
+            'first_name_clean': _clean_name(first_name),
+            'last_name_clean': _clean_name(last_name),
+            'submitted_collection_date': _lookup_date(spec_col_date),
+            'submitted_dob': _lookup_date(dob),
+        }
+        if any(query[col] is None for col in
+               ['first_name_clean', 'last_name_clean', 'submitted_collection_date', 'submitted_dob']):
+            return MatchLookup(match_category='no_demo', record=query)
+
+        index = self.build_lookup_index(reference)
+        _, _, block_right = self.__lookup_columns(reference)
+        block_values = tuple(blocks[col] for col in self.block_left)
+        candidates = index['blocks'].get((query['submitted_dob'],) + block_values)
+        n_candidates = len(candidates[0]) if candidates else 0
+
+        # an exact match on the cleaned names, closest collection date first
+        exact_rows = index['exact'].get(
+            (query['first_name_clean'], query['last_name_clean'], query['submitted_dob']) + block_values
+        )
+        if exact_rows:
+            def date_subtract(ref_row):
+                if ref_row['reference_collection_date'] is None:
+                    return None
+                return abs(query['submitted_collection_date'] - ref_row['reference_collection_date'])
+
+            ref_rows = [index['ref'].row(i, named=True) for i in exact_rows]
+            best = min(ref_rows, key=lambda ref_row: (date_subtract(ref_row) is None, date_subtract(ref_row)))
+            record = _lookup_join(
+                query, best, drop={'first_name_clean', 'last_name_clean', 'reference_dob', *block_right}, suffix='_em'
+            )
+            record['date_subtract'] = date_subtract(best)
+            return MatchLookup(match_category='exact_matched', record=record, candidates=n_candidates)
+
+        drop = {'reference_dob', *block_right}
+        rows, first_names, last_names, collection_dates, *tokens = candidates or ([], [], [], [])
+        submitted = query['submitted_collection_date']
+        day_counts = [None if d is None else abs((d - submitted).days) for d in collection_dates]
+        business_days = np.abs(np.busday_count(
+            np.datetime64(submitted, 'D'),
+            np.array([submitted if d is None else d for d in collection_dates], dtype='datetime64[D]'),
+            busdaycal=index['business_days']
+        )).tolist()
+        business_day_counts = [None if d is None else days for d, days in zip(collection_dates, business_days)]
+
+        if self.day_max or self.business_day_max:
+            # candidates collected outside the window are never scored, the same as in match()
+            keep = [
+                i for i, (day_count, business_day_count) in enumerate(zip(day_counts, business_day_counts))
+                if (not self.day_max or (day_count is not None and day_count <= self.day_max)) and
+                (not self.business_day_max or
+                 (business_day_count is not None and business_day_count <= self.business_day_max))
+            ]
+            rows, first_names, last_names, day_counts, business_day_counts, *tokens = [
+                [values[i] for i in keep]
+                for values in [rows, first_names, last_names, day_counts, business_day_counts, *tokens]
+            ]
+
+        if self.scoring == 'probabilistic':
+            return self.__lookup_frame(query, index, rows, drop, n_candidates)
+
+        if not rows:
+            # no candidate: the record is unmatched, with empty reference columns and zero scores
+            record = _lookup_join(query, dict.fromkeys(index['ref'].columns), drop=drop, suffix='_right')
+            record.update({output: 0 for _, _, output in self.COMPARISONS.values()})
+            record.update(match_ratio=0.0, reverse_match_ratio=0.0)
+            return MatchLookup(match_category='fuzzy_unmatched', record=record, candidates=n_candidates)
+
+        names = {'first_name': first_names, 'last_name': last_names}
+        query_names = {'first_name': query['first_name_clean'], 'last_name': query['last_name_clean']}
+        if tokens:
+            names_tokens = {'first_name': tokens[0], 'last_name': tokens[1]}
+            query_tokens = {
+                'first_name': _clean_name(first_name, keep_spaces=True),
+                'last_name': _clean_name(last_name, keep_spaces=True)
+            }
+        results = {}
+        for comparison, (src_name, ref_name, output) in self.COMPARISONS.items():
+            comparison_scorer = self.scorers[comparison]
+            if tokens and scorers.is_tokenized(comparison_scorer):
+                left, right = query_tokens[src_name], names_tokens[ref_name]
+            else:
+                left, right = query_names[src_name], names[ref_name]
+            results[output] = scorers.score_pairs(comparison_scorer, [left] * len(rows), right)
+
+        scored = []
+        for i in range(len(rows)):
+            scores = {output: values[i] for output, values in results.items()}
+            match_ratio = (scores['first_name_result'] + scores['last_name_result']) / 2
+            reverse_match_ratio = (scores['reverse_first_name_result'] + scores['reverse_last_name_result']) / 2
+            passes = match_ratio >= self.threshold or reverse_match_ratio >= self.threshold
+            scored.append(
+                (i, scores, match_ratio, reverse_match_ratio, day_counts[i], business_day_counts[i], passes)
+            )
+
+        def nulls_last(value):
+            return (value is None, value)
+
+        matched = [candidate for candidate in scored if candidate[-1]]
+        if matched:
+            # the match with the closest collection date
+            best = min(matched, key=lambda c: (nulls_last(c[5]), nulls_last(c[4])))
+            category = 'fuzzy_matched'
+        else:
+            # the candidate with the highest score
+            best = min(scored, key=lambda c: (-max(c[2], c[3]), nulls_last(c[5]), nulls_last(c[4])))
+            category = 'fuzzy_unmatched'
+
+        i, scores, match_ratio, reverse_match_ratio, day_count, business_day_count, _ = best
+        record = _lookup_join(query, index['ref'].row(rows[i], named=True), drop=drop, suffix='_right')
+        record.update(scores)
+        record.update(match_ratio=match_ratio, reverse_match_ratio=reverse_match_ratio)
+        if category == 'fuzzy_matched':
+            record.update(day_count=day_count, business_day_count=business_day_count)
+        return MatchLookup(match_category=category, record=record, candidates=n_candidates)
+
+    def __lookup_frame(self, query, index, rows, drop, n_candidates):
+        # Probabilistic lookups score the candidate pairs with the fitted model, as a small dataframe
+        model = self.model if self.model.is_fitted else None
+        if model is None:
+            raise ValueError("lookup needs a fitted model for probabilistic scoring")
+        ref = index['ref'][list(rows)] if rows else index['ref'].clear(1)
+        pairs = (
+            pl.DataFrame([query] * ref.height)
+            .with_columns([pl.lit(None).alias(col) for col in self.key if col not in query])
+            .hstack(
+                ref.drop(*drop).rename({col: f'{col}_right' for col in ref.columns if col in query})
+            )
+        )
+        fuzzy_matched, fuzzy_unmatched = self.__fuzzy_match(pairs)
+        category = 'fuzzy_matched' if fuzzy_matched.height else 'fuzzy_unmatched'
+        result = fuzzy_matched if fuzzy_matched.height else fuzzy_unmatched
+        record = result.drop([col for col in self.key if col not in query]).row(0, named=True)
+        return MatchLookup(match_category=category, record=record, candidates=n_candidates)
+
+    @staticmethod
+    def __day_count():
+        # Days between the submitted and reference collection dates
+        return pl.col('reference_collection_date').sub(pl.col('submitted_collection_date')).dt.total_days().abs()
+
+    def __business_day_count(self):
+        # Business days between the collection dates, skipping weekends and the holiday calendar
+        return pl.business_day_count(
+            start='submitted_collection_date', end='reference_collection_date', holidays=self.holidays
+        ).abs()
+
+    @property
+    def __rank_col(self):
+        # Column used to rank candidates against each other
+        return 'match_weight' if self.scoring == 'probabilistic' else 'max_ratio'
+
+    def __model(self, reference=None):
+        # An unfitted model is fitted separately for each named reference
+        if reference is None or self.model.is_fitted:
+            return self.model
+        return self.reference_models.setdefault(reference, copy.deepcopy(self.model))
+
+    def __drop_created_key(self, df):
+        # Drop key if created during matching
+        if self.key_isnone:
+            return df.drop(self.key)
+        return df
+
+    def __match_references(self, verbose, combine, max_workers):
+
+        # Clean and split the source once; every reference reuses it
+        submissions_to_fuzzy_prep = self.clean_src()
+        if isinstance(submissions_to_fuzzy_prep, pl.LazyFrame):
+            # cache the shared source plan so it is only computed once when results are collected together
+            submissions_to_fuzzy_prep = submissions_to_fuzzy_prep.cache()
+        fuzzy_with_demo, fuzzy_without_demo = self.filter_demo(submissions_to_fuzzy_prep)
+
+        def match_reference(name):
+            ref_prep = self.clean_ref(name)
+            exact_matched, dob_match = self.__find_exact_match(ref_prep, fuzzy_with_demo, name)
+            fuzzy_matched, fuzzy_unmatched = self.__fuzzy_match(dob_match, name)
+            return exact_matched, fuzzy_matched, fuzzy_unmatched
+
+        # candidate generation runs per reference, concurrently for eager frames.
+        # Lazy plans are only built here (and can't be shared across threads while building),
+        # so they run in parallel when collected instead.
+        names = list(self.references)
+        if isinstance(fuzzy_with_demo, pl.LazyFrame):
+            outputs = {name: match_reference(name) for name in names}
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers or len(names)) as pool:
+                outputs = dict(zip(names, pool.map(match_reference, names)))
+
+        if not combine:
+            results = {}
+            for name, (exact_matched, fuzzy_matched, fuzzy_unmatched) in outputs.items():
+                if verbose:
+                    print(f"Reference: {name}")
+                    self.__output_summary(
+                        fuzzy_matched_df=fuzzy_matched,
+                        fuzzy_unmatched_df=fuzzy_unmatched,
+                        submissions_to_fuzzy_df=submissions_to_fuzzy_prep,
+                        fuzzy_without_demo_df=fuzzy_without_demo,
+                        exact_match_df=exact_matched
+                    )
+                results[name] = DataFrameMatcherResults(
+                    exact_matched=self.__drop_created_key(exact_matched),
+                    fuzzy_matched=self.__drop_created_key(fuzzy_matched),
+                    fuzzy_unmatched=self.__drop_created_key(fuzzy_unmatched),
+                    no_demo=fuzzy_without_demo
+                )
+            return results
+
+        # ------ Combine the best match across references ------ #
+        order = '___reference_order___'  # Name for temp col to break ties by reference order
+
+        def stack(position):
+            return pl.concat(
+                [
+                    output[position].with_columns(
+                        pl.lit(name).alias('reference_source'),
+                        pl.lit(i).alias(order)
+                    )
+                    for i, (name, output) in enumerate(outputs.items())
+                ],
+                how='diagonal_relaxed'
+            )
+
+        def best(df, by, descending):
+            return (
+                df
+                .sort(by=self.key + by + [order], descending=[False] * len(self.key) + descending + [False],
+                      nulls_last=True)
+                .unique(subset=self.key, keep='first', maintain_order=True)
+                .drop(order)
+            )
+
+        # an exact match in any reference wins, closest collection date first
+        exact_matched = best(stack(0), ['date_subtract'], [False])
+
+        # then the highest scoring fuzzy match, closest collection date first
+        fuzzy_matched = best(
+            stack(1)
+            .join(exact_matched, on=self.key, how='anti')
+            .with_columns(pl.max_horizontal('match_ratio', 'reverse_match_ratio').alias('max_ratio')),
+            [self.__rank_col, 'business_day_count', 'day_count'],
+            [True, False, False]
+        ).drop('max_ratio')
+
+        # records without a match in any reference keep their highest scoring candidate
+        fuzzy_unmatched = best(
+            stack(2)
+            .join(exact_matched, on=self.key, how='anti')
+            .join(fuzzy_matched, on=self.key, how='anti')
+            .with_columns(pl.max_horizontal('match_ratio', 'reverse_match_ratio').alias('max_ratio')),
+            [self.__rank_col],
+            [True]
+        ).drop('max_ratio')
+
+        if verbose:
+            self.__output_summary(
+                fuzzy_matched_df=fuzzy_matched,
+                fuzzy_unmatched_df=fuzzy_unmatched,
+                submissions_to_fuzzy_df=submissions_to_fuzzy_prep,
+                fuzzy_without_demo_df=fuzzy_without_demo,
+                exact_match_df=exact_matched
+            )
+
+        return DataFrameMatcherResults(
+            exact_matched=self.__drop_created_key(exact_matched),
+            fuzzy_matched=self.__drop_created_key(fuzzy_matched),
+            fuzzy_unmatched=self.__drop_created_key(fuzzy_unmatched),
+            no_demo=fuzzy_without_demo
+        )
+
+    def __match_duckdb(self, verbose):
+        # The exact and candidate joins run in DuckDB; the candidates of a batch of records are then scored
+        # and ranked with the same polars code as the polars backend
+        from wadoh_raccoon import duckdb_backend
+
+        if self.references is not None:
+            raise ValueError("The duckdb backend matches against a single reference")
+        if self.scoring == 'probabilistic' and (not self.model.is_fitted or self.model.term_frequency):
+            raise ValueError(
+                "The duckdb backend scores candidates in batches, so probabilistic scoring needs a fitted model "
+                "with term_frequency=False"
+            )
+        backend = self.backend
+        src_row, ref_row, rank = duckdb_backend.SRC_ROW, duckdb_backend.REF_ROW, duckdb_backend.RANK
+        quote = duckdb_backend.quote
+
+        # row numbers keep the order of the polars joins, which breaks ties between candidates
+        # a reference cleaned by prepare() is used as is
+        prepared = None in self.prepared_refs
+        df_src = self.df_src.with_row_index(src_row)
+        df_ref = (self.clean_ref() if prepared else self.df_ref).with_row_index(ref_row)
+
+        # Cleaning and matching empty frames gives the columns and types of the polars backend's results
+        ref_empty = self.clean_ref().clear().lazy().with_row_index(ref_row).collect()
+        src_empty, no_demo_empty = (df.clear().lazy().collect() for df in self.filter_demo(self.clean_src()))
+        src_empty = src_empty.with_row_index(src_row)
+        exact_empty, dob_empty = self.__find_exact_match(ref_empty, src_empty)
+        dob_empty = dob_empty.drop(src_row, ref_row)
+        src_clean = duckdb_backend.clean_columns(
+            df_src.lazy().collect_schema(), self.first_name_src, self.last_name_src, self.spec_col_date_src,
+            self.dob_src, 'submitted_collection_date', 'submitted_dob'
+        )
+        ref_clean = duckdb_backend.clean_columns(
+            df_ref.lazy().collect_schema(), self.first_name_ref, self.last_name_ref, self.spec_col_date_ref,
+            self.dob_ref, 'reference_collection_date', 'reference_dob'
+        )
+        has_demo = ' AND '.join(
+            f'{quote(col)} IS NOT NULL'
+            for col in ['first_name_clean', 'last_name_clean', 'submitted_collection_date', 'submitted_dob']
+        )
+
+        exact_left = ['first_name_clean', 'last_name_clean', 'submitted_dob'] + self.block_left
+        exact_right = ['first_name_clean', 'last_name_clean', 'reference_dob'] + self.block_right
+        dob_left, dob_right = ['submitted_dob'] + self.block_left, ['reference_dob'] + self.block_right
+        key = ', '.join(quote(col) for col in self.key)
+        date_subtract = 'abs(l."submitted_collection_date" - r."reference_collection_date")'
+
+        with backend.work_directory() as directory:
+            con = backend.connect(directory)
+            try:
+                duckdb_backend.register(con, 'src_raw', df_src, directory)
+                duckdb_backend.register(con, 'ref' if prepared else 'ref_raw', df_ref, directory)
+                # the cleaned source split by presence of demographics, and the reference without bad records
+                con.execute(f"CREATE VIEW src_clean AS SELECT {', '.join(src_clean)} FROM src_raw")
+                con.execute(f"CREATE VIEW src AS SELECT * FROM src_clean WHERE {has_demo}")
+                if not prepared:
+                    con.execute(f"""
+                        CREATE VIEW ref AS SELECT * FROM (SELECT {', '.join(ref_clean)} FROM ref_raw)
+                        WHERE "first_name_clean" IS NOT NULL AND "last_name_clean" IS NOT NULL
+                    """)
+                no_demo = duckdb_backend.fetch_table(
+                    con, f"SELECT * FROM src_clean WHERE ({has_demo}) IS NOT TRUE ORDER BY {src_row}"
+                )
+                no_demo = no_demo.select(pl.col(col).cast(dtype) for col, dtype in no_demo_empty.schema.items())
+
+                # the closest reference record (by collection date) per key, joined on names and dob
+                exact_columns = duckdb_backend.join_columns(src_empty.columns, ref_empty.columns, exact_right, '_em')
+                con.execute(f"""
+                    CREATE TABLE potential AS
+                    SELECT * EXCLUDE ({rank}) FROM (
+                        SELECT {', '.join(exact_columns)}, row_number() OVER (
+                            PARTITION BY {', '.join(f'l.{quote(col)}' for col in self.key)}
+                            ORDER BY {date_subtract} NULLS LAST, l.{src_row}, r.{ref_row}
+                        ) AS {rank}
+                        FROM src l LEFT JOIN ref r ON {duckdb_backend.join_condition(exact_left, exact_right)}
+                    )
+                    WHERE {rank} = 1
+                """)
+                exact_matched = (
+                    duckdb_backend.fetch_table(con, f"SELECT * FROM potential WHERE {ref_row} IS NOT NULL")
+                    .with_columns(
+                        date_subtract=(pl.col('submitted_collection_date') - pl.col('reference_collection_date')).abs()
+                    )
+                )
+                exact_matched = exact_matched.select(
+                    pl.col(col).cast(dtype) for col, dtype in exact_empty.schema.items()
+                )
+
+                # every reference record sharing a dob (and blocks) with the records left to fuzzy match
+                con.execute(f"""
+                    CREATE TABLE needs_fuzzy AS
+                    SELECT {', '.join(quote(col) for col in src_empty.columns)} FROM potential WHERE {ref_row} IS NULL
+                """)
+                dob_columns = duckdb_backend.join_columns(src_empty.columns, ref_empty.columns, dob_right, '_right')
+                dob_condition = duckdb_backend.join_condition(dob_left, dob_right)
+                dob_match = f"SELECT {', '.join(dob_columns)} FROM needs_fuzzy l LEFT JOIN ref r ON {dob_condition}"
+                if self.day_max or self.business_day_max:
+                    # The same window as the polars backend, as a range condition of the join: the bounds of
+                    # each submitted collection date are computed in polars, which counts business days
+                    window_start, window_end = self.__collection_window()
+                    submitted_dates = duckdb_backend.fetch_table(
+                        con, 'SELECT DISTINCT "submitted_collection_date" FROM needs_fuzzy'
+                    )
+                    duckdb_backend.register(
+                        con, 'windows', submitted_dates.with_columns(window_start, window_end), directory
+                    )
+                    start, end = (quote(bound.meta.output_name()) for bound in (window_start, window_end))
+                    dob_match = f"""
+                        SELECT {', '.join(dob_columns)} FROM needs_fuzzy l
+                        LEFT JOIN windows w ON l."submitted_collection_date" = w."submitted_collection_date"
+                        LEFT JOIN ref r ON {dob_condition}
+                            AND r."reference_collection_date" BETWEEN w.{start} AND w.{end}
+                    """
+                reader = duckdb_backend.fetch_batches(
+                    con, f"SELECT * FROM ({dob_match}) ORDER BY {key}, {src_row}, {ref_row}", backend.batch_size
+                )
+
+                fuzzy_matched, fuzzy_unmatched = [], []
+                for batch in duckdb_backend.key_batches(reader, self.key):
+                    # score exactly the columns the polars backend scores, without the row numbers
+                    batch = batch.select(pl.col(col).cast(dtype) for col, dtype in dob_empty.schema.items())
+                    matched, unmatched = self.__fuzzy_match(batch)
+                    fuzzy_matched.append(matched)
+                    fuzzy_unmatched.append(unmatched)
+            finally:
+                con.close()
+
+        if not fuzzy_matched:
+            matched, unmatched = self.__fuzzy_match(dob_empty)
+            fuzzy_matched, fuzzy_unmatched = [matched], [unmatched]
+        results = {
+            'exact_matched': exact_matched,
+            'fuzzy_matched': pl.concat(fuzzy_matched),
+            'fuzzy_unmatched': pl.concat(fuzzy_unmatched),
+        }
+        for name, df in results.items():
+            df = self.__drop_created_key(df.drop(src_row, ref_row, strict=False))
+            results[name] = df.lazy() if isinstance(self.df_src, pl.LazyFrame) else df
+        # filter_demo already dropped a created key from the columns no_demo was selected with
+        results['no_demo'] = no_demo.lazy() if isinstance(self.df_src, pl.LazyFrame) else no_demo
+
+        if verbose:
+            self.__output_summary(
+                fuzzy_matched_df=results['fuzzy_matched'],
+                fuzzy_unmatched_df=results['fuzzy_unmatched'],
+                # the leak check only joins on the key (or the source columns), which cleaning leaves as is
+                submissions_to_fuzzy_df=self.df_src,
+                fuzzy_without_demo_df=results['no_demo'],
+                exact_match_df=results['exact_matched']
+            )
+
+        return DataFrameMatcherResults(**results)
+
+    def match(
+        self,
+        verbose: bool = True,
+        combine: bool = False,
+        max_workers: int | None = None
+    ) -> DataFrameMatcherResults | dict[str, DataFrameMatcherResults]:
+        """
+        Run exact and fuzzy matching.
+
+        Parameters
+        ----------
+        verbose: bool (optional)
+            Print a summary of the results and check for data leaks. Defaults to True.
+        combine: bool (optional)
+            Only used with several references. If True, return a single result holding the best
+            match for each record across all references, with a `reference_source` column naming the
+            reference it came from. Exact matches win over fuzzy matches, and ties go to the reference
+            listed first. If False, return a dict of reference name to results. Defaults to False.
+        max_workers: int (optional)
+            Only used with several eager references. The number of references to generate candidates for
+            concurrently. Defaults to one thread per reference. Lazy results are computed in parallel by
+            polars when they are collected (e.g. with `pl.collect_all`).
+
+        Returns
+        -------
+        DataFrameMatcherResults | dict[str, DataFrameMatcherResults]
+            The matched results, or a dict of results per reference when several references are given
+            and `combine` is False.
+        """
+
+        if self.backend is not None:
+            return self.__match_duckdb(verbose=verbose)
+
+        if self.references is not None:
+            return self.__match_references(verbose=verbose, combine=combine, max_workers=max_workers)
+
         # Process the Submissions to Fuzzy
         ref_prep, submissions_to_fuzzy_prep = self.clean_all()
         # Split by presence of demographics and specimen collection date
@@ -627,3 +1735,455 @@ class DataFrameMatcher:
             fuzzy_unmatched=fuzzy_unmatched,
             no_demo=fuzzy_without_demo
         )
+
+    def match_partitioned(
+        self,
+        n_buckets: int = 16,
+        directory: str | Path | None = None,
+        max_workers: int = 1,
+        chunk_size: int = 1_000_000,
+        verbose: bool = True
+    ) -> DataFrameMatcherResults:
+        """
+        Run exact and fuzzy matching one bucket of dates of birth at a time, to bound the memory used.
+
+        Every candidate pair shares a date of birth (and block values), so the records split into buckets by
+        a hash of those, with no pair across buckets. The source and the cleaned reference are first written
+        to `n_buckets` Parquet buckets on disk, reading them once in chunks of `chunk_size` rows. Each bucket
+        is then matched on its own, and the results are put together. Memory is bounded by the largest
+        bucket (times `max_workers`) instead of by all the candidate pairs at once.
+
+        The results are the same as `match()`, with two conditions, checked before matching: the rows of a
+        key must share a date of birth (and block values), and probabilistic scoring needs a fitted model
+        without term frequencies, since those would come from each bucket's candidates.
+
+        This runs the steps of `partition`, `run_worker` and `merge_partitions` on one machine.
+
+        Parameters
+        ----------
+        n_buckets: int (optional)
+            The number of buckets. Defaults to 16.
+        directory: str | Path (optional)
+            Where to write the buckets and the results, replacing those of an earlier run. The results are
+            returned as LazyFrames scanning the result files, which are kept. Defaults to a temporary
+            directory, removed after matching, with the results collected in memory.
+        max_workers: int (optional)
+            The number of buckets matched at the same time. Defaults to 1.
+        chunk_size: int (optional)
+            The number of rows split into buckets at a time. Defaults to 1,000,000.
+        verbose: bool (optional)
+            Print a summary of the results and check for data leaks. Defaults to True.
+
+        Returns
+        -------
+        DataFrameMatcherResults
+            The matched results.
+
+        Examples
+        --------
+        ```python
+        result = instance.match_partitioned(n_buckets=64, directory='/scratch/rematch', max_workers=4)
+        result.fuzzy_matched.collect()
+        ```
+        """
+        temporary = directory is None
+        with contextlib.ExitStack() as stack:
+            if temporary:
+                directory = stack.enter_context(tempfile.TemporaryDirectory(prefix='wadoh-raccoon-buckets-'))
+            directory = Path(directory)
+            self.partition(directory, n_partitions=n_buckets, chunk_size=chunk_size)
+
+            # the threads claim buckets from the same directory, like workers on separate machines
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                list(pool.map(lambda _: self.__work(directory), range(max_workers)))
+
+            output = self.__merge(directory, verbose)
+            if temporary:
+                output = DataFrameMatcherResults(
+                    **{name: getattr(output, name).collect() for name in RESULT_SETS}
+                )
+
+        return output
+
+    def partition(self, directory: str | Path, n_partitions: int = 64, chunk_size: int = 1_000_000) -> dict:
+        """
+        Split the matching into partitions on a shared directory, to be matched by `run_worker` processes.
+
+        This is the first step of distributed matching, run once by a coordinator. The source and the
+        cleaned reference are written to `n_partitions` Parquet partitions by a hash of the date of birth
+        (and block values), so that every candidate pair is within one partition. The settings of the
+        matcher are saved next to them, and a `manifest.json` listing the partitions is written last.
+
+        Workers, on this machine or on any node that mounts `directory`, then call
+        `DataFrameMatcher.run_worker(directory)`, and once all the partitions are matched,
+        `DataFrameMatcher.merge_partitions(directory)` puts the results together.
+
+        The results are the same as `match()`, under the conditions given in `match_partitioned`.
+
+        Parameters
+        ----------
+        directory: str | Path
+            A directory shared by the coordinator and the workers. The files of an earlier run in it are
+            replaced.
+        n_partitions: int (optional)
+            The number of partitions. Defaults to 64.
+        chunk_size: int (optional)
+            The number of rows split into partitions at a time. Defaults to 1,000,000.
+
+        Returns
+        -------
+        dict
+            The manifest: the number of partitions and of source and reference rows.
+
+        Examples
+        --------
+        ```python
+        # on the coordinator
+        instance.partition('/shared/rematch', n_partitions=256)
+
+        # on each worker node, as many processes as wanted
+        DataFrameMatcher.run_worker('/shared/rematch')
+
+        # on the coordinator, once the workers are done
+        result = DataFrameMatcher.merge_partitions('/shared/rematch')
+        ```
+        """
+        import pickle
+
+        if self.references is not None:
+            raise ValueError("Partitioned matching matches against a single reference")
+        if self.scoring == 'probabilistic' and (not self.model.is_fitted or self.model.term_frequency):
+            raise ValueError(
+                "Partitioned matching scores each partition on its own, so probabilistic scoring needs a fitted "
+                "model with term_frequency=False"
+            )
+
+        # the settings of the matcher, without its data, are saved for the workers
+        settings = copy.copy(self)
+        settings.df_src = pl.DataFrame(schema=self.df_src.lazy().collect_schema())
+        settings.df_ref = pl.DataFrame(schema=self.df_ref.lazy().collect_schema())
+        settings.prepared_refs, settings.lookup_indexes, settings.reference_models = {}, {}, {}
+        try:
+            pickle.dumps(settings)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise ValueError(
+                "The matcher settings are saved for the workers with pickle; use registered scorer names "
+                f"rather than lambdas or local functions. {e}"
+            ) from e
+
+        directory = Path(directory)
+        (directory / MANIFEST).unlink(missing_ok=True)
+        for folder in ['source', 'reference', 'claims', 'results', 'done']:
+            shutil.rmtree(directory / folder, ignore_errors=True)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        # the cleaned source is kept for the leak check of the merge
+        helpers.sink_parquet(self.clean_src().lazy(), directory / 'submissions.parquet')
+        submissions_to_fuzzy_prep = pl.scan_parquet(directory / 'submissions.parquet')
+        fuzzy_with_demo, fuzzy_without_demo = self.filter_demo(submissions_to_fuzzy_prep)
+        helpers.sink_parquet(fuzzy_without_demo.lazy(), directory / 'no_demo.parquet')
+
+        # match() keeps one result per key, which only holds if all the rows of a key are in one partition
+        bucket_columns = ['submitted_dob'] + self.block_left
+        if not self.key_isnone:
+            split_keys = helpers.lazy_height(
+                fuzzy_with_demo.lazy()
+                .group_by(self.key)
+                .agg(pl.struct(bucket_columns).n_unique().alias('n'))
+                .filter(pl.col('n') > 1)
+            )
+            if split_keys:
+                raise ValueError(
+                    f"{split_keys} keys have rows with different values of {bucket_columns}; partitioned "
+                    "matching needs the rows of a key to share a date of birth (and block values)"
+                )
+
+        # the partition matchers clean their own source rows, and add their own key if there is none
+        source_columns = [
+            col for col in self.df_src.lazy().collect_schema().names()
+            if not (self.key_isnone and col in self.key)
+        ]
+        src_schema, src_rows = _write_buckets(
+            fuzzy_with_demo.lazy()
+            .select(pl.col(source_columns), _bucket(bucket_columns, n_partitions)),
+            directory / 'source', chunk_size
+        )
+        # reference records without a date of birth can never be a candidate
+        ref_schema, ref_rows = _write_buckets(
+            self.clean_ref().lazy()
+            .filter(pl.col('reference_dob').is_not_null())
+            .with_columns(_bucket(['reference_dob'] + self.block_right, n_partitions)),
+            directory / 'reference', chunk_size
+        )
+
+        payload = {'matcher': settings, 'source': src_schema, 'reference': ref_schema}
+        (directory / 'matcher.pkl').write_bytes(pickle.dumps(payload))
+
+        manifest = {
+            'n_partitions': n_partitions,
+            'source_rows': src_rows,
+            'reference_rows': ref_rows,
+            'created': datetime.now().isoformat(timespec='seconds'),
+        }
+        _write_atomic(directory / MANIFEST, json.dumps(manifest, indent=2).encode())
+        return manifest
+
+    @staticmethod
+    def run_worker(directory: str | Path) -> list[int]:
+        """
+        Match the partitions written by `partition` that no other worker has claimed.
+
+        Any number of workers, on any node that mounts `directory`, can run at once. A worker claims a
+        partition by creating its claim file with an exclusive create, so each partition is matched once,
+        and writes the results of the partition before marking it as done. A worker returns when there is
+        no partition left to claim.
+
+        If a worker stops before finishing a partition, its claim stays; remove the files in
+        `directory/claims` of the partitions not in `directory/done` and run a worker again.
+
+        The matcher settings are read with pickle, so only run workers on directories you trust.
+
+        Parameters
+        ----------
+        directory: str | Path
+            The directory given to `partition`.
+
+        Returns
+        -------
+        list[int]
+            The partitions matched by this worker.
+
+        Examples
+        --------
+        ```python
+        from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+
+        DataFrameMatcher.run_worker('/shared/rematch')
+        ```
+        """
+        return _load_partitioned(directory).__work(directory)
+
+    @staticmethod
+    def merge_partitions(directory: str | Path, verbose: bool = True) -> DataFrameMatcherResults:
+        """
+        Put together the results of the partitions matched by `run_worker`.
+
+        Parameters
+        ----------
+        directory: str | Path
+            The directory given to `partition`. Every partition must be done.
+        verbose: bool (optional)
+            Print a summary of the results and check for data leaks. Defaults to True.
+
+        Returns
+        -------
+        DataFrameMatcherResults
+            The matched results, as LazyFrames scanning the result files.
+        """
+        return _load_partitioned(directory).__merge(directory, verbose)
+
+    def __work(self, directory):
+        # Claim and match partitions until none is left
+        import pickle
+
+        directory = Path(directory)
+        manifest = json.loads((directory / MANIFEST).read_text())
+        schemas = pickle.loads((directory / 'matcher.pkl').read_bytes())
+        (directory / 'claims').mkdir(exist_ok=True)
+        (directory / 'done').mkdir(exist_ok=True)
+
+        matched = []
+        for i in range(manifest['n_partitions']):
+            name = f'partition-{i:05d}'
+            if (directory / 'done' / name).exists() or not _claim(directory / 'claims' / name):
+                continue
+            matcher = self.with_source(_read_bucket(directory / 'source', schemas['source'], i))
+            matcher.prepared_refs = {None: _read_bucket(directory / 'reference', schemas['reference'], i)}
+            output = matcher.match(verbose=False)
+            for result in RESULT_SETS[:3]:
+                folder = directory / 'results' / result
+                folder.mkdir(parents=True, exist_ok=True)
+                data = getattr(output, result).lazy().collect()
+                with _atomic_path(folder / f'{name}.parquet') as path:
+                    data.write_parquet(path)
+            (directory / 'done' / name).touch()
+            matched.append(i)
+        return matched
+
+    def __merge(self, directory, verbose):
+        # The results of every partition, checked for data leaks against the cleaned source
+        directory = Path(directory)
+        manifest = json.loads((directory / MANIFEST).read_text())
+        missing = [
+            i for i in range(manifest['n_partitions']) if not (directory / 'done' / f'partition-{i:05d}').exists()
+        ]
+        if missing:
+            raise ValueError(
+                f"{len(missing)} of {manifest['n_partitions']} partitions are not matched yet, the first being "
+                f"{missing[:10]}. Run more workers; for partitions of stopped workers, remove their claims first."
+            )
+
+        results = {}
+        for name in RESULT_SETS[:3]:
+            files = sorted((directory / 'results' / name).glob('*.parquet'))
+            # an all-null column is a Null column in some partitions and typed in others
+            results[name] = pl.concat([pl.scan_parquet(file) for file in files], how='diagonal_relaxed')
+        output = DataFrameMatcherResults(no_demo=pl.scan_parquet(directory / 'no_demo.parquet'), **results)
+
+        if verbose:
+            self.__output_summary(
+                fuzzy_matched_df=output.fuzzy_matched,
+                fuzzy_unmatched_df=output.fuzzy_unmatched,
+                submissions_to_fuzzy_df=pl.scan_parquet(directory / 'submissions.parquet'),
+                fuzzy_without_demo_df=output.no_demo,
+                exact_match_df=output.exact_matched
+            )
+
+        return output
+
+
+def _bucket(columns: list[str], n_buckets: int) -> pl.Expr:
+    # The bucket of a date of birth and block values; fields are renamed so source and reference hash alike
+    return (
+        pl.struct(pl.col(col).alias(f'field_{i}') for i, col in enumerate(columns))
+        .hash(seed=0)
+        .mod(n_buckets)
+        .alias(BUCKET)
+    )
+
+
+def _write_buckets(df: pl.LazyFrame, directory: Path, chunk_size: int) -> tuple[pl.Schema, int]:
+    # Write the rows of df to one folder per bucket, running its plan once and splitting it a chunk at a time
+    directory.mkdir(parents=True, exist_ok=True)
+    staging = directory / 'staging.parquet'
+    helpers.sink_parquet(df, staging)
+    staged = pl.scan_parquet(staging)
+    n_rows = staged.select(pl.len()).collect().item()
+    for chunk_index, offset in enumerate(range(0, n_rows, chunk_size)):
+        chunk = staged.slice(offset, chunk_size).collect()
+        for (bucket,), part in chunk.partition_by(BUCKET, as_dict=True).items():
+            folder = directory / f'bucket={bucket:05d}'
+            folder.mkdir(exist_ok=True)
+            part.drop(BUCKET).write_parquet(folder / f'part-{chunk_index:05d}.parquet')
+    schema = pl.read_parquet_schema(staging)
+    schema.pop(BUCKET)
+    staging.unlink()
+    return pl.Schema(schema), n_rows
+
+
+def _read_bucket(directory: Path, schema: pl.Schema, i: int) -> pl.DataFrame:
+    # The rows of one bucket, or an empty frame with the same columns
+    folder = directory / f'bucket={i:05d}'
+    if not folder.exists():
+        return pl.DataFrame(schema=schema)
+    return pl.read_parquet(folder / '*.parquet').rechunk()
+
+
+def _load_partitioned(directory: str | Path) -> 'DataFrameMatcher':
+    # The matcher settings saved by DataFrameMatcher.partition
+    import pickle
+
+    directory = Path(directory)
+    if not (directory / MANIFEST).exists():
+        raise FileNotFoundError(f"No {MANIFEST} in {directory}; run DataFrameMatcher.partition first")
+    return pickle.loads((directory / 'matcher.pkl').read_bytes())['matcher']
+
+
+def _claim(path: Path) -> bool:
+    # Create a claim file, unless another worker already did; O_EXCL makes the check and the create atomic
+    import socket
+
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, 'w') as file:
+        file.write(f'{socket.gethostname()} {os.getpid()}\n')
+    return True
+
+
+@contextlib.contextmanager
+def _atomic_path(path: Path):
+    # A temporary path next to path, moved into place once written, so readers never see a partial file
+    temporary = path.with_name(f'.{path.name}.{uuid.uuid4().hex}.tmp')
+    try:
+        yield temporary
+        os.replace(temporary, path)
+    finally:
+        temporary.unlink(missing_ok=True)
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Write a file that readers either see whole or not at all
+    with _atomic_path(path) as temporary:
+        temporary.write_bytes(data)
+
+
+def _clean_name(name: str | None, keep_spaces: bool = False) -> str | None:
+    # helpers.clean_name for a single name
+    if name is None:
+        return None
+    if keep_spaces:
+        return re.sub('[^a-zA-Z]+', ' ', name).strip().upper()
+    return re.sub('[^a-zA-Z]', '', name).upper()
+
+
+def _lookup_date(value: date | str | None) -> date | None:
+    # helpers.date_format for a single value, skipping polars for dates and ISO strings
+    if value is None or (isinstance(value, date) and not isinstance(value, datetime)):
+        return value
+    if isinstance(value, datetime):
+        return value.date()
+    if re.fullmatch(r'\d{4}-\d{2}-\d{2}', value):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            return None
+    df = pl.DataFrame({'value': [value]})
+    return df.select(helpers.date_format(df=df, col='value')).item()
+
+
+def _lookup_join(query: dict, ref_row: dict, drop: set, suffix: str) -> dict:
+    # The query joined with a reference row, naming and dropping columns the same way as the polars joins
+    record = dict(query)
+    for col, value in ref_row.items():
+        if col not in drop:
+            record[f'{col}{suffix}' if col in query else col] = value
+    return record
+
+
+def _partition_schema(directory: Path) -> pl.Schema | None:
+    # The schema of the files already written for a match category, if any
+    file = next(directory.glob('*/*.parquet'), None)
+    return None if file is None else pl.read_parquet_schema(file)
+
+
+def _conform_schema(df: pl.LazyFrame, directory: Path) -> pl.LazyFrame:
+    # Cast a result set to the schema of the previous runs of its match category. All-null columns become
+    # strings on the first run; a column that only ever held nulls is widened to the type of a later run.
+    schema = _partition_schema(directory)
+    current = df.collect_schema()
+    if schema is None:
+        return df.with_columns(pl.col(col).cast(pl.String) for col, dtype in current.items() if dtype == pl.Null)
+    extra = [col for col in current if col not in schema]
+    if extra:
+        raise ValueError(f"Columns not in the previous runs: {', '.join(extra)}. Use overwrite=True to start over.")
+    changed = [col for col, dtype in schema.items() if current.get(col, pl.Null) not in (dtype, pl.Null)]
+    if changed:
+        files = sorted(directory.glob('*/*.parquet'))
+        has_values = pl.scan_parquet(files).select(pl.col(changed).is_not_null().any()).collect().row(0, named=True)
+        typed = [col for col in changed if has_values[col]]
+        if typed:
+            raise ValueError(f"Columns with different types from the previous runs: {', '.join(typed)}. "
+                             "Use overwrite=True to start over.")
+        widened = {col: current[col] for col in changed}
+        for file in files:
+            with _atomic_path(file) as temporary:
+                pl.read_parquet(file).with_columns(
+                    pl.lit(None, dtype=dtype).alias(col) for col, dtype in widened.items()
+                ).write_parquet(temporary)
+        schema.update(widened)
+    return df.select(
+        pl.col(col).cast(dtype) if col in current else pl.lit(None, dtype=dtype).alias(col)
+        for col, dtype in schema.items()
+    )
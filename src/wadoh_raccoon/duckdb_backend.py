@@ -0,0 +1,230 @@
+"""
+An embedded DuckDB execution backend for `DataFrameMatcher` (`backend='duckdb'`).
+
+The exact match join, the date of birth (and block) join that generates fuzzy candidates and the `day_max`
+window run inside a local DuckDB database, which spills to disk and runs its hash joins in parallel, so the
+candidate pairs never have to fit in memory at once. They are streamed out ordered by key, in batches holding
+every candidate of a record, and each batch is scored and ranked by the same polars code as the polars
+backend, so both give the same results.
+
+Names and dates are cleaned in DuckDB as well, with SQL that follows `helpers.clean_name` and
+`helpers.date_format`, so the source and reference are only read once, by DuckDB.
+"""
+import tempfile
+from pathlib import Path
+from typing import Iterator
+import polars as pl
+from wadoh_raccoon.utils import helpers
+
+# Names of the temporary columns used to keep the polars row order and to rank candidates
+SRC_ROW = '___src_row___'
+REF_ROW = '___ref_row___'
+RANK = '___rank___'
+
+# The formats helpers.date_format tries, in the same order, as DuckDB formats. chrono's %B also reads
+# abbreviated month names, which DuckDB reads with %b.
+DATE_FORMATS = [
+    '%Y-%m-%d',               # %F
+    '%Y-%m-%d %H:%M:%S',      # %F %T
+    '%m/%d/%y',               # %D
+    '%a %b %-d %H:%M:%S %Y',  # %c
+    '%m-%d-%Y',
+    '%d-%m-%Y',
+    '%m/%d/%Y',
+    '%d/%m/%Y',
+    '%B %d, %Y',
+    '%b %d, %Y',
+]
+
+
+class DuckDBBackend:
+    """
+    Settings of the DuckDB backend.
+
+    Parameters
+    ----------
+    temp_directory: str | Path (optional)
+        Where the database and its spill files are written. Defaults to a new temporary directory, removed
+        after matching.
+    memory_limit: str (optional)
+        The most memory DuckDB uses before spilling to disk, e.g. '8GB'. Defaults to DuckDB's own limit
+        (80% of the RAM).
+    threads: int (optional)
+        The number of DuckDB threads. Defaults to one per core.
+    batch_size: int
+        The number of candidate pairs fetched and scored at a time. A batch grows past this to keep all the
+        candidates of a record together.
+
+    Examples
+    --------
+    ```python
+    from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+    from wadoh_raccoon.duckdb_backend import DuckDBBackend
+
+    instance = DataFrameMatcher(
+        df_src=submissions,
+        df_ref=cases,
+        first_name='first_name',
+        last_name='last_name',
+        dob='dob',
+        spec_col_date='collection_date',
+        key='submission_number',
+        backend=DuckDBBackend(memory_limit='8GB', temp_directory='/scratch')
+    )
+    result = instance.match()
+    ```
+    """
+    def __init__(
+        self,
+        temp_directory: str | Path | None = None,
+        memory_limit: str | None = None,
+        threads: int | None = None,
+        batch_size: int = 100_000
+    ):
+        self.temp_directory = temp_directory
+        self.memory_limit = memory_limit
+        self.threads = threads
+        self.batch_size = batch_size
+
+    def connect(self, directory: str | Path):
+        """A connection to a new database in `directory`, spilling to the same directory"""
+        duckdb = helpers.import_optional('duckdb', 'duckdb')
+        config = {
+            'temp_directory': str(Path(directory) / 'spill'),
+            # Candidates are ranked with row_number over ordered windows; keep the order they are produced in
+            'preserve_insertion_order': True
+        }
+        if self.memory_limit is not None:
+            config['memory_limit'] = str(self.memory_limit)
+        if self.threads is not None:
+            config['threads'] = int(self.threads)
+        return duckdb.connect(str(Path(directory) / 'match.duckdb'), config=config)
+
+    def work_directory(self) -> tempfile.TemporaryDirectory:
+        """A temporary directory for the database, inside `temp_directory` if given"""
+        if self.temp_directory is not None:
+            Path(self.temp_directory).mkdir(parents=True, exist_ok=True)
+        return tempfile.TemporaryDirectory(dir=self.temp_directory, prefix='wadoh-raccoon-duckdb-')
+
+
+def quote(name: str) -> str:
+    """A quoted SQL identifier"""
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def register(con, name: str, df: pl.DataFrame | pl.LazyFrame, directory: str | Path) -> None:
+    """
+    Make a polars frame available to DuckDB as the view `name`.
+
+    DataFrames are shared with DuckDB through Arrow without copying. LazyFrames are first streamed to a
+    Parquet file in `directory`, which DuckDB reads as needed.
+    """
+    if isinstance(df, pl.LazyFrame):
+        path = Path(directory) / f'{name}.parquet'
+        helpers.sink_parquet(df, path)
+        con.read_parquet(str(path)).create_view(name)
+    else:
+        con.register(f'{name}_arrow', df.to_arrow())
+        con.execute(f"CREATE VIEW {quote(name)} AS SELECT * FROM {quote(name + '_arrow')}")
+
+
+def clean_name(column: str) -> str:
+    """The SQL of `helpers.clean_name`: the letters of a name, in uppercase"""
+    return f"upper(regexp_replace({quote(column)}, '[^a-zA-Z]', '', 'g'))"
+
+
+def date_format(column: str, dtype: pl.DataType) -> str:
+    """
+    The SQL of `helpers.date_format`: a temporal column as a date, or a string column parsed with the first of
+    `DATE_FORMATS` that fits. Unlike chrono, DuckDB allows trailing whitespace and reads the two digit year 69
+    as 1969, so those are handled here to give the same dates.
+    """
+    col = quote(column)
+    if dtype.is_temporal():
+        return f'CAST({col} AS DATE)'
+    dates = []
+    for fmt in DATE_FORMATS:
+        date = f"CAST(try_strptime({col}, '{fmt}') AS DATE)"
+        if '%y' in fmt:
+            date = f"CASE WHEN year({date}) = 1969 THEN CAST({date} + INTERVAL 100 YEAR AS DATE) ELSE {date} END"
+        dates.append(date)
+    return f"CASE WHEN NOT regexp_matches({col}, '\\s$') THEN coalesce({', '.join(dates)}) END"
+
+
+def clean_columns(
+    schema: pl.Schema,
+    first_name: str,
+    last_name: str,
+    spec_col_date: str,
+    dob: str,
+    output_spec_col_name: str,
+    output_dob_name: str
+) -> list[str]:
+    """
+    The select list that cleans a table like `DataFrameMatcher.clean_src` and `clean_ref`: the columns of
+    `schema`, then the cleaned names and dates. Like polars, a cleaned column replaces one of the same name.
+    """
+    cleaned = {
+        'first_name_clean': clean_name(first_name),
+        'last_name_clean': clean_name(last_name),
+        output_spec_col_name: date_format(spec_col_date, schema[spec_col_date]),
+        output_dob_name: date_format(dob, schema[dob])
+    }
+    columns = [f'{cleaned.pop(col)} AS {quote(col)}' if col in cleaned else quote(col) for col in schema]
+    return columns + [f'{sql} AS {quote(col)}' for col, sql in cleaned.items()]
+
+
+def join_columns(left: list[str], right: list[str], right_on: list[str], suffix: str) -> list[str]:
+    """
+    The select list of a polars left join of `left` and `right`: the left columns, then the right columns
+    except the join keys, with `suffix` added to names already on the left.
+    """
+    columns = [f'l.{quote(col)}' for col in left]
+    for col in right:
+        if col in right_on:
+            continue
+        alias = f'{col}{suffix}' if col in left else col
+        columns.append(f'r.{quote(col)} AS {quote(alias)}')
+    return columns
+
+
+def join_condition(left_on: list[str], right_on: list[str]) -> str:
+    """Equality on every pair of join keys; like polars, null keys do not join"""
+    return ' AND '.join(f'l.{quote(left)} = r.{quote(right)}' for left, right in zip(left_on, right_on))
+
+
+def fetch_table(con, sql: str) -> pl.DataFrame:
+    """The result of a query as a DataFrame"""
+    result = con.execute(sql)
+    # to_arrow_table and to_arrow_reader replaced fetch_arrow_table and fetch_record_batch in duckdb 1.4
+    fetch = getattr(result, 'to_arrow_table', None) or result.fetch_arrow_table
+    return pl.from_arrow(fetch())
+
+
+def fetch_batches(con, sql: str, batch_size: int):
+    """The result of a query as Arrow record batches of up to `batch_size` rows"""
+    result = con.execute(sql)
+    fetch = getattr(result, 'to_arrow_reader', None) or result.fetch_record_batch
+    return fetch(batch_size)
+
+
+def key_batches(reader, key: list[str]) -> Iterator[pl.DataFrame]:
+    """
+    Read Arrow record batches ordered by `key` as polars DataFrames, moving the rows of a key split across
+    two batches into the later one, so every key is whole within one batch.
+    """
+    carry = None
+    for batch in reader:
+        df = pl.from_arrow(batch)
+        if carry is not None:
+            df = pl.concat([carry, df], how='vertical_relaxed')
+        if df.height == 0:
+            continue
+        last = df.select(key).row(-1)
+        is_last = pl.all_horizontal(pl.col(col).eq_missing(value) for col, value in zip(key, last))
+        carry = df.filter(is_last)
+        done = df.filter(~is_last)
+        if done.height:
+            yield done
+    if carry is not None and carry.height:
+        yield carry
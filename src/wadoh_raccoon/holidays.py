@@ -0,0 +1,146 @@
+"""
+Holiday calendars for the business-day windows of `DataFrameMatcher`.
+
+The bundled calendars are computed by rule for every year in `YEARS`, with the observed dates of holidays
+falling on a weekend (Saturday holidays are observed on the Friday before, Sunday holidays on the Monday after):
+
+- 'us_federal': the US federal holidays (5 U.S.C. 6103).
+- 'wa_state': the Washington state legal holidays (RCW 1.16.050), which add the day after Thanksgiving and
+  do not include Columbus Day.
+- 'us_wa': both of the above.
+"""
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Iterable
+
+# Years covered by the bundled calendars
+YEARS = range(1950, 2101)
+
+MONDAY, THURSDAY = 0, 3
+
+
+def nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The `n`th `weekday` (0 is Monday) of a month, or the last one when `n` is -1"""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def observed(day: date) -> date:
+    """The day a holiday is observed: the Friday before a Saturday, the Monday after a Sunday"""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def us_federal(year: int) -> list[date]:
+    """The observed US federal holidays of a year"""
+    days = [
+        observed(date(year, 1, 1)),
+        nth_weekday(year, 2, MONDAY, 3),  # Washington's Birthday
+        nth_weekday(year, 5, MONDAY, -1),  # Memorial Day
+        observed(date(year, 7, 4)),
+        nth_weekday(year, 9, MONDAY, 1),  # Labor Day
+        nth_weekday(year, 10, MONDAY, 2),  # Columbus Day
+        observed(date(year, 11, 11)),
+        nth_weekday(year, 11, THURSDAY, 4),  # Thanksgiving Day
+        observed(date(year, 12, 25)),
+    ]
+    if year >= 1986:
+        days.append(nth_weekday(year, 1, MONDAY, 3))  # Martin Luther King Jr. Day
+    if year >= 2021:
+        days.append(observed(date(year, 6, 19)))  # Juneteenth
+    return sorted(days)
+
+
+def wa_state(year: int) -> list[date]:
+    """The observed Washington state legal holidays of a year"""
+    thanksgiving = nth_weekday(year, 11, THURSDAY, 4)
+    days = [
+        observed(date(year, 1, 1)),
+        nth_weekday(year, 2, MONDAY, 3),  # Presidents' Day
+        nth_weekday(year, 5, MONDAY, -1),  # Memorial Day
+        observed(date(year, 7, 4)),
+        nth_weekday(year, 9, MONDAY, 1),  # Labor Day
+        observed(date(year, 11, 11)),
+        thanksgiving,
+        thanksgiving + timedelta(days=1),  # Native American Heritage Day
+        observed(date(year, 12, 25)),
+    ]
+    if year >= 1986:
+        days.append(nth_weekday(year, 1, MONDAY, 3))  # Martin Luther King Jr. Day
+    if year >= 2022:
+        days.append(observed(date(year, 6, 19)))  # Juneteenth
+    return sorted(days)
+
+
+CALENDARS = {
+    'us_federal': (us_federal,),
+    'wa_state': (wa_state,),
+    'us_wa': (us_federal, wa_state),
+}
+
+
+def list_calendars() -> list[str]:
+    """List the names of the bundled calendars."""
+    return sorted(CALENDARS)
+
+
+@lru_cache
+def calendar(name: str) -> tuple[date, ...]:
+    """
+    The holidays of a bundled calendar for every year in `YEARS`.
+
+    Parameters
+    ----------
+    name: str
+        'us_federal', 'wa_state' or 'us_wa'.
+
+    Returns
+    -------
+    tuple[date, ...]
+        the sorted holidays
+    """
+    if name not in CALENDARS:
+        raise ValueError(f"Unknown holiday calendar: '{name}'. Bundled calendars: {', '.join(list_calendars())}")
+    return tuple(sorted({day for rule in CALENDARS[name] for year in YEARS for day in rule(year)}))
+
+
+def holiday_dates(holidays: str | date | Iterable[str | date] | None) -> list[date]:
+    """
+    Combine bundled calendars and extra dates into one list of holidays.
+
+    Parameters
+    ----------
+    holidays: str | date | Iterable[str | date] | None
+        Calendar names (see `list_calendars`) and/or dates, e.g. `['us_wa', date(2024, 12, 24)]`.
+
+    Returns
+    -------
+    list[date]
+        the sorted, unique holidays (empty for None)
+
+    Examples
+    --------
+    ```{python}
+    from datetime import date
+    from wadoh_raccoon.holidays import holiday_dates
+
+    [day for day in holiday_dates(['us_wa', date(2024, 12, 24)]) if day.year == 2024]
+    ```
+    """
+    if holidays is None:
+        return []
+    if isinstance(holidays, (str, date)):
+        holidays = [holidays]
+    days = set()
+    for holiday in holidays:
+        if isinstance(holiday, str):
+            days.update(calendar(holiday))
+        else:
+            days.add(holiday)
+    return sorted(days)
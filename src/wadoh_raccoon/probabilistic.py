@@ -0,0 +1,327 @@
+import json
+import math
+from pathlib import Path
+import polars as pl
+
+
+class FellegiSunterModel:
+    """
+    A Fellegi-Sunter probabilistic record linkage model.
+
+    Scores candidate pairs by how informative each field agreement is, instead of a fixed threshold
+    on the average name similarity. Each candidate pair gets a comparison vector: a similarity band for
+    the first and last names and a distance band for the specimen collection dates. The m probabilities
+    (chance of each band among true matches) and u probabilities (chance among non-matches) are
+    estimated with expectation-maximization over the distinct comparison patterns, so each EM step is a
+    handful of grouped aggregations no matter how many pairs there are. Each pair then gets a
+    log2 likelihood ratio `match_weight` and a `match_probability`.
+
+    Birthdate and any block fields are join keys when candidates are generated, so every candidate pair
+    agrees on them. They carry no weight within the candidates and are accounted for by the prior
+    (`lambda_`) instead.
+
+    A fitted model can be saved and loaded, so later runs only score and skip estimation.
+
+    Parameters
+    ----------
+    name_bands: tuple[int, ...] (optional)
+        Ascending 0-100 name similarity cutoffs. A name scoring at or above the i-th cutoff is in band i + 1,
+        and below the first cutoff in band 0. Defaults to (70, 85, 95).
+    day_bands: tuple[int, ...] (optional)
+        Descending day distances between collection dates. A pair within the i-th distance is in band i + 1,
+        and further apart than the first distance in band 0. Defaults to (30, 7, 0).
+    term_frequency: bool (optional)
+        Adjust the weight of an exact last name agreement by how common the surname is among the candidate
+        pairs, so a match on a rare surname counts for more than a match on a common one. Defaults to True.
+    max_iter: int (optional)
+        The maximum number of EM iterations. Defaults to 100.
+    tol: float (optional)
+        EM stops once no probability changes by more than `tol`. Defaults to 1e-6.
+
+    Examples
+    --------
+    ```python
+    from wadoh_raccoon import dataframe_matcher as dfm
+    from wadoh_raccoon.probabilistic import FellegiSunterModel
+
+    matcher = dfm.DataFrameMatcher(
+        df_src=your_df,
+        df_ref=reference_df,
+        first_name=('first_name', 'first_name_reference'),
+        last_name=('last_name', 'last_name_reference'),
+        dob='birth_date',
+        spec_col_date=('sub_collection_date', 'ref_collection_date'),
+        key='submission_number',
+        scoring='probabilistic',
+        threshold=90  # match probability, as a percentage
+    )
+    result = matcher.match()
+
+    # save the fitted model and reuse it without re-estimating
+    matcher.model.save('model.json')
+    model = FellegiSunterModel.load('model.json')
+    ```
+    """
+
+    # Comparison level columns added to candidate pairs
+    LEVELS = ['first_name_level', 'last_name_level', 'collection_date_level']
+
+    def __init__(
+        self,
+        name_bands: tuple[int, ...] = (70, 85, 95),
+        day_bands: tuple[int, ...] = (30, 7, 0),
+        term_frequency: bool = True,
+        max_iter: int = 100,
+        tol: float = 1e-6
+    ):
+        self.name_bands = tuple(name_bands)
+        self.day_bands = tuple(day_bands)
+        self.term_frequency = term_frequency
+        self.max_iter = max_iter
+        self.tol = tol
+
+        # fitted parameters
+        self.lambda_ = None
+        self.m = None
+        self.u = None
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.lambda_ is not None
+
+    def __n_levels(self, level):
+        return len(self.day_bands if level == 'collection_date_level' else self.name_bands) + 1
+
+    def __name_band(self, score):
+        expr = pl.lit(0)
+        for i, cutoff in enumerate(self.name_bands):
+            expr = pl.when(score >= cutoff).then(pl.lit(i + 1)).otherwise(expr)
+        return expr
+
+    def __day_band(self, days):
+        expr = pl.lit(0)
+        for i, distance in enumerate(self.day_bands):
+            expr = pl.when(days <= distance).then(pl.lit(i + 1)).otherwise(expr)
+        return expr
+
+    def comparison_vectors(self, pairs: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
+        """
+        Add comparison levels to scored candidate pairs.
+
+        Parameters
+        ----------
+        pairs: pl.DataFrame | pl.LazyFrame
+            candidate pairs scored by `DataFrameMatcher.score`
+
+        Returns
+        -------
+        pl.DataFrame | pl.LazyFrame
+            `pairs` with `first_name_level`, `last_name_level` and `collection_date_level` columns.
+            Levels are null for source records without any candidate.
+        """
+        # WDRS is known to switch first and last names, so compare in whichever order scores better
+        swapped = pl.col('reverse_match_ratio') > pl.col('match_ratio')
+        first_name = pl.when(swapped).then('reverse_first_name_result').otherwise('first_name_result')
+        last_name = pl.when(swapped).then('reverse_last_name_result').otherwise('last_name_result')
+        days = (pl.col('reference_collection_date') - pl.col('submitted_collection_date')).dt.total_days().abs()
+        has_candidate = pl.col('last_name_clean_right').is_not_null()
+
+        return pairs.with_columns(
+            pl.when(has_candidate).then(self.__name_band(first_name)).cast(pl.Int8).alias('first_name_level'),
+            pl.when(has_candidate).then(self.__name_band(last_name)).cast(pl.Int8).alias('last_name_level'),
+            pl.when(has_candidate).then(self.__day_band(days)).cast(pl.Int8).alias('collection_date_level'),
+        )
+
+    def __probability(self, level, params):
+        # Look up the probability of each level; missing comparisons carry no information
+        return (
+            pl.col(level)
+            .replace_strict(list(range(len(params[level]))), params[level], default=None, return_dtype=pl.Float64)
+            .fill_null(1.0)
+        )
+
+    def fit(self, pairs: pl.DataFrame | pl.LazyFrame):
+        """
+        Estimate the model parameters with expectation-maximization.
+
+        Parameters
+        ----------
+        pairs: pl.DataFrame | pl.LazyFrame
+            candidate pairs with comparison levels (see `comparison_vectors`)
+
+        Returns
+        -------
+        FellegiSunterModel
+            the fitted model
+        """
+        # EM only needs how often each distinct comparison pattern occurs
+        patterns = (
+            pairs
+            .lazy()
+            .filter(pl.any_horizontal(pl.col(self.LEVELS).is_not_null()))
+            .group_by(self.LEVELS)
+            .agg(pl.len().cast(pl.Float64).alias('n'))
+            .collect()
+        )
+        if patterns.is_empty():
+            raise ValueError("Cannot fit a Fellegi-Sunter model without any candidate pairs")
+
+        # Start from the level frequencies for non-matches (most candidate pairs are non-matches)
+        # and from agreement-heavy guesses for matches
+        lambda_ = 0.1
+        m, u = {}, {}
+        for level in self.LEVELS:
+            n_levels = self.__n_levels(level)
+            counts = patterns.group_by(level).agg(pl.col('n').sum()).drop_nulls()
+            total = counts['n'].sum()
+            frequencies = dict(zip(counts[level].to_list(), counts['n'].to_list()))
+            u[level] = [frequencies.get(i, 0.0) / total for i in range(n_levels)]
+            guess = [2.0 ** (2 * i) for i in range(n_levels)]
+            m[level] = [g / sum(guess) for g in guess]
+
+        for _ in range(self.max_iter):
+            m, u = self.__clip(m), self.__clip(u)
+
+            # E step: probability that each pattern is a match
+            expected = patterns.with_columns(
+                (pl.lit(lambda_) * pl.reduce(lambda a, b: a * b, [self.__probability(lv, m) for lv in self.LEVELS]))
+                .alias('p_m'),
+                (pl.lit(1 - lambda_) * pl.reduce(lambda a, b: a * b, [self.__probability(lv, u) for lv in self.LEVELS]))
+                .alias('p_u'),
+            ).with_columns(
+                (pl.col('p_m') / (pl.col('p_m') + pl.col('p_u'))).alias('g')
+            ).with_columns(
+                (pl.col('n') * pl.col('g')).alias('n_m'),
+                (pl.col('n') * (1 - pl.col('g'))).alias('n_u'),
+            )
+
+            # M step: re-estimate the prior and per-level probabilities from the weighted counts
+            new_lambda = expected['n_m'].sum() / expected['n'].sum()
+            new_m, new_u = {}, {}
+            for level in self.LEVELS:
+                counts = expected.group_by(level).agg(pl.col('n_m').sum(), pl.col('n_u').sum()).drop_nulls()
+                n_m = dict(zip(counts[level].to_list(), counts['n_m'].to_list()))
+                n_u = dict(zip(counts[level].to_list(), counts['n_u'].to_list()))
+                total_m, total_u = sum(n_m.values()), sum(n_u.values())
+                new_m[level] = [n_m.get(i, 0.0) / total_m if total_m else 0.0 for i in range(self.__n_levels(level))]
+                new_u[level] = [n_u.get(i, 0.0) / total_u if total_u else 0.0 for i in range(self.__n_levels(level))]
+
+            change = max(
+                [abs(new_lambda - lambda_)] +
+                [abs(a - b) for level in self.LEVELS for a, b in zip(new_m[level], m[level])] +
+                [abs(a - b) for level in self.LEVELS for a, b in zip(new_u[level], u[level])]
+            )
+            lambda_, m, u = new_lambda, new_m, new_u
+            if change < self.tol:
+                break
+
+        self.lambda_ = min(max(lambda_, 1e-6), 1 - 1e-6)
+        self.m, self.u = self.__clip(m), self.__clip(u)
+        return self
+
+    @staticmethod
+    def __clip(params):
+        return {level: [min(max(p, 1e-6), 1 - 1e-6) for p in probabilities] for level, probabilities in params.items()}
+
+    def score(self, pairs: pl.DataFrame | pl.LazyFrame) -> pl.DataFrame | pl.LazyFrame:
+        """
+        Add a `match_weight` and `match_probability` to candidate pairs.
+
+        Parameters
+        ----------
+        pairs: pl.DataFrame | pl.LazyFrame
+            candidate pairs with comparison levels (see `comparison_vectors`)
+
+        Returns
+        -------
+        pl.DataFrame | pl.LazyFrame
+            `pairs` with the log2 likelihood ratio `match_weight` and the posterior `match_probability`
+        """
+        if not self.is_fitted:
+            raise ValueError("The model must be fitted (or loaded) before scoring")
+
+        weights = {
+            level: [math.log2(m / u) for m, u in zip(self.m[level], self.u[level])]
+            for level in self.LEVELS
+        }
+        weight = (
+            # source records without any candidate get no weight at all
+            pl.when(pl.any_horizontal(pl.col(self.LEVELS).is_not_null()))
+            .then(pl.sum_horizontal([
+                pl.col(level)
+                .replace_strict(list(range(len(weights[level]))), weights[level], default=None, return_dtype=pl.Float64)
+                .fill_null(0.0)
+                for level in self.LEVELS
+            ]))
+        )
+
+        if self.term_frequency:
+            # An exact surname agreement is as likely among non-matches as the surname is common
+            swapped = pl.col('reverse_match_ratio') > pl.col('match_ratio')
+            surname = pl.when(swapped).then('first_name_clean_right').otherwise('last_name_clean_right')
+            top_level = len(self.name_bands)
+            u_top = self.u['last_name_level'][top_level]
+            frequencies = (
+                pairs
+                .filter(pl.col('last_name_clean_right').is_not_null())
+                .group_by('last_name_clean_right')
+                .agg(pl.len().alias('___surname_frequency___'))
+                .select(
+                    pl.col('last_name_clean_right').alias('___surname___'),
+                    pl.col('___surname_frequency___') / pl.col('___surname_frequency___').sum()
+                )
+            )
+            pairs = (
+                pairs
+                .with_columns(surname.alias('___surname___'))
+                .join(frequencies, on='___surname___', how='left', maintain_order='left')
+            )
+            weight = weight + (
+                pl.when(pl.col('last_name_level') == top_level)
+                .then((pl.lit(u_top) / pl.col('___surname_frequency___')).log(2))
+                .otherwise(0.0)
+                .fill_null(0.0)
+            )
+
+        prior = math.log2(self.lambda_ / (1 - self.lambda_))
+        scored = pairs.with_columns(weight.alias('match_weight')).with_columns(
+            (1 / (1 + (2.0 ** -(pl.col('match_weight') + prior)))).alias('match_probability')
+        )
+        if self.term_frequency:
+            scored = scored.drop('___surname___', '___surname_frequency___')
+        return scored
+
+    def to_dict(self) -> dict:
+        """The model settings and fitted parameters as a dict."""
+        return {
+            'name_bands': list(self.name_bands),
+            'day_bands': list(self.day_bands),
+            'term_frequency': self.term_frequency,
+            'max_iter': self.max_iter,
+            'tol': self.tol,
+            'lambda': self.lambda_,
+            'm': self.m,
+            'u': self.u,
+        }
+
+    def save(self, path: str | Path):
+        """Save the model to a JSON file."""
+        if not self.is_fitted:
+            raise ValueError("Only fitted models can be saved")
+        Path(path).write_text(json.dumps(self.to_dict(), indent=2))
+
+    @classmethod
+    def load(cls, path: str | Path) -> 'FellegiSunterModel':
+        """Load a model saved with `save`."""
+        params = json.loads(Path(path).read_text())
+        model = cls(
+            name_bands=params['name_bands'],
+            day_bands=params['day_bands'],
+            term_frequency=params['term_frequency'],
+            max_iter=params['max_iter'],
+            tol=params['tol'],
+        )
+        model.lambda_ = params['lambda']
+        model.m = params['m']
+        model.u = params['u']
+        return model
@@ -0,0 +1,186 @@
+from typing import Callable
+import numpy as np
+import polars as pl
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import DamerauLevenshtein, JaroWinkler
+
+
+# A batch scorer takes two string columns and returns a column of 0-100 similarity scores
+BatchScorer = Callable[[pl.Series, pl.Series], pl.Series]
+
+# Registered scorers by name, and the names of scorers that compare whole words (tokens)
+_SCORERS: dict[str, BatchScorer] = {}
+_TOKENIZED: set[str] = set()
+# The rapidfuzz function (and scale) behind each built-in batch scorer, to score a few pairs without building columns
+_PAIR_SCORERS: dict[BatchScorer, tuple[Callable[[str, str], float], int]] = {}
+
+
+def register_scorer(
+    name: str,
+    scorer: BatchScorer | None = None,
+    tokenized: bool = False,
+    overwrite: bool = False
+):
+    """ Register Scorer
+
+    Add a batch scorer to the scorer registry so it can be selected by name in `DataFrameMatcher`.
+
+    Usage
+    -----
+    A batch scorer takes two polars Series of the same length (left and right names) and returns a
+    Series (or numpy array) of similarity scores between 0 and 100, one per pair. Null names should
+    score 0. Scores are rounded to whole numbers so they can be compared against the fuzzy matching
+    threshold. Can be called directly or used as a decorator.
+
+    Parameters
+    ----------
+    name: str
+        Name used to select the scorer.
+    scorer: BatchScorer (optional)
+        The batch scorer. If omitted, `register_scorer` returns a decorator.
+    tokenized: bool (optional)
+        Whether the scorer compares whole words. Tokenized scorers are given names with word breaks
+        kept (e.g. hyphenated surnames split into words) instead of the fully cleaned names.
+        Defaults to False.
+    overwrite: bool (optional)
+        Whether to replace a scorer already registered under `name`. Defaults to False.
+
+    Returns
+    -------
+    BatchScorer:
+        the registered scorer
+
+    Examples
+    --------
+    ```{python}
+    import polars as pl
+    from wadoh_raccoon import scorers
+
+    @scorers.register_scorer('first_letter')
+    def first_letter(left: pl.Series, right: pl.Series) -> pl.Series:
+        return (left.str.slice(0, 1) == right.str.slice(0, 1)).fill_null(False).cast(pl.Int64) * 100
+
+    scorers.list_scorers()
+    ```
+    """
+    def decorator(func: BatchScorer) -> BatchScorer:
+        if name in _SCORERS and not overwrite:
+            raise ValueError(f"A scorer named '{name}' is already registered. Set overwrite=True to replace it.")
+        _SCORERS[name] = func
+        if tokenized:
+            _TOKENIZED.add(name)
+        else:
+            _TOKENIZED.discard(name)
+        return func
+
+    if scorer is None:
+        return decorator
+    return decorator(scorer)
+
+
+def get_scorer(scorer: str | BatchScorer) -> BatchScorer:
+    """Look up a registered batch scorer by name. Callables are returned as-is."""
+    if callable(scorer):
+        return scorer
+    try:
+        return _SCORERS[scorer]
+    except KeyError:
+        raise ValueError(f"Unknown scorer: '{scorer}'. Registered scorers: {', '.join(list_scorers())}")
+
+
+def is_tokenized(scorer: str | BatchScorer) -> bool:
+    """Whether a scorer compares whole words and should be given names with word breaks kept."""
+    if callable(scorer):
+        return scorer in [_SCORERS[name] for name in _TOKENIZED]
+    return scorer in _TOKENIZED
+
+
+def list_scorers() -> list[str]:
+    """List the names of all registered scorers."""
+    return sorted(_SCORERS)
+
+
+def apply_scorer(scorer: str | BatchScorer, left: pl.Series, right: pl.Series) -> pl.Series:
+    """ Apply Scorer
+
+    Score two string columns pair by pair with a batch scorer.
+
+    Parameters
+    ----------
+    scorer: str | BatchScorer
+        A registered scorer name or a batch scorer.
+    left: pl.Series
+        The left names.
+    right: pl.Series
+        The right names.
+
+    Returns
+    -------
+    pl.Series:
+        an Int64 column of 0-100 similarity scores, rounded half to even
+    """
+    scores = get_scorer(scorer)(left, right)
+    if not isinstance(scores, pl.Series):
+        scores = pl.Series(scores)
+    if scores.dtype.is_float():
+        # round half to even, the same as python's round()
+        scores = pl.Series(np.rint(scores.fill_null(0).to_numpy()).astype(np.int64))
+    return scores.cast(pl.Int64).alias(left.name)
+
+
+def score_pairs(scorer: str | BatchScorer, left: list[str | None], right: list[str | None]) -> list[int]:
+    """ Score Pairs
+
+    Score a few pairs of names, giving the same scores as `apply_scorer`.
+
+    Usage
+    -----
+    Meant for single-record lookups, where building polars columns costs more than scoring. Built-in
+    scorers score pair by pair in Python; any other scorer falls back to `apply_scorer`.
+
+    Parameters
+    ----------
+    scorer: str | BatchScorer
+        A registered scorer name or a batch scorer.
+    left: list[str | None]
+        The left names.
+    right: list[str | None]
+        The right names.
+
+    Returns
+    -------
+    list[int]:
+        0-100 similarity scores, one per pair
+    """
+    batch = get_scorer(scorer)
+    if batch in _PAIR_SCORERS:
+        func, scale = _PAIR_SCORERS[batch]
+        # null names never match; round half to even, the same as the batch scorer
+        return [0 if a is None or b is None else round(func(a, b) * scale) for a, b in zip(left, right)]
+    return apply_scorer(batch, pl.Series(left, dtype=pl.String), pl.Series(right, dtype=pl.String)).to_list()
+
+
+def _rapidfuzz_scorer(scorer, scale: int = 1) -> BatchScorer:
+    # Wrap a rapidfuzz scorer so whole columns are scored natively across all cores
+    def batch(left: pl.Series, right: pl.Series) -> pl.Series:
+        scores = process.cpdist(
+            left.fill_null('').to_numpy(),
+            right.fill_null('').to_numpy(),
+            scorer=scorer,
+            dtype=np.float64,
+            workers=-1
+        )
+        # null names never match
+        nulls = (left.is_null() | right.is_null()).to_numpy()
+        # round half to even, the same as python's round()
+        return pl.Series(left.name, np.where(nulls, 0, np.rint(scores * scale)).astype(np.int64))
+
+    _PAIR_SCORERS[batch] = (scorer, scale)
+    return batch
+
+
+# Built-in scorers
+register_scorer('ratio', _rapidfuzz_scorer(fuzz.ratio))
+register_scorer('jaro_winkler', _rapidfuzz_scorer(JaroWinkler.normalized_similarity, scale=100))
+register_scorer('damerau_levenshtein', _rapidfuzz_scorer(DamerauLevenshtein.normalized_similarity, scale=100))
+register_scorer('token_sort_ratio', _rapidfuzz_scorer(fuzz.token_sort_ratio), tokenized=True)
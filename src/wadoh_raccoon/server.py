@@ -0,0 +1,175 @@
+"""
+A long-running local matching service.
+
+The reference is read and cleaned once, kept in memory, and every request only cleans and matches the
+submitted records against it, so a request takes milliseconds instead of a full `DataFrameMatcher` run.
+
+```
+wadoh-raccoon serve cases.parquet --first-name first_name:first_name_reference \
+    --last-name last_name:last_name_reference --dob birth_date \
+    --spec-col-date sub_collection_date:ref_collection_date --key submission_number --port 8765
+```
+
+Endpoints (JSON in, JSON out):
+
+- `POST /match`: one record (an object) or a micro-batch (a list of objects) with the source column names.
+  Returns the records in `exact_matched`, `fuzzy_matched`, `fuzzy_unmatched` and `no_demo`.
+- `POST /reload`: `{"path": "new_snapshot.parquet"}`. Prepares the new reference while requests keep being
+  served from the current one, then swaps it in.
+- `GET /health`: the number of reference rows and when the reference was loaded.
+"""
+import json
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import polars as pl
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+from wadoh_raccoon.utils import helpers
+
+RESULTS = ['exact_matched', 'fuzzy_matched', 'fuzzy_unmatched', 'no_demo']
+
+
+class MatchService:
+    """
+    Match records against a reference that is prepared once and kept in memory.
+
+    Parameters
+    ----------
+    df_ref: pl.DataFrame | pl.LazyFrame
+        The reference dataframe.
+    **options
+        The other `DataFrameMatcher` parameters (column names, key, threshold, ...), except `df_src`.
+        Probabilistic scoring needs a fitted model, since single records are too few to fit one.
+
+    Examples
+    --------
+    ```python
+    from wadoh_raccoon.server import MatchService
+
+    service = MatchService(
+        reference_df,
+        first_name=('first_name', 'first_name_reference'),
+        last_name=('last_name', 'last_name_reference'),
+        dob='birth_date',
+        spec_col_date=('sub_collection_date', 'ref_collection_date'),
+        key='submission_number'
+    )
+    results = service.match([{'submission_number': 1, 'first_name': 'DAVIS', ...}])
+    ```
+    """
+    def __init__(self, df_ref: pl.DataFrame | pl.LazyFrame, **options):
+        self.options = options
+        self.reload_lock = threading.Lock()
+        self.load(df_ref)
+
+    def load(self, df_ref: pl.DataFrame | pl.LazyFrame) -> None:
+        """Prepare a new reference and swap it in; requests in flight finish on the previous one"""
+        with self.reload_lock:
+            matcher = DataFrameMatcher(df_src=pl.DataFrame(), df_ref=df_ref, **self.options)
+            if matcher.scoring == 'probabilistic' and not matcher.model.is_fitted:
+                raise ValueError("The matching service needs a fitted model for probabilistic scoring")
+            matcher.prepare()
+            # sorted by date of birth, so each request can slice out its candidates instead of joining on all rows
+            matcher.prepared_refs = {
+                name: ref.sort('reference_dob', nulls_last=True) for name, ref in matcher.prepared_refs.items()
+            }
+            # a single assignment, so each request sees either the old or the new reference
+            self.matcher = matcher
+            self.reference_rows = sum(ref.height for ref in matcher.prepared_refs.values())
+            self.loaded_at = datetime.now()
+
+    def source_frame(self, records: list[dict]) -> pl.DataFrame:
+        """The records as a source dataframe, with missing or all-null demographic columns as strings"""
+        matcher = self.matcher
+        df = pl.DataFrame(records, infer_schema_length=None)
+        for col in [matcher.first_name_src, matcher.last_name_src, matcher.dob_src, matcher.spec_col_date_src]:
+            if col not in df.columns:
+                df = df.with_columns(pl.lit(None, dtype=pl.String).alias(col))
+            elif df.schema[col] == pl.Null:
+                df = df.with_columns(pl.col(col).cast(pl.String))
+        return df
+
+    def match(self, records: dict | list[dict]) -> dict[str, list[dict]]:
+        """Match one record or a list of records against the resident reference"""
+        if isinstance(records, dict):
+            records = [records]
+        matcher = self.matcher.with_source(self.source_frame(records))
+        # every candidate shares a date of birth with a record, so only those reference rows take part
+        dobs = matcher.clean_src().get_column('submitted_dob').drop_nulls().unique()
+        matcher.prepared_refs = {name: candidates(ref, dobs) for name, ref in matcher.prepared_refs.items()}
+        output = matcher.match(verbose=False)
+        return {name: getattr(output, name).lazy().collect().to_dicts() for name in RESULTS}
+
+    def health(self) -> dict:
+        return {'reference_rows': self.reference_rows, 'loaded_at': self.loaded_at.isoformat()}
+
+
+def candidates(ref: pl.DataFrame, dobs: pl.Series) -> pl.DataFrame:
+    """The rows of a reference sorted by `reference_dob` with one of the dates of birth `dobs`"""
+    column = ref.get_column('reference_dob')
+    dobs = dobs.cast(column.dtype)
+    starts, ends = column.search_sorted(dobs, side='left'), column.search_sorted(dobs, side='right')
+    return pl.concat([ref.head(0)] + [ref.slice(start, end - start) for start, end in zip(starts, ends) if end > start])
+
+
+class MatchRequestHandler(BaseHTTPRequestHandler):
+    """HTTP endpoints of a `MatchService` (see the module docs)"""
+    service: MatchService = None
+
+    def send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def do_GET(self):
+        if self.path == '/health':
+            self.send_json(200, self.service.health())
+        else:
+            self.send_json(404, {'error': f'Unknown path: {self.path}'})
+
+    def do_POST(self):
+        start = time.perf_counter()
+        try:
+            body = self.read_json()
+            if self.path == '/match':
+                if not isinstance(body, (dict, list)):
+                    raise ValueError("Expected a record or a list of records")
+                result = self.service.match(body)
+            elif self.path == '/reload':
+                self.service.load(helpers.scan_file(body['path']).collect())
+                result = self.service.health()
+            else:
+                self.send_json(404, {'error': f'Unknown path: {self.path}'})
+                return
+        except (ValueError, KeyError, TypeError, OSError, pl.exceptions.PolarsError) as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        result['seconds'] = round(time.perf_counter() - start, 6)
+        self.send_json(200, result)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(service: MatchService, host: str = '127.0.0.1', port: int = 8765) -> ThreadingHTTPServer:
+    """An HTTP server for `service`; requests are handled in threads. Use port 0 for any free port."""
+    handler = type('Handler', (MatchRequestHandler,), {'service': service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(service: MatchService, host: str = '127.0.0.1', port: int = 8765) -> None:
+    """Serve `service` over HTTP until interrupted"""
+    with make_server(service, host, port) as server:
+        print(f"Matching against {service.reference_rows} reference rows at http://{host}:{server.server_port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
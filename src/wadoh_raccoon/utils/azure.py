@@ -1,7 +1,490 @@
+import base64
+import io
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from itertools import islice
+from pathlib import Path, PurePosixPath
+import polars as pl
+from pydantic import BaseModel
 from azure.identity import AzureCliCredential
 from azure.core.credentials import TokenCredential
-from azure.storage.blob import BlobServiceClient
+from azure.storage.blob import BlobClient, BlobServiceClient, ExponentialRetry
 from azure.storage.blob._container_client import ContainerClient
+from wadoh_raccoon.utils import helpers
+
+
+# Default size of the blocks (uploads) and ranges (downloads) transferred in parallel
+BLOCK_SIZE = 4 * 1024 * 1024
+# Maximum number of sub-requests in one Blob Batch request
+BATCH_SIZE = 256
+
+
+class BlobDeleteResults(BaseModel):
+    """ Blob Delete Results
+    Summary of a `blob_delete` call.
+
+    Parameters
+    ----------
+    deleted: int
+        The number of blobs deleted.
+    failed: int
+        The number of blobs that could not be deleted.
+    failures: dict[str, str]
+        The reason each failed blob could not be deleted, by blob name.
+    """
+    deleted: int = 0
+    failed: int = 0
+    failures: dict[str, str] = {}
+
+
+class _MmapWriter:
+    """A seekable, writable stream over a memory-mapped file, so parallel range downloads write
+    straight into the page cache"""
+    def __init__(self, buffer: mmap.mmap):
+        self.buffer = buffer
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self.buffer.seek(offset, whence)
+
+    def tell(self):
+        return self.buffer.tell()
+
+    def write(self, data):
+        self.buffer.write(data)
+        return len(data)
+
+
+class _BlobWriter(io.RawIOBase):
+    """ Blob Writer
+    A writable stream that uploads to a block blob as it is written.
+
+    Written bytes are buffered until a block is full, and full blocks are staged while writing continues, with at
+    most `max_concurrency` blocks in flight. Closing the stream stages the last block and commits the block list,
+    so the blob only appears once the whole file is written. Leaving a `with` block on an error aborts instead,
+    leaving any existing blob as it was; the staged blocks are discarded by Azure after a week.
+    """
+    def __init__(self, blob_client: BlobClient, block_size: int, max_concurrency: int):
+        self.blob_client = blob_client
+        self.block_size = block_size
+        self.max_concurrency = max_concurrency
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.buffer = bytearray()
+        self.block_ids = []
+        self.pending = set()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.block_size:
+            self.__stage(bytes(self.buffer[:self.block_size]))
+            del self.buffer[:self.block_size]
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self.buffer or not self.block_ids:
+                self.__stage(bytes(self.buffer))
+            for future in self.pending:
+                future.result()
+            self.blob_client.commit_block_list(self.block_ids)
+        finally:
+            self.executor.shutdown()
+            super().close()
+
+    def abort(self):
+        """Close the stream without committing the block list"""
+        if self.closed:
+            return
+        try:
+            for future in self.pending:
+                future.cancel()
+        finally:
+            self.executor.shutdown()
+            super().close()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # IOBase.__exit__ would close, and so commit, even when the body raised
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def __stage(self, block: bytes):
+        # Wait for a block to finish before starting another one past the limit
+        while len(self.pending) >= self.max_concurrency:
+            done, self.pending = wait(self.pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                future.result()
+        block_id = base64.b64encode(f'{len(self.block_ids):010d}'.encode()).decode()
+        self.block_ids.append(block_id)
+        self.pending.add(self.executor.submit(self.blob_client.stage_block, block_id, block))
+
+
+def _frame_format(blob_path: str, format: str | None) -> str:
+    """The file format of a frame blob, from `format` or else the blob's extension"""
+    format = format or PurePosixPath(blob_path).suffix.lstrip('.')
+    format = {'arrow': 'ipc', 'feather': 'ipc'}.get(format.lower(), format.lower())
+    if format not in ['parquet', 'csv', 'ipc']:
+        raise ValueError(f"format must be one of: 'parquet', 'csv', 'ipc'; got '{format}'")
+    return format
+
+
+class BlobSession:
+    """ Blob Session
+    A connection to one storage account that is reused across transfers.
+
+    Usage
+    -----
+    Authenticating and opening connections is slow: `AzureCliCredential` shells out to `az` for every token,
+    and each new client opens new TLS connections. A session holds one credential and one `BlobServiceClient`,
+    so its access token and HTTP connection pool are shared by every upload, download and delete made through it.
+    `blob_upload`, `blob_download` and `blob_delete` use sessions from `get_session`, so repeated calls to the same
+    account pay the setup cost once.
+
+    Parameters
+    ----------
+    account: str
+        the storage account name.
+    credential: TokenCredential (optional)
+        The Azure credential used for authentication. Can be any implementation of
+        `azure.core.credentials.TokenCredential` (e.g., `DefaultAzureCredential`, `AzureCliCredential`,
+        `ManagedIdentityCredential`). Defaults to an `AzureCliCredential` shared by all sessions.
+    account_is_url: bool (optional)
+        Whether `account` is supplied as a full URL instead of an account name. Account URLs will be set as the
+        account endpoint as-is, and should be used for testing with Azurite, for example. Account names can be
+        supplied with this flag set to False, and will be constructed to a full URL in the form of
+        `https://{account}.blob.core.windows.net`. Defaults to False.
+    block_size: int (optional)
+        The size in bytes of the blocks (uploads) and ranges (downloads) transferred in parallel. Defaults to 4 MiB.
+    retry_total: int (optional)
+        The number of times a failed request is retried. Defaults to 3.
+    retry_backoff: int (optional)
+        The initial backoff in seconds between retries, which grows exponentially. Defaults to 15.
+
+    Examples
+    --------
+    ```python
+    from wadoh_raccoon.utils.azure import BlobSession
+
+    with BlobSession(account="mystorageaccount") as session:
+        for name in ["a.csv", "b.csv"]:
+            session.upload(container_name="mycontainer", blob_path=f"myblob/{name}", file_path=name)
+    ```
+    """
+    def __init__(self,
+                 account: str,
+                 credential: TokenCredential = None,
+                 account_is_url: bool = False,
+                 block_size: int = BLOCK_SIZE,
+                 retry_total: int = 3,
+                 retry_backoff: int = 15):
+        # Use Azure CLI creds to authenticate if not otherwise provided
+        # NOTE: you will need to log in via the Azure CLI before this will work
+        # Open your terminal and run `az login`; you may need to specify a specific tenant with `az login --tenant tenantid`
+        if credential is None:
+            credential = _default_credential()
+        # Set account url
+        if not account_is_url:
+            account = f'https://{account}.blob.core.windows.net'
+
+        self.account_url = account
+        self.credential = credential
+        self.block_size = block_size
+        # Anything larger than one block is split into blocks (or ranges) that move in parallel
+        self.client = BlobServiceClient(
+            account_url=account,
+            credential=credential,
+            connection_timeout=300,
+            max_block_size=block_size,
+            max_single_put_size=block_size,
+            max_chunk_get_size=block_size,
+            max_single_get_size=block_size,
+            retry_policy=ExponentialRetry(initial_backoff=retry_backoff, retry_total=retry_total)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the connection pool of the session"""
+        self.client.close()
+
+    def upload(self,
+               container_name: str,
+               blob_path: str,
+               file_path: str,
+               overwrite: bool = True,
+               access_tier: str = None,
+               max_concurrency: int = 4):
+        """Upload a local file to a blob. See `blob_upload` for the parameters."""
+        # Validate access tier value
+        if access_tier and access_tier.capitalize() not in ['Hot', 'Cool', 'Cold', 'Archive']:
+            print(f'access_tier: {access_tier}')
+            raise ValueError(f"access_tier must be one of: 'Hot', 'Cool', 'Cold', 'Archive', None")
+
+        # Connect to blob client
+        blob_client = self.client.get_blob_client(container_name, blob_path)
+
+        # Skip blob writing if a blob already exists (and should not be overwritten)
+        if blob_client.exists() and not overwrite:
+            print(f"Blob '{blob_path}' already exists. Skipping upload.")
+            return
+
+        # Write data to blob, in blocks over parallel connections
+        with open(file_path, "rb") as data:
+            blob_client.upload_blob(data, overwrite=True, max_concurrency=max_concurrency)
+            print(f"File '{file_path}' uploaded to Blob storage as '{blob_path}'")
+
+        # Set the access tier, if specified
+        if access_tier:
+            blob_client.set_standard_blob_tier(access_tier)
+            print(f'Blob access tier set: {access_tier.capitalize()}')
+
+    def download(self,
+                 container_name: str,
+                 blob_path: str,
+                 file_path: str,
+                 max_concurrency: int = 4,
+                 use_mmap: bool = False):
+        """Download a blob to a local file. See `blob_download` for the parameters."""
+        # Connect to blob client
+        blob_client = self.client.get_blob_client(container_name, blob_path)
+
+        # Download blob data in ranges, streaming each range into the local file
+        download_stream = blob_client.download_blob(max_concurrency=max_concurrency)
+        if use_mmap and download_stream.size > 0:
+            with open(file_path, "w+b") as data:
+                data.truncate(download_stream.size)
+                with mmap.mmap(data.fileno(), download_stream.size) as buffer:
+                    download_stream.readinto(_MmapWriter(buffer))
+        else:
+            with open(file_path, "wb") as data:
+                download_stream.readinto(data)
+        print(f"File '{blob_path}' downloaded as '{file_path}'")
+
+    def delete(self,
+               container_name: str,
+               blob_path: str,
+               recursive: bool = False,
+               max_batches: int = 4) -> BlobDeleteResults:
+        """Delete a blob, or the blobs in a directory. See `blob_delete` for the parameters."""
+        # Get container client
+        container_client = self.client.get_container_client(container_name)
+
+        # Remove specific blob
+        if not recursive:
+            container_client.get_blob_client(blob_path).delete_blob()
+            print(f"File '{blob_path}' deleted from Blob storage.")
+            return BlobDeleteResults(deleted=1)
+
+        # Otherwise, list every blob under blob_path at once and remove them in batches
+        blob_names = iter(container_client.list_blob_names(name_starts_with=blob_path))
+        batches = iter(lambda: tuple(islice(blob_names, BATCH_SIZE)), ())
+        with ThreadPoolExecutor(max_workers=max_batches) as executor:
+            batch_results = list(executor.map(
+                lambda batch: (len(batch), self.__delete_batch(container_client, batch)),
+                batches
+            ))
+
+        failures = {name: reason for _, failed in batch_results for name, reason in failed.items()}
+        results = BlobDeleteResults(
+            deleted=sum(count for count, _ in batch_results) - len(failures),
+            failed=len(failures),
+            failures=failures
+        )
+        print(f"{results.deleted} files deleted from Blob storage under '{blob_path}', {results.failed} failed.")
+        return results
+
+    # Private method to be called from delete
+    @staticmethod
+    def __delete_batch(client: ContainerClient,
+                       blob_names: tuple[str, ...]) -> dict[str, str]:
+        """ Delete Batch
+        Deletes up to `BATCH_SIZE` blobs in a single Blob Batch request.
+
+        Usage
+        -----
+        This is a private function utilized by `delete` and should not be called outside of that scope.
+        Sub-requests that fail do not fail the batch; they are returned instead.
+
+        Parameters
+        ----------
+        client: ContainerClient
+            The Azure Blob Storage container client used to interact with the blob container.
+        blob_names: tuple[str, ...]
+            The names of the blobs to delete.
+
+        Returns
+        -------
+        dict[str, str]:
+            The reason each blob that could not be deleted failed, by blob name.
+        """
+        responses = client.delete_blobs(*blob_names, raise_on_any_failure=False)
+        return {
+            name: f'{response.status_code} {response.reason}'
+            for name, response in zip(blob_names, responses)
+            if response.status_code >= 300
+        }
+
+    def write_frame(self,
+                    df: pl.DataFrame | pl.LazyFrame,
+                    container_name: str,
+                    blob_path: str,
+                    format: str = None,
+                    max_concurrency: int = 4,
+                    **kwargs):
+        """Write a frame to a blob. See `blob_write_frame` for the parameters."""
+        format = _frame_format(blob_path, format)
+        blob_client = self.client.get_blob_client(container_name, blob_path)
+        if isinstance(df, pl.LazyFrame):
+            # Stream the plan to a local spool file, then upload it block by block
+            with tempfile.TemporaryDirectory(prefix='wadoh-raccoon-blob-') as directory:
+                spool = Path(directory) / f'frame.{format}'
+                helpers.sink_frame(df, spool, format, **kwargs)
+                with open(spool, 'rb') as file, _BlobWriter(blob_client, self.block_size, max_concurrency) as writer:
+                    shutil.copyfileobj(file, writer, self.block_size)
+            print(f"Frame uploaded to Blob storage as '{blob_path}'")
+            return
+        with _BlobWriter(blob_client, self.block_size, max_concurrency) as writer:
+            getattr(df, f'write_{format}')(writer, **kwargs)
+        print(f"Frame with {df.height} rows uploaded to Blob storage as '{blob_path}'")
+
+    def read_frame(self,
+                   container_name: str,
+                   blob_path: str,
+                   format: str = None,
+                   max_concurrency: int = 4,
+                   **kwargs) -> pl.DataFrame:
+        """Read a blob into a frame. See `blob_read_frame` for the parameters."""
+        format = _frame_format(blob_path, format)
+        blob_client = self.client.get_blob_client(container_name, blob_path)
+        # Download to a local spool file that polars reads, rather than into memory, where the raw bytes and the
+        # frame would be held together
+        spool = helpers._spill_dir() / f'{time.time_ns()}-{threading.get_ident()}.{format}'
+        if format == 'ipc':
+            # a memory-mapped IPC frame would keep the spool file open, and it could not be removed on Windows
+            kwargs.setdefault('memory_map', False)
+        try:
+            with open(spool, 'wb') as data:
+                blob_client.download_blob(max_concurrency=max_concurrency).readinto(data)
+            return getattr(pl, f'read_{format}')(spool, **kwargs)
+        finally:
+            spool.unlink(missing_ok=True)
+
+    def storage_options(self) -> dict[str, str]:
+        """ Storage Options
+        Polars `storage_options` for reading the session's account with `pl.scan_parquet`.
+
+        Usage
+        -----
+        Account keys are passed as-is. Token credentials are exchanged for a bearer token, which is valid for
+        about an hour, so create the options again for long-running queries. Account URLs that are not under
+        `blob.core.windows.net` (Azurite, for example) are set as the endpoint.
+        """
+        options = {'account_name': self.client.account_name}
+        if hasattr(self.credential, 'account_key'):
+            options['account_key'] = self.credential.account_key
+        else:
+            options['bearer_token'] = self.credential.get_token('https://storage.azure.com/.default').token
+        if not self.account_url.rstrip('/').endswith('.blob.core.windows.net'):
+            options['endpoint'] = self.account_url.rstrip('/')
+            if self.account_url.startswith('http://'):
+                options['allow_http'] = 'true'
+        return options
+
+    def scan_parquet(self,
+                     container_name: str,
+                     blob_path: str,
+                     **kwargs) -> pl.LazyFrame:
+        """Scan Parquet blobs lazily. See `blob_scan_parquet` for the parameters."""
+        return pl.scan_parquet(
+            f'az://{container_name}/{blob_path}',
+            storage_options=self.storage_options(),
+            **kwargs
+        )
+
+
+# Sessions shared by the module-level functions, keyed by account and settings
+_SESSIONS = {}
+_SESSIONS_LOCK = threading.Lock()
+_DEFAULT_CREDENTIAL = None
+
+
+def _default_credential() -> TokenCredential:
+    """The AzureCliCredential shared by every session that is not given a credential"""
+    global _DEFAULT_CREDENTIAL
+    with _SESSIONS_LOCK:
+        if _DEFAULT_CREDENTIAL is None:
+            _DEFAULT_CREDENTIAL = AzureCliCredential()
+        return _DEFAULT_CREDENTIAL
+
+
+def get_session(account: str,
+                credential: TokenCredential = None,
+                account_is_url: bool = False,
+                block_size: int = BLOCK_SIZE,
+                retry_total: int = 3,
+                retry_backoff: int = 15) -> BlobSession:
+    """ Get Session
+    Returns a cached `BlobSession`, creating it on first use.
+
+    Usage
+    -----
+    Calls with the same account, credential and transfer settings share one session, and with it one token and
+    connection pool. Calls without a credential share one `AzureCliCredential`. The parameters are the same as
+    for `BlobSession`.
+
+    Returns
+    -------
+    BlobSession:
+        The session for the account and settings.
+
+    Examples
+    --------
+    ```python
+    from wadoh_raccoon.utils.azure import get_session
+
+    session = get_session(account="mystorageaccount")
+    session.download(container_name="mycontainer", blob_path="myblob/data.csv", file_path="data.csv")
+    ```
+    """
+    if credential is None:
+        credential = _default_credential()
+    if not account_is_url:
+        account = f'https://{account}.blob.core.windows.net'
+    key = (account, credential, block_size, retry_total, retry_backoff)
+    with _SESSIONS_LOCK:
+        if key not in _SESSIONS:
+            _SESSIONS[key] = BlobSession(account, credential, True, block_size, retry_total, retry_backoff)
+        return _SESSIONS[key]
+
+
+def clear_sessions():
+    """ Clear Sessions
+    Closes and forgets the cached sessions and the shared default credential, e.g. after switching
+    `az login` accounts.
+    """
+    global _DEFAULT_CREDENTIAL
+    with _SESSIONS_LOCK:
+        for session in _SESSIONS.values():
+            session.close()
+        _SESSIONS.clear()
+        _DEFAULT_CREDENTIAL = None
 
 
 def blob_upload(account: str,
@@ -11,9 +494,13 @@ def blob_upload(account: str,
                 credential: TokenCredential = None,
                 overwrite: bool = True,
                 access_tier: str = None,
-                account_is_url: bool = False):
+                account_is_url: bool = False,
+                max_concurrency: int = 4,
+                block_size: int = BLOCK_SIZE,
+                retry_total: int = 3,
+                retry_backoff: int = 15):
     """ Blob Upload
-    Uploads a local file to Azure Blob Storage.
+    Uploads a local file to Azure Blob Storage. Reuses a cached `BlobSession` for the account.
 
     Usage
     -----
@@ -33,7 +520,7 @@ def blob_upload(account: str,
     credential: TokenCredential (optional)
         The Azure credential used for authentication. Can be any implementation of
         `azure.core.credentials.TokenCredential` (e.g., `DefaultAzureCredential`, `AzureCliCredential`,
-        `ManagedIdentityCredential`). Defaults to `AzureCliCredential`.
+        `ManagedIdentityCredential`). Defaults to a shared `AzureCliCredential`.
     overwrite: bool (optional)
         Whether blobs should be overwritten if they exist. Defaults to True.
     access_tier: str (optional)
@@ -43,6 +530,15 @@ def blob_upload(account: str,
         account endpoint as-is, and should be used for testing with Azurite, for example. Account names can be
         supplied with this flag set to False, and will be constructed to a full URL in the form of
         `https://{account}.blob.core.windows.net`. Defaults to False.
+    max_concurrency: int (optional)
+        The number of blocks to upload in parallel. Defaults to 4.
+    block_size: int (optional)
+        The block size in bytes. Files larger than one block are uploaded as blocks over `max_concurrency`
+        connections. Defaults to 4 MiB.
+    retry_total: int (optional)
+        The number of times a failed request is retried. Defaults to 3.
+    retry_backoff: int (optional)
+        The initial backoff in seconds between retries, which grows exponentially. Defaults to 15.
 
     Returns
     -------
@@ -63,93 +559,8 @@ def blob_upload(account: str,
     )
     ```
     """
-    # Validate access tier value
-    if access_tier and access_tier.capitalize() not in ['Hot', 'Cool', 'Cold', 'Archive']:
-        print(f'access_tier: {access_tier}')
-        raise ValueError(f"access_tier must be one of: 'Hot', 'Cool', 'Cold', 'Archive', None")
-
-    # Use Azure CLI creds to authenticate if not otherwise provided
-    # NOTE: you will need to log in via the Azure CLI before this will work
-    # Open your terminal and run `az login`; you may need to specify a specific tenant with `az login --tenant tenantid`
-    if credential is None:
-        credential = AzureCliCredential()
-    # Set account url
-    if not account_is_url:
-        account = f'https://{account}.blob.core.windows.net'
-    # Create a BlobServiceClient
-    blob_service_client = BlobServiceClient(account_url=account, credential=credential, connection_timeout=300)
-    # Get container client for file upload
-    container_client = blob_service_client.get_container_client(container_name)
-    # Connect to blob client
-    blob_client = container_client.get_blob_client(blob_path)
-
-    # Skip blob writing if a blob already exists (and should not be overwritten)
-    if blob_client.exists() and not overwrite:
-        print(f"Blob '{blob_path}' already exists. Skipping upload.")
-        return
-
-    # Write data to blob
-    with open(file_path, "rb") as data:
-        blob_client.upload_blob(data, overwrite=True)
-        print(f"File '{file_path}' uploaded to Blob storage as '{blob_path}'")
-
-    # Set the access tier, if specified
-    if access_tier:
-        blob_client.set_standard_blob_tier(access_tier)
-        print(f'Blob access tier set: {access_tier.capitalize()}')
-
-
-# Private method to be called from blob_delete
-def __delete(client: ContainerClient,
-             blob_path: str,
-             recursive: bool = False):
-    """ Delete
-    Deletes blobs from the specified directory in Azure Blob Storage.
-
-    Usage
-    -----
-    This is a private function utilize by `blob_delete` and should not be called outside of that scope.
-    This method can be used to upload a file from a local machine to Azure blob storage.
-    This private helper method is designed to iterate through blobs within a given directory
-    (`blob_path`) in Azure Blob Storage. It deletes blobs one by one, and if a subdirectory is
-    found and the `recursive` flag is set to True, it continues the deletion process for that
-    subdirectory.
-
-    Parameters
-    ----------
-    client: ContainerClient
-        The Azure Blob Storage container client used to interact with the blob container.
-    blob_path: str
-        The path to the directory (blob) to delete from. This can be a directory or a specific blob.
-    recursive: bool (optional)
-        If True, subdirectories within the `blob_path` will also be processed and deleted. Defaults to False.
-
-    Returns
-    -------
-    None:
-        This method performs deletions and prints the results but does not return any value.
-
-    Examples
-    --------
-    ```python
-    from wadoh_raccoon.utils.azure import __delete
-
-    # Delete a specific blob:
-    __delete(client=container_client, blob_path="blob/to_delete/data.csv")
-
-    # Delete a blob from a directory and any blobs in subdirectories:
-    __delete(client=container_client, blob_path="blob/to_delete", recursive=True)
-    ```
-    """
-    blobs = client.walk_blobs(name_starts_with=blob_path)
-    for blob in blobs:
-        # Check if blob is a subdirectory or not
-        if blob.name[-1:] != '/':
-            blob_client = client.get_blob_client(blob.name)
-            blob_client.delete_blob()
-            print(f"File '{blob.name}' deleted from Blob storage.")
-        elif recursive:
-            __delete(client, blob.name, recursive=True)
+    session = get_session(account, credential, account_is_url, block_size, retry_total, retry_backoff)
+    session.upload(container_name, blob_path, file_path, overwrite, access_tier, max_concurrency)
 
 
 # Method used to delete files from blob storage.
@@ -158,15 +569,19 @@ def blob_delete(account: str,
                 blob_path: str,
                 credential: TokenCredential = None,
                 recursive: bool = False,
-                account_is_url: bool = False):
+                account_is_url: bool = False,
+                max_batches: int = 4) -> BlobDeleteResults:
     """ Blob Delete
-    Deletes a specific file or all files within a directory in Azure Blob Storage.
+    Deletes a specific file or all files within a directory in Azure Blob Storage. Reuses a cached `BlobSession`
+    for the account.
 
     Usage
     -----
     This method establishes a connection to the specified Azure Blob Storage container and
-    deletes either a specific file or all files within a given directory. If the `recursive` 
-    flag is set to True, it will delete files from subdirectories as well.
+    deletes either a specific file or all files within a given directory. If the `recursive`
+    flag is set to True, it will delete files from subdirectories as well: every blob whose name starts
+    with `blob_path` is listed at once and deleted through the Blob Batch API, up to 256 blobs per request
+    with `max_batches` requests in flight.
 
     Parameters
     ----------
@@ -180,7 +595,7 @@ def blob_delete(account: str,
     credential: TokenCredential (optional)
         The Azure credential used for authentication. Can be any implementation of
         `azure.core.credentials.TokenCredential` (e.g., `DefaultAzureCredential`, `AzureCliCredential`,
-        `ManagedIdentityCredential`). Defaults to `AzureCliCredential`.
+        `ManagedIdentityCredential`). Defaults to a shared `AzureCliCredential`.
     recursive: bool (optional)
         If True, all files within subdirectories of `blob_path` will also be deleted. Defaults to False.
     account_is_url: bool (optional)
@@ -188,11 +603,13 @@ def blob_delete(account: str,
         account endpoint as-is, and should be used for testing with Azurite, for example. Account names can be
         supplied with this flag set to False, and will be constructed to a full URL in the form of
         `https://{account}.blob.core.windows.net`. Defaults to False.
+    max_batches: int (optional)
+        The number of batch requests to send in parallel when `recursive` is True. Defaults to 4.
 
     Returns
     -------
-    None:
-        This method deletes the specified file or directory contents and prints results, but does not return any value.
+    BlobDeleteResults:
+        The number of blobs deleted and the blobs that could not be deleted, with the reason.
 
     Examples
     --------
@@ -205,34 +622,14 @@ def blob_delete(account: str,
                 blob_path="blob/to_delete/data.txt")
 
     # Delete files within a directory and any files in subdirectories:
-    blob_delete(account="myaccount",
-                container_name="mycontainer",
-                blob_path="blob/to_delete/",
-                recursive=True)
+    results = blob_delete(account="myaccount",
+                          container_name="mycontainer",
+                          blob_path="blob/to_delete/",
+                          recursive=True)
+    print(results.failures)
     ```
     """
-    # Use Azure CLI creds to authenticate if not otherwise provided
-    # NOTE: you will need to log in via the Azure CLI before this will work
-    # Open your terminal and run `az login`; you may need to specify a specific tenant with `az login --tenant tenantid`
-    if credential is None:
-        credential = AzureCliCredential()
-
-    # Set account url
-    if not account_is_url:
-        account = f'https://{account}.blob.core.windows.net'
-    # Create a BlobServiceClient
-    blob_service_client = BlobServiceClient(account_url=account, credential=credential)
-    # Get container client for file upload
-    container_client = blob_service_client.get_container_client(container_name)
-
-    # Remove specific blob
-    if not recursive:
-        blob_client = container_client.get_blob_client(blob_path)
-        blob_client.delete_blob()
-        print(f"File '{blob_path}' deleted from Blob storage.")
-    # Otherwise, remove all the files in the blob_path
-    else:
-        __delete(container_client, blob_path, recursive=recursive)
+    return get_session(account, credential, account_is_url).delete(container_name, blob_path, recursive, max_batches)
 
 
 # Method for downloading a file from Blob storage to a locally-accessible drive
@@ -241,15 +638,22 @@ def blob_download(account: str,
                   blob_path: str,
                   file_path: str,
                   credential: TokenCredential = None,
-                  account_is_url: bool = False):
+                  account_is_url: bool = False,
+                  max_concurrency: int = 4,
+                  block_size: int = BLOCK_SIZE,
+                  use_mmap: bool = False,
+                  retry_total: int = 3,
+                  retry_backoff: int = 15):
     """
-    Downloads a specific file from Azure Blob Storage to a local directory.
+    Downloads a specific file from Azure Blob Storage to a local directory. Reuses a cached `BlobSession` for
+    the account.
 
     Usage
     -----
     This method authenticates with Azure using the Azure CLI, establishes a connection to the
     specified Azure Blob Storage container, and downloads a specific file from a given directory in
-    Azure Blob Storage.
+    Azure Blob Storage. The blob is downloaded in ranges over parallel connections and each range is
+    written straight into the file, so the whole blob is never held in memory.
 
     Parameters
     ----------
@@ -264,12 +668,23 @@ def blob_download(account: str,
     credential: TokenCredential (optional)
         The Azure credential used for authentication. Can be any implementation of
         `azure.core.credentials.TokenCredential` (e.g., `DefaultAzureCredential`, `AzureCliCredential`,
-        `ManagedIdentityCredential`). Defaults to `AzureCliCredential`.
+        `ManagedIdentityCredential`). Defaults to a shared `AzureCliCredential`.
     account_is_url: bool (optional)
         Whether `account` is supplied as a full URL instead of an account name. Account URLs will be set as the
         account endpoint as-is, and should be used for testing with Azurite, for example. Account names can be
         supplied with this flag set to False, and will be constructed to a full URL in the form of
         `https://{account}.blob.core.windows.net`. Defaults to False.
+    max_concurrency: int (optional)
+        The number of ranges to download in parallel. Defaults to 4.
+    block_size: int (optional)
+        The range size in bytes. Defaults to 4 MiB.
+    use_mmap: bool (optional)
+        Preallocate the file and write ranges into a memory map of it instead of through file writes.
+        Defaults to False.
+    retry_total: int (optional)
+        The number of times a failed request is retried. Defaults to 3.
+    retry_backoff: int (optional)
+        The initial backoff in seconds between retries, which grows exponentially. Defaults to 15.
 
     Returns
     -------
@@ -289,24 +704,173 @@ def blob_download(account: str,
                 file_path="data/data.json")
     ```
     """
-    # Use Azure CLI creds to authenticate if not otherwise provided
-    # NOTE: you will need to log in via the Azure CLI before this will work
-    # Open your terminal and run `az login`; you may need to specify a specific tenant with `az login --tenant tenantid`
-    if credential is None:
-        credential = AzureCliCredential()
+    session = get_session(account, credential, account_is_url, block_size, retry_total, retry_backoff)
+    session.download(container_name, blob_path, file_path, max_concurrency, use_mmap)
+
+
+def blob_write_frame(df: pl.DataFrame | pl.LazyFrame,
+                     account: str,
+                     container_name: str,
+                     blob_path: str,
+                     format: str = None,
+                     credential: TokenCredential = None,
+                     account_is_url: bool = False,
+                     max_concurrency: int = 4,
+                     block_size: int = BLOCK_SIZE,
+                     **kwargs):
+    """ Blob Write Frame
+    Writes a DataFrame or LazyFrame to Azure Blob Storage.
 
-    # Set account url
-    if not account_is_url:
-        account = f'https://{account}.blob.core.windows.net'
-    # Create a BlobServiceClient
-    blob_service_client = BlobServiceClient(account_url=account, credential=credential, connection_timeout=300)
-    # Get container client for file upload
-    container_client = blob_service_client.get_container_client(container_name)
-    # Connect to blob client
-    blob_client = container_client.get_blob_client(blob_path)
-
-    # Download blob data and write to local path
-    with open(file_path, "wb") as data:
-        download_stream = blob_client.download_blob()
-        data.write(download_stream.readall())
-        print(f"File '{blob_path}' downloaded as '{file_path}'")
+    Usage
+    -----
+    The frame is written into a stream that stages blocks of the blob while polars is still writing, with up to
+    `max_concurrency` blocks uploading at once, and the blob is committed when the write finishes. If the write
+    fails, nothing is committed and an existing blob is left as it was. LazyFrames are not collected: they are
+    streamed to a temporary local file (collected only when the polars streaming engine cannot run the plan),
+    which is then uploaded the same way. Reuses a cached `BlobSession` for the account.
+
+    Parameters
+    ----------
+    df: pl.DataFrame | pl.LazyFrame
+        The frame to write.
+    account: str
+        the storage account name.
+    container_name: str
+        the storage container name.
+    blob_path: str
+        The path and name of the blob to be created in Azure Blob Storage.
+    format: str (optional)
+        'parquet', 'csv' or 'ipc'. Defaults to the extension of `blob_path`.
+    credential: TokenCredential (optional)
+        The Azure credential used for authentication. Defaults to a shared `AzureCliCredential`.
+    account_is_url: bool (optional)
+        Whether `account` is supplied as a full URL instead of an account name. Defaults to False.
+    max_concurrency: int (optional)
+        The number of blocks to upload in parallel. Defaults to 4.
+    block_size: int (optional)
+        The block size in bytes. Defaults to 4 MiB.
+    **kwargs
+        Passed on to `write_parquet`, `write_csv` or `write_ipc`.
+
+    Returns
+    -------
+    None:
+        This method uploads the frame and prints the result. No value is returned.
+
+    Examples
+    --------
+    ```python
+    from wadoh_raccoon.utils.azure import blob_write_frame
+
+    blob_write_frame(output.fuzzy_matched, account="mystorageaccount", container_name="mycontainer",
+                     blob_path="results/fuzzy_matched.parquet")
+    ```
+    """
+    session = get_session(account, credential, account_is_url, block_size)
+    session.write_frame(df, container_name, blob_path, format, max_concurrency, **kwargs)
+
+
+def blob_read_frame(account: str,
+                    container_name: str,
+                    blob_path: str,
+                    format: str = None,
+                    credential: TokenCredential = None,
+                    account_is_url: bool = False,
+                    max_concurrency: int = 4,
+                    **kwargs) -> pl.DataFrame:
+    """ Blob Read Frame
+    Reads a Parquet, CSV or IPC blob into a DataFrame.
+
+    Usage
+    -----
+    The blob is downloaded in parallel ranges to a temporary local file, which polars reads and which is then
+    removed, so the raw bytes are not held in memory next to the frame. Use `blob_scan_parquet` to read only
+    some columns or rows of a Parquet blob. Reuses a cached `BlobSession` for the account.
+
+    Parameters
+    ----------
+    account: str
+        the storage account name.
+    container_name: str
+        the storage container name.
+    blob_path: str
+        The blob path and name in Azure Blob Storage.
+    format: str (optional)
+        'parquet', 'csv' or 'ipc'. Defaults to the extension of `blob_path`.
+    credential: TokenCredential (optional)
+        The Azure credential used for authentication. Defaults to a shared `AzureCliCredential`.
+    account_is_url: bool (optional)
+        Whether `account` is supplied as a full URL instead of an account name. Defaults to False.
+    max_concurrency: int (optional)
+        The number of ranges to download in parallel. Defaults to 4.
+    **kwargs
+        Passed on to `pl.read_parquet`, `pl.read_csv` or `pl.read_ipc`.
+
+    Returns
+    -------
+    pl.DataFrame:
+        The contents of the blob.
+
+    Examples
+    --------
+    ```python
+    from wadoh_raccoon.utils.azure import blob_read_frame
+
+    df = blob_read_frame(account="mystorageaccount", container_name="mycontainer", blob_path="inputs/cases.csv")
+    ```
+    """
+    session = get_session(account, credential, account_is_url)
+    return session.read_frame(container_name, blob_path, format, max_concurrency, **kwargs)
+
+
+def blob_scan_parquet(account: str,
+                      container_name: str,
+                      blob_path: str,
+                      credential: TokenCredential = None,
+                      account_is_url: bool = False,
+                      **kwargs) -> pl.LazyFrame:
+    """ Blob Scan Parquet
+    Lazily scans Parquet blobs, reading only the columns and row groups a query needs.
+
+    Usage
+    -----
+    Returns a LazyFrame over `az://{container_name}/{blob_path}`. Polars pushes projections and predicates into
+    the scan and fetches the footer and the needed column chunks with ranged reads, instead of downloading whole
+    blobs. `blob_path` may be a glob, e.g. `results/*.parquet`. Authentication uses the same credential handling
+    as the other functions here (see `BlobSession.storage_options`).
+
+    Parameters
+    ----------
+    account: str
+        the storage account name.
+    container_name: str
+        the storage container name.
+    blob_path: str
+        The blob path, or a glob of blob paths, in Azure Blob Storage.
+    credential: TokenCredential (optional)
+        The Azure credential used for authentication. Defaults to a shared `AzureCliCredential`.
+    account_is_url: bool (optional)
+        Whether `account` is supplied as a full URL instead of an account name. Defaults to False.
+    **kwargs
+        Passed on to `pl.scan_parquet`.
+
+    Returns
+    -------
+    pl.LazyFrame:
+        A lazy scan of the blobs.
+
+    Examples
+    --------
+    ```python
+    import polars as pl
+    from wadoh_raccoon.utils.azure import blob_scan_parquet
+
+    recent = (
+        blob_scan_parquet(account="mystorageaccount", container_name="mycontainer", blob_path="cases/*.parquet")
+        .filter(pl.col("collection_date") >= pl.date(2024, 1, 1))
+        .select("case_id", "collection_date")
+        .collect()
+    )
+    ```
+    """
+    return get_session(account, credential, account_is_url).scan_parquet(container_name, blob_path, **kwargs)
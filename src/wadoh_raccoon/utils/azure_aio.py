@@ -0,0 +1,397 @@
+import asyncio
+import base64
+import mmap
+import os
+from azure.core import MatchConditions
+from azure.core.credentials_async import AsyncTokenCredential
+from azure.identity.aio import AzureCliCredential
+from azure.storage.blob import ExponentialRetry
+from azure.storage.blob.aio import BlobServiceClient, ContainerClient
+from wadoh_raccoon.utils.azure import BATCH_SIZE, BLOCK_SIZE, BlobDeleteResults
+
+
+class AsyncBlobSession:
+    """ Async Blob Session
+    An asyncio connection to one storage account, shared by many overlapping transfers.
+
+    Usage
+    -----
+    The async counterpart of `wadoh_raccoon.utils.azure.BlobSession`, built on the `azure.storage.blob.aio` clients
+    so transfers do not block the event loop. One session holds one credential, token and connection pool.
+    At most `max_transfers` blobs are transferred at a time; the bulk helpers (`upload_many`, `download_many`)
+    start every transfer at once and let the session bound them. Cancelling the task awaiting a transfer (or a
+    bulk helper) cancels the transfers in flight. Files larger than one block are uploaded as blocks and
+    downloaded as ranges, up to `max_concurrency` of each at a time. Local files are read and written in worker
+    threads (`asyncio.to_thread`), so disk I/O does not hold up the other transfers on the event loop.
+
+    Parameters
+    ----------
+    account: str
+        the storage account name.
+    credential: AsyncTokenCredential (optional)
+        The async Azure credential used for authentication, e.g. from `azure.identity.aio`. Defaults to an
+        `AzureCliCredential` owned (and closed) by the session.
+    account_is_url: bool (optional)
+        Whether `account` is supplied as a full URL instead of an account name. Account URLs will be set as the
+        account endpoint as-is, and should be used for testing with Azurite, for example. Account names can be
+        supplied with this flag set to False, and will be constructed to a full URL in the form of
+        `https://{account}.blob.core.windows.net`. Defaults to False.
+    max_transfers: int (optional)
+        The number of blobs transferred at the same time. Defaults to 64.
+    block_size: int (optional)
+        The size in bytes of the blocks (uploads) and ranges (downloads) transferred in parallel. Defaults to 4 MiB.
+    retry_total: int (optional)
+        The number of times a failed request is retried. Defaults to 3.
+    retry_backoff: int (optional)
+        The initial backoff in seconds between retries, which grows exponentially. Defaults to 15.
+
+    Examples
+    --------
+    ```python
+    import asyncio
+    from wadoh_raccoon.utils.azure_aio import AsyncBlobSession
+
+    async def main():
+        async with AsyncBlobSession(account="mystorageaccount", max_transfers=100) as session:
+            await session.upload_many(
+                container_name="mycontainer",
+                files={f"myblob/{name}": name for name in ["a.csv", "b.csv"]}
+            )
+
+    asyncio.run(main())
+    ```
+    """
+    def __init__(self,
+                 account: str,
+                 credential: AsyncTokenCredential = None,
+                 account_is_url: bool = False,
+                 max_transfers: int = 64,
+                 block_size: int = BLOCK_SIZE,
+                 retry_total: int = 3,
+                 retry_backoff: int = 15):
+        # Use Azure CLI creds to authenticate if not otherwise provided
+        # NOTE: you will need to log in via the Azure CLI before this will work
+        self.owns_credential = credential is None
+        if credential is None:
+            credential = AzureCliCredential()
+        # Set account url
+        if not account_is_url:
+            account = f'https://{account}.blob.core.windows.net'
+
+        self.account_url = account
+        self.credential = credential
+        self.semaphore = asyncio.Semaphore(max_transfers)
+        self.block_size = block_size
+        # Anything larger than one block is split into blocks (or ranges) that move in parallel
+        self.client = BlobServiceClient(
+            account_url=account,
+            credential=credential,
+            connection_timeout=300,
+            max_block_size=block_size,
+            max_single_put_size=block_size,
+            max_chunk_get_size=block_size,
+            max_single_get_size=block_size,
+            retry_policy=ExponentialRetry(initial_backoff=retry_backoff, retry_total=retry_total)
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """Close the connection pool of the session, and its credential if the session created it"""
+        await self.client.close()
+        if self.owns_credential:
+            await self.credential.close()
+
+    async def upload(self,
+                     container_name: str,
+                     blob_path: str,
+                     file_path: str,
+                     overwrite: bool = True,
+                     access_tier: str = None,
+                     max_concurrency: int = 4):
+        """Upload a local file to a blob. See `wadoh_raccoon.utils.azure.blob_upload` for the parameters."""
+        # Validate access tier value
+        if access_tier and access_tier.capitalize() not in ['Hot', 'Cool', 'Cold', 'Archive']:
+            raise ValueError(f"access_tier must be one of: 'Hot', 'Cool', 'Cold', 'Archive', None")
+
+        async with self.semaphore:
+            blob_client = self.client.get_blob_client(container_name, blob_path)
+
+            # Skip blob writing if a blob already exists (and should not be overwritten)
+            if not overwrite and await blob_client.exists():
+                print(f"Blob '{blob_path}' already exists. Skipping upload.")
+                return
+
+            size = await asyncio.to_thread(os.path.getsize, file_path)
+            if size <= self.block_size:
+                data = await asyncio.to_thread(_read_range, file_path, 0, size)
+                await blob_client.upload_blob(data, overwrite=True)
+            else:
+                # Stage the blocks in parallel and commit them together, so the blob appears once complete
+                offsets = range(0, size, self.block_size)
+                block_ids = [base64.b64encode(f'{i:010d}'.encode()).decode() for i in range(len(offsets))]
+                block_semaphore = asyncio.Semaphore(max_concurrency)
+                async with asyncio.TaskGroup() as group:
+                    for block_id, offset in zip(block_ids, offsets):
+                        group.create_task(
+                            self.__stage_block(blob_client, block_id, file_path, offset, block_semaphore)
+                        )
+                await blob_client.commit_block_list(block_ids)
+
+            if access_tier:
+                await blob_client.set_standard_blob_tier(access_tier)
+
+    async def download(self,
+                       container_name: str,
+                       blob_path: str,
+                       file_path: str,
+                       max_concurrency: int = 4,
+                       use_mmap: bool = False):
+        """Download a blob to a local file. See `wadoh_raccoon.utils.azure.blob_download` for the parameters."""
+        async with self.semaphore:
+            blob_client = self.client.get_blob_client(container_name, blob_path)
+
+            # Preallocate the local file, then download the blob in ranges written at their offsets
+            properties = await blob_client.get_blob_properties()
+            await asyncio.to_thread(_allocate, file_path, properties.size)
+            if properties.size == 0:
+                return
+            buffer = await asyncio.to_thread(_open_mmap, file_path, properties.size) if use_mmap else None
+            try:
+                range_semaphore = asyncio.Semaphore(max_concurrency)
+                async with asyncio.TaskGroup() as group:
+                    for offset in range(0, properties.size, self.block_size):
+                        group.create_task(self.__download_range(
+                            blob_client, properties.etag, min(self.block_size, properties.size - offset),
+                            file_path, offset, buffer, range_semaphore
+                        ))
+            finally:
+                if buffer is not None:
+                    await asyncio.to_thread(buffer.close)
+
+    # Private methods to be called from upload and download
+    async def __stage_block(self, blob_client, block_id, file_path, offset, block_semaphore):
+        """Read one block of a local file in a worker thread and stage it"""
+        async with block_semaphore:
+            block = await asyncio.to_thread(_read_range, file_path, offset, self.block_size)
+            await blob_client.stage_block(block_id, block)
+
+    @staticmethod
+    async def __download_range(blob_client, etag, length, file_path, offset, buffer, range_semaphore):
+        """Download one range of a blob, failing if the blob changed, and write it in a worker thread"""
+        async with range_semaphore:
+            stream = await blob_client.download_blob(
+                offset=offset, length=length, etag=etag, match_condition=MatchConditions.IfNotModified
+            )
+            block = await stream.readall()
+            if buffer is not None:
+                await asyncio.to_thread(buffer.__setitem__, slice(offset, offset + len(block)), block)
+            else:
+                await asyncio.to_thread(_write_range, file_path, offset, block)
+
+    async def delete(self,
+                     container_name: str,
+                     blob_path: str,
+                     recursive: bool = False,
+                     max_batches: int = 4) -> BlobDeleteResults:
+        """Delete a blob, or the blobs in a directory. See `wadoh_raccoon.utils.azure.blob_delete` for the
+        parameters."""
+        container_client = self.client.get_container_client(container_name)
+
+        # Remove specific blob
+        if not recursive:
+            async with self.semaphore:
+                await container_client.get_blob_client(blob_path).delete_blob()
+            return BlobDeleteResults(deleted=1)
+
+        # Otherwise, list every blob under blob_path at once and remove them in batches
+        batches, batch = [], []
+        async for name in container_client.list_blob_names(name_starts_with=blob_path):
+            batch.append(name)
+            if len(batch) == BATCH_SIZE:
+                batches.append(batch)
+                batch = []
+        if batch:
+            batches.append(batch)
+
+        batch_semaphore = asyncio.Semaphore(max_batches)
+        async with asyncio.TaskGroup() as group:
+            tasks = [
+                group.create_task(self.__delete_batch(container_client, batch, batch_semaphore))
+                for batch in batches
+            ]
+
+        failures = {name: reason for task in tasks for name, reason in task.result().items()}
+        return BlobDeleteResults(
+            deleted=sum(len(batch) for batch in batches) - len(failures),
+            failed=len(failures),
+            failures=failures
+        )
+
+    # Private method to be called from delete
+    async def __delete_batch(self,
+                             client: ContainerClient,
+                             blob_names: list[str],
+                             batch_semaphore: asyncio.Semaphore) -> dict[str, str]:
+        """Delete up to `BATCH_SIZE` blobs in one Blob Batch request, returning the failures by blob name"""
+        async with batch_semaphore, self.semaphore:
+            responses = await client.delete_blobs(*blob_names, raise_on_any_failure=False)
+            return {
+                name: f'{response.status_code} {response.reason}'
+                async for name, response in _zip_async(blob_names, responses)
+                if response.status_code >= 300
+            }
+
+    async def upload_many(self,
+                          container_name: str,
+                          files: dict[str, str],
+                          overwrite: bool = True,
+                          access_tier: str = None,
+                          max_concurrency: int = 4):
+        """ Upload Many
+        Uploads many local files at once, at most `max_transfers` at a time.
+
+        Parameters
+        ----------
+        container_name: str
+            the storage container name.
+        files: dict[str, str]
+            The path of the local file to upload to each blob, by blob path.
+        overwrite: bool (optional)
+            Whether blobs should be overwritten if they exist. Defaults to True.
+        access_tier: str (optional)
+            The access tier for the blobs ('Hot', 'Cool', 'Cold' or 'Archive'). Defaults to container's default.
+        max_concurrency: int (optional)
+            The number of blocks of each file to upload in parallel. Defaults to 4.
+
+        Returns
+        -------
+        None:
+            If any upload fails, the uploads still in flight are cancelled and the errors are raised together
+            as an `ExceptionGroup`.
+        """
+        async with asyncio.TaskGroup() as group:
+            for blob_path, file_path in files.items():
+                group.create_task(
+                    self.upload(container_name, blob_path, file_path, overwrite, access_tier, max_concurrency)
+                )
+        print(f"{len(files)} files uploaded to Blob storage.")
+
+    async def download_many(self,
+                            container_name: str,
+                            blobs: dict[str, str],
+                            max_concurrency: int = 4,
+                            use_mmap: bool = False):
+        """ Download Many
+        Downloads many blobs at once, at most `max_transfers` at a time.
+
+        Parameters
+        ----------
+        container_name: str
+            the storage container name.
+        blobs: dict[str, str]
+            The local path to download each blob to, by blob path.
+        max_concurrency: int (optional)
+            The number of ranges of each blob to download in parallel. Defaults to 4.
+        use_mmap: bool (optional)
+            Write ranges into a memory map of each preallocated file. Defaults to False.
+
+        Returns
+        -------
+        None:
+            If any download fails, the downloads still in flight are cancelled and the errors are raised together
+            as an `ExceptionGroup`.
+        """
+        async with asyncio.TaskGroup() as group:
+            for blob_path, file_path in blobs.items():
+                group.create_task(self.download(container_name, blob_path, file_path, max_concurrency, use_mmap))
+        print(f"{len(blobs)} blobs downloaded from Blob storage.")
+
+
+def _read_range(file_path: str, offset: int, length: int) -> bytes:
+    """Read `length` bytes of a local file from `offset`"""
+    with open(file_path, "rb") as data:
+        data.seek(offset)
+        return data.read(length)
+
+
+def _write_range(file_path: str, offset: int, block: bytes):
+    """Write bytes into a preallocated local file at `offset`"""
+    with open(file_path, "r+b") as data:
+        data.seek(offset)
+        data.write(block)
+
+
+def _allocate(file_path: str, size: int):
+    """Create (or empty) a local file of `size` bytes"""
+    with open(file_path, "wb") as data:
+        data.truncate(size)
+
+
+def _open_mmap(file_path: str, size: int) -> mmap.mmap:
+    """A writable memory map of a preallocated local file"""
+    with open(file_path, "r+b") as data:
+        return mmap.mmap(data.fileno(), size)
+
+
+async def _zip_async(items, responses):
+    """Pair items with the responses of an async iterator, in order"""
+    items = iter(items)
+    async for response in responses:
+        yield next(items), response
+
+
+async def blob_upload(account: str,
+                      container_name: str,
+                      blob_path: str,
+                      file_path: str,
+                      credential: AsyncTokenCredential = None,
+                      overwrite: bool = True,
+                      access_tier: str = None,
+                      account_is_url: bool = False,
+                      max_concurrency: int = 4):
+    """ Blob Upload
+    Async version of `wadoh_raccoon.utils.azure.blob_upload`, using a session for the single call.
+    Use `AsyncBlobSession` to share the connection across many calls.
+    """
+    async with AsyncBlobSession(account, credential, account_is_url) as session:
+        await session.upload(container_name, blob_path, file_path, overwrite, access_tier, max_concurrency)
+    print(f"File '{file_path}' uploaded to Blob storage as '{blob_path}'")
+
+
+async def blob_download(account: str,
+                        container_name: str,
+                        blob_path: str,
+                        file_path: str,
+                        credential: AsyncTokenCredential = None,
+                        account_is_url: bool = False,
+                        max_concurrency: int = 4,
+                        use_mmap: bool = False):
+    """ Blob Download
+    Async version of `wadoh_raccoon.utils.azure.blob_download`, using a session for the single call.
+    Use `AsyncBlobSession` to share the connection across many calls.
+    """
+    async with AsyncBlobSession(account, credential, account_is_url) as session:
+        await session.download(container_name, blob_path, file_path, max_concurrency, use_mmap)
+    print(f"File '{blob_path}' downloaded as '{file_path}'")
+
+
+async def blob_delete(account: str,
+                      container_name: str,
+                      blob_path: str,
+                      credential: AsyncTokenCredential = None,
+                      recursive: bool = False,
+                      account_is_url: bool = False,
+                      max_batches: int = 4) -> BlobDeleteResults:
+    """ Blob Delete
+    Async version of `wadoh_raccoon.utils.azure.blob_delete`, using a session for the single call.
+    Use `AsyncBlobSession` to share the connection across many calls.
+    """
+    async with AsyncBlobSession(account, credential, account_is_url) as session:
+        results = await session.delete(container_name, blob_path, recursive, max_batches)
+    print(f"{results.deleted} files deleted from Blob storage under '{blob_path}', {results.failed} failed.")
+    return results
@@ -1,14 +1,59 @@
+import fnmatch
+import hashlib
+import importlib
+import json
 import polars as pl
-import paramiko
+import queue
+import shutil
+import tempfile
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
+from pathlib import Path, PurePosixPath
+from pydantic import BaseModel
 from datetime import datetime
 from datetime import date
-from great_tables import GT, md, style, loc, google_font
-from azure.identity import DefaultAzureCredential
-from azure.keyvault.secrets import SecretClient
+from typing import TYPE_CHECKING
 
+# The SSH, Azure and table rendering stacks are optional extras, imported when first used
+if TYPE_CHECKING:
+    import paramiko
+    from azure.keyvault.secrets import SecretClient
+    from great_tables import GT
 
-def clean_name(col: str) -> pl.Expr:
+
+def import_optional(name: str, extra: str):
+    """
+    Import an optional dependency when it is first needed.
+
+    Parameters
+    ----------
+    name: str
+        The module to import, e.g. 'paramiko'.
+    extra: str
+        The package extra that installs it ('arrow', 'azure', 'duckdb', 'mft' or 'report').
+
+    Returns
+    -------
+    module:
+        the imported module
+
+    Raises
+    ------
+    ImportError:
+        if the module is not installed, naming the extra to install
+    """
+    try:
+        return importlib.import_module(name)
+    except ImportError as e:
+        raise ImportError(
+            f"'{name}' is not installed. Install it with: pip install 'wadoh-raccoon[{extra}]'"
+        ) from e
+
+
+def clean_name(col: str, keep_spaces: bool = False) -> pl.Expr:
     """
     Clean name field by stripping non-alpha characters and converting to uppercase.
 
@@ -16,6 +61,9 @@ def clean_name(col: str) -> pl.Expr:
     ----------
     col: str
         Name of column to clean
+    keep_spaces: bool (optional)
+        Replace each run of non-alpha characters with a single space instead of removing it,
+        so multi-word and hyphenated names keep their word breaks. Defaults to False.
 
     Returns
     -------
@@ -42,6 +90,8 @@ def clean_name(col: str) -> pl.Expr:
 
     ```
     """
+    if keep_spaces:
+        return pl.col(col).str.replace_all('[^a-zA-Z]+', ' ').str.strip_chars().str.to_uppercase()
     return pl.col(col).str.replace_all('[^a-zA-Z]', '').str.to_uppercase()
 
 def date_format(df: pl.DataFrame | pl.LazyFrame,col: str):
@@ -137,7 +187,29 @@ def date_format(df: pl.DataFrame | pl.LazyFrame,col: str):
             # if someone sends an excel date we'll just reject it and call the cops on them
         )
 
-def get_secrets(vault, keys):
+# Secrets fetched by get_secrets are cached for the whole process, with one
+# credential and one client per vault
+SECRET_TTL = 3600
+_SECRET_CACHE = {}
+_SECRET_CLIENTS = {}
+_SECRET_CREDENTIAL = None
+_SECRET_LOCK = threading.Lock()
+
+
+def _secret_client(vault: str) -> 'SecretClient':
+    """The shared SecretClient for a vault"""
+    global _SECRET_CREDENTIAL
+    identity = import_optional('azure.identity', 'azure')
+    secrets = import_optional('azure.keyvault.secrets', 'azure')
+    with _SECRET_LOCK:
+        if _SECRET_CREDENTIAL is None:
+            _SECRET_CREDENTIAL = identity.DefaultAzureCredential()
+        if vault not in _SECRET_CLIENTS:
+            _SECRET_CLIENTS[vault] = secrets.SecretClient(vault_url=vault, credential=_SECRET_CREDENTIAL)
+        return _SECRET_CLIENTS[vault]
+
+
+def get_secrets(vault, keys, ttl: float = SECRET_TTL, refresh: bool = False):
     """ Get secrets
 
     Retrieve secrets from Azure KeyVault.
@@ -147,6 +219,12 @@ def get_secrets(vault, keys):
     **Note: Authenication takes place via DefaultAzureCredential which attempts
     multiple authentication methods. One method is checking against Azure CLI 
     if logged in.
+
+    Secrets are cached for the whole process for `ttl` seconds, and one
+    credential and one client per vault are shared by every call, so calling
+    this from several modules only goes to the vault once. Keys that are not
+    cached are fetched concurrently. Use `refresh=True` or `clear_secrets`
+    after a secret is rotated.
     
     Usage
     -----
@@ -160,8 +238,12 @@ def get_secrets(vault, keys):
         Key vault url.
     keys: str or list of str
         A single secret key or list of secret keys.
+    ttl: float (optional)
+        Seconds a cached secret is reused before it is fetched again.
+        Defaults to 3600.
+    refresh: bool (optional)
+        Fetch the keys from the vault even if they are cached. Defaults to False.
 
-    
     Returns
     -------
     str or tuple of str
@@ -184,20 +266,118 @@ def get_secrets(vault, keys):
     )
     ```
     """
-    # Init credential and client
-    credential = DefaultAzureCredential()
-    vault_url = vault
-    client = SecretClient(vault_url=vault_url, credential=credential)
-    
+    key_list = [keys] if isinstance(keys, str) else list(keys)
+
+    # Fetch the keys that are not cached, or have expired, concurrently
+    now = time.monotonic()
+    with _SECRET_LOCK:
+        missing = [
+            key for key in dict.fromkeys(key_list)
+            if refresh or (vault, key) not in _SECRET_CACHE or now - _SECRET_CACHE[vault, key][1] > ttl
+        ]
+    if missing:
+        client = _secret_client(vault)
+        with ThreadPoolExecutor(max_workers=min(len(missing), 8)) as executor:
+            values = list(executor.map(lambda key: client.get_secret(key).value, missing))
+        with _SECRET_LOCK:
+            for key, value in zip(missing, values):
+                _SECRET_CACHE[vault, key] = (value, now)
+
+    with _SECRET_LOCK:
+        values = tuple(_SECRET_CACHE[vault, key][0] for key in key_list)
+
     # Handle single string input
     if isinstance(keys, str):
-        return client.get_secret(keys).value
+        return values[0]
     
     # Handle list input
-    return tuple(client.get_secret(key).value for key in keys)
+    return values
+
+
+def clear_secrets(vault: str = None, keys=None) -> None:
+    """ Clear secrets
 
+    Remove secrets from the `get_secrets` cache, e.g. after they are rotated,
+    so the next call fetches them from the vault again.
 
-def save_raw_values(df_inp: pl.DataFrame, primary_key_col: str):
+    Parameters
+    ----------
+    vault: str (optional)
+        Key vault url. Defaults to every vault, which also drops the shared
+        credential and clients.
+    keys: str or list of str (optional)
+        The secret key(s) to remove. Defaults to every key of the vault.
+
+    Examples
+    --------
+    ```python
+    from wadoh_raccoon.utils import helpers
+
+    helpers.clear_secrets("keyvault_url", "db-password")
+    ```
+    """
+    global _SECRET_CREDENTIAL
+    keys = [keys] if isinstance(keys, str) else keys
+    with _SECRET_LOCK:
+        for cached_vault, key in list(_SECRET_CACHE):
+            if (vault is None or cached_vault == vault) and (keys is None or key in keys):
+                del _SECRET_CACHE[cached_vault, key]
+        if vault is None:
+            _SECRET_CLIENTS.clear()
+            _SECRET_CREDENTIAL = None
+
+
+def _md5_hex(s: pl.Series) -> pl.Series:
+    """MD5 hex digests of a string column, computed in DuckDB when it is installed"""
+    try:
+        import duckdb
+    except ImportError:
+        md5 = hashlib.md5
+        return pl.Series(
+            [None if value is None else md5(value.encode('utf-8')).hexdigest() for value in s.to_list()],
+            dtype=pl.String
+        )
+    with duckdb.connect() as con:
+        result = con.from_arrow(s.to_frame('value').to_arrow()).project('md5(value)')
+        # to_arrow_table replaced fetch_arrow_table in duckdb 1.4
+        fetch = getattr(result, 'to_arrow_table', None) or result.fetch_arrow_table
+        return pl.from_arrow(fetch()).to_series().cast(pl.String)
+
+
+def raw_hash(col: str | pl.Expr) -> pl.Expr:
+    """
+    Stable hash of struct values, e.g. raw inbound rows.
+
+    The struct is encoded as JSON and hashed with MD5 (128 bit), so the
+    same values give the same hex digest in every process and run, unlike
+    polars' own `hash`, which can change between polars versions and would
+    orphan payloads saved before an upgrade.
+
+    With the `duckdb` extra installed the digests are computed natively on
+    all cores: about 0.5 seconds per million rows on one core, against 1
+    second for hashing row by row in Python, which is the fallback and gives
+    the same digests.
+
+    Parameters
+    ----------
+    col: str | pl.Expr
+        a struct column
+
+    Returns
+    -------
+    pl.Expr:
+        a column of 32 character hex strings
+    """
+    col = pl.col(col) if isinstance(col, str) else col
+    return col.struct.json_encode().map_batches(_md5_hex, return_dtype=pl.String, is_elementwise=True)
+
+
+def save_raw_values(
+    df_inp: pl.DataFrame | pl.LazyFrame,
+    primary_key_col: str,
+    compact: bool = False,
+    known_payloads: pl.DataFrame | pl.LazyFrame = None
+):
     """ save raw values
 
     Usage
@@ -205,17 +385,32 @@ def save_raw_values(df_inp: pl.DataFrame, primary_key_col: str):
     Converts a polars dataframe into a dataframe with all columns in a struct column.
     It's good for saving raw outputs of data.
 
+    With `compact=True`, each row is instead identified by a stable hash of its
+    raw values (see `raw_hash`), and the raw values are returned in a separate,
+    content-addressed table with one row per distinct hash. Resubmitted rows
+    then only add a hash to the main table. Passing the payloads already
+    archived as `known_payloads` leaves only new payloads in the side table.
+
+    LazyFrames stay lazy, so raw archiving can be sunk as a stream.
+
     Parameters
     ----------
-    df_inp: pl.DataFrame
+    df_inp: pl.DataFrame | pl.LazyFrame
         a polars dataframe
     primary_key_col: str
         column name for the primary key (submission key, not person/case key)
+    compact: bool (optional)
+        store each distinct raw row once in a side table. Defaults to False.
+    known_payloads: pl.DataFrame | pl.LazyFrame (optional)
+        previously saved payloads (with a `raw_hash` column) to leave out of
+        the side table in compact mode
 
     Returns
     -------
-    df: pl.DataFrame
-        a dataframe
+    df: pl.DataFrame | pl.LazyFrame
+        a dataframe, or with `compact=True` a tuple of the submissions
+        (`submission_number`, `internal_create_date`, `raw_hash`) and the
+        payloads (`raw_hash`, `raw_inbound_submission`)
     
     Examples
     --------
@@ -242,7 +437,36 @@ def save_raw_values(df_inp: pl.DataFrame, primary_key_col: str):
     helpers.gt_style(received_submissions_df)
     ```
 
+    In compact mode, the raw values go to a separate table of distinct rows:
+
+    ```{python}
+    submissions, payloads = helpers.save_raw_values(df_inp=data, primary_key_col="WA_ID", compact=True)
+
+    helpers.gt_style(payloads)
+    ```
+
     """
+    if compact:
+        df = (
+            df_inp
+            .select([
+                pl.col(primary_key_col).alias('submission_number'),
+                pl.lit(date.today()).alias("internal_create_date"),
+                pl.struct(pl.all()).alias("raw_inbound_submission")
+            ])
+            .with_columns(raw_hash(pl.col("raw_inbound_submission")).alias("raw_hash"))
+        )
+        submissions = df.select(['submission_number', 'internal_create_date', 'raw_hash'])
+        payloads = (
+            df
+            .select(['raw_hash', 'raw_inbound_submission'])
+            .unique(subset='raw_hash', keep='first', maintain_order=True)
+        )
+        if known_payloads is not None:
+            payloads = payloads.lazy().join(known_payloads.lazy().select('raw_hash'), on='raw_hash', how='anti')
+            if isinstance(df_inp, pl.DataFrame):
+                payloads = payloads.collect()
+        return submissions, payloads
 
     df = (
         df_inp
@@ -262,11 +486,14 @@ def save_raw_values(df_inp: pl.DataFrame, primary_key_col: str):
 
 
 def gt_style(
-    df_inp: pl.DataFrame,
+    df_inp: pl.DataFrame | pl.LazyFrame,
     title: str="",
     subtitle: str="",
     add_striping_inp=True,
-    index_inp=True
+    index_inp=True,
+    max_rows: int=None,
+    sample: str="head",
+    page_size: int=None
 ):
 
     """ Style for GT Tables
@@ -275,9 +502,16 @@ def gt_style(
     -----
     Apply this style to a Polars DataFrame
 
+    For large frames, `max_rows` limits the table to the first rows (or the
+    first and last rows, with `sample="head_tail"`), and `page_size` splits
+    the rows into several tables. Only the rows shown are collected from a
+    LazyFrame, and a note under the table says how many of the rows are
+    shown, so rendering time does not depend on the size of the frame. The
+    index keeps the row numbers of the full frame.
+
     Parameters
     ----------
-    df_inp: pl.DataFrame
+    df_inp: pl.DataFrame | pl.LazyFrame
         a polars dataframe
     title: str
         a title for the table (optional)
@@ -287,11 +521,18 @@ def gt_style(
         striping in the table True or False
     index_inp: bool
         add a column for the row number and label it `index`
+    max_rows: int
+        the maximum number of rows to show (optional)
+    sample: str
+        which rows to show when there are more than `max_rows`: "head" for
+        the first rows or "head_tail" for the first and last half
+    page_size: int
+        split the rows shown into tables of this many rows (optional)
 
     Returns
     -------
-    : GT
-        a GT object (great_tables table)
+    : GT | list[GT]
+        a GT object (great_tables table), or a list of them with `page_size`
     
 
     Examples
@@ -327,11 +568,60 @@ def gt_style(
     helpers.gt_style(df_inp=df,add_striping_inp=False)
     ```
 
+    The first and last rows of a large frame:
+    ```{python}
+    big = pl.LazyFrame({"x": range(100_000)})
+    helpers.gt_style(df_inp=big, max_rows=6, sample="head_tail")
+    ```
+
     """
+    if sample not in ["head", "head_tail"]:
+        raise ValueError(f"sample must be one of: 'head', 'head_tail'; got '{sample}'")
+
+    # Frames that fit are shown as before
+    if max_rows is None and page_size is None and isinstance(df_inp, pl.DataFrame):
+        return _gt_table(df_inp.with_row_index() if index_inp else df_inp,
+                         title, subtitle, add_striping_inp, index_inp)
+
+    # Collect only the rows that are shown, keeping their row numbers
+    n_total = lazy_height(df_inp)
+    lf = df_inp.lazy().with_row_index()
+    if max_rows is None or n_total <= max_rows:
+        shown = lf.collect()
+    elif sample == "head":
+        shown = lf.head(max_rows).collect()
+    else:
+        n_head = (max_rows + 1) // 2
+        shown = pl.concat([lf.head(n_head), lf.tail(max_rows - n_head)]).collect()
+    if not index_inp:
+        shown = shown.drop('index')
+
+    def note(table):
+        if shown.height < n_total:
+            table = table.tab_source_note(f"Showing {shown.height:,} of {n_total:,} rows")
+        return table
+
+    if page_size is None:
+        return note(_gt_table(shown, title, subtitle, add_striping_inp, index_inp))
+
+    pages = list(shown.iter_slices(page_size)) or [shown]
+    return [
+        note(_gt_table(page, title, subtitle, add_striping_inp, index_inp))
+        .tab_source_note(f"Page {i + 1} of {len(pages)}")
+        for i, page in enumerate(pages)
+    ]
+
+
+def _gt_table(df: pl.DataFrame, title: str, subtitle: str, add_striping_inp: bool, index_inp: bool) -> 'GT':
+    """Apply the `gt_style` style to a DataFrame that already has its `index` column (if any)"""
+    great_tables = import_optional('great_tables', 'report')
+    GT, md, style, loc, google_font = (
+        great_tables.GT, great_tables.md, great_tables.style, great_tables.loc, great_tables.google_font
+    )
     # Check for title and subtitle, and conditionally add them
     table = (
         GT(
-            df_inp.with_row_index() if index_inp else df_inp,  # Add row index only if index_inp is True
+            df,
             rowname_col="index" if index_inp else None
         )
         # .opt_vertical_padding(scale=1)
@@ -374,14 +664,513 @@ def gt_style(
 
     return table
 
+# Buffer size of remote MFT files; paramiko sends writes in requests of up to 32 KiB
+MFT_BUFFER_SIZE = 1024 * 1024
+
+
+def _frame_batches(frame: pl.DataFrame | Path, batch_size: int):
+    """Yield a DataFrame, or a spooled parquet file, in batches of `batch_size` rows"""
+    if isinstance(frame, pl.DataFrame):
+        yield from frame.iter_slices(batch_size)
+        return
+    # One reader over the spool file, which was written with row groups of batch_size rows
+    parquet = import_optional('pyarrow.parquet', 'mft')
+    for batch in parquet.ParquetFile(frame).iter_batches(batch_size):
+        yield pl.from_arrow(batch)
+
+
+class _RemoteWriter:
+    """A remote file that keeps the first error raised by its writes, to tell transfer errors from
+    conversion errors once polars has wrapped them"""
+    def __init__(self, remote_file):
+        self.remote_file = remote_file
+        self.error = None
+
+    def write(self, data):
+        try:
+            return self.remote_file.write(data)
+        except Exception as e:
+            self.error = self.error or e
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self.remote_file, name)
+
+
+def _write_frame(frame: pl.DataFrame | Path, extension: str, remote_file, batch_size: int) -> None:
+    """Write a DataFrame, or a spooled parquet file, to an open file in batches"""
+    if extension == ".csv":
+        for i, batch in enumerate(_frame_batches(frame, batch_size)):
+            batch.write_csv(remote_file, include_header=i == 0)
+    elif extension == ".json":
+        # A JSON array of row objects, written one batch of rows at a time
+        remote_file.write(b'[')
+        for i, batch in enumerate(_frame_batches(frame, batch_size)):
+            rows = batch.write_json()[1:-1]
+            remote_file.write(((',' if i else '') + rows).encode('utf-8'))
+        remote_file.write(b']')
+    elif extension == ".parquet":
+        if isinstance(frame, pl.DataFrame):
+            frame.write_parquet(remote_file, row_group_size=batch_size)
+        else:
+            with open(frame, 'rb') as spool:
+                shutil.copyfileobj(spool, remote_file, MFT_BUFFER_SIZE)
+    elif extension == ".xlsx":
+        # Workbooks are zipped as a whole, so they are built in memory
+        buffer = BytesIO()
+        (frame if isinstance(frame, pl.DataFrame) else pl.read_parquet(frame)).write_excel(buffer)
+        remote_file.write(buffer.getvalue())
+
+
+class MFTUploadResult(BaseModel):
+    """Summary of one file uploaded to the MFT server"""
+    path: str
+    rows: int
+    bytes: int
+    seconds: float
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+
+def _check_upload(
+    upload: pl.DataFrame | pl.LazyFrame,
+    dir: str,
+    upload_file_name: str,
+    upload_file_extension: str
+) -> None:
+    """Validate the inputs of an MFT upload"""
+    if not isinstance(upload, (pl.DataFrame, pl.LazyFrame)):
+        raise TypeError(f"upload must be a Polars DataFrame or LazyFrame, got {type(upload)}")
+    
+    if upload.limit(1).lazy().collect().is_empty():
+        raise ValueError("Cannot upload empty DataFrame")
+    
+    if not dir or not upload_file_name:
+        raise ValueError("dir and upload_file_name cannot be empty")
+    
+    # Supported file extensions
+    supported_extensions = {'.csv', '.xlsx', '.json', '.parquet'}
+    if upload_file_extension not in supported_extensions:
+        raise ValueError(
+            f"Unsupported file type: {upload_file_extension}. "
+            f"Supported formats: {', '.join(sorted(supported_extensions))}"
+        )
+
+
+class MFTSession:
+    """Upload many files to the Washington State MFT server over one connection
+
+    A context manager that connects and authenticates once, then uploads
+    files over a pool of SFTP channels on that connection, with up to
+    `max_channels` files in flight at a time.
+
+    Usage
+    -----
+    Use this instead of repeated `mft_upload` calls when sending several
+    files, e.g. one file per county, so the SSH handshake and login are paid
+    once. Files are written the same way as in `mft_upload`, and each upload
+    prints and returns its size, duration and throughput. Inbound files can
+    be read into frames the same way with `download` and `download_many`.
+
+    Parameters
+    ----------
+    username : str
+        MFT server username.
+    password : str
+        MFT server password.
+    host : str, optional
+        MFT server hostname. Default is 'mft.wa.gov'.
+    max_channels : int, optional
+        Number of SFTP channels, and so of files uploaded at the same time.
+        Default is 4.
+
+    Raises
+    ------
+    ConnectionError
+        If authentication or the SSH connection fails.
+
+    Examples
+    --------
+    ```python
+    import polars as pl
+    from wadoh_raccoon.utils.helpers import MFTSession
+
+    with MFTSession(username=mft_user, password=mft_pass) as session:
+        results = session.upload_many({
+            f'DEV_TESTING/report_{county}.csv': df.filter(pl.col('county') == county)
+            for county in counties
+        })
+    ```
+    """
+    def __init__(self, username: str, password: str, host: str = "mft.wa.gov", max_channels: int = 4):
+        self.username = username
+        self.password = password
+        self.host = host
+        self.max_channels = max_channels
+        self.client = None
+        self.channels = queue.Queue()
+
+    def __enter__(self):
+        self.connect()
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def connect(self) -> None:
+        """Connect, authenticate and open the SFTP channels"""
+        paramiko = import_optional('paramiko', 'mft')
+        self.client = paramiko.SSHClient()
+        try:
+            # Automatically add host keys
+            self.client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+            
+            # Connect to MFT server
+            self.client.connect(
+                hostname=self.host,
+                username=self.username,
+                password=self.password
+            )
+            
+            # Open SFTP sessions over the one connection
+            for _ in range(self.max_channels):
+                self.channels.put(self.client.open_sftp())
+        except paramiko.AuthenticationException:
+            self.close()
+            raise ConnectionError("Authentication failed. Check username and password.")
+        except paramiko.SSHException as e:
+            self.close()
+            raise ConnectionError(f"SSH connection error: {e}")
+
+    def close(self) -> None:
+        """Close the SFTP channels and the connection"""
+        while not self.channels.empty():
+            self.channels.get().close()
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+    def upload(
+        self,
+        upload: pl.DataFrame | pl.LazyFrame,
+        dir: str,
+        upload_file_name: str,
+        upload_file_extension: str,
+        batch_size: int = 100_000
+    ) -> MFTUploadResult:
+        """Upload a frame over a free channel. See `mft_upload` for the parameters."""
+        _check_upload(upload, dir, upload_file_name, upload_file_extension)
+        upload_path = f"{dir}/{upload_file_name}{upload_file_extension}"
+
+        # Stream LazyFrames into a local spool file that can be read back in batches
+        with tempfile.TemporaryDirectory() as spool_dir:
+            start = time.perf_counter()
+            if isinstance(upload, pl.LazyFrame):
+                frame = Path(spool_dir) / 'upload.parquet'
+                try:
+                    sink_parquet(upload, frame, row_group_size=batch_size)
+                except Exception as e:
+                    raise ValueError(f"Failed to convert DataFrame to {upload_file_extension}: {e}")
+                n_rows = pl.scan_parquet(frame).select(pl.len()).collect().item()
+            else:
+                frame = upload
+                n_rows = upload.height
+
+            sftp = self.channels.get()
+            try:
+                try:
+                    remote_file = sftp.open(upload_path, 'wb', bufsize=MFT_BUFFER_SIZE)
+                except OSError as e:
+                    raise OSError(
+                        f"Failed to upload to {upload_path}. "
+                        f"Verify directory '{dir}' exists and is accessible. Error: {e}"
+                    )
+                # Write file to remote server (binary mode), without waiting for
+                # the server to acknowledge each write
+                with remote_file:
+                    remote_file.set_pipelined(True)
+                    writer = _RemoteWriter(remote_file)
+                    try:
+                        _write_frame(frame, upload_file_extension, writer, batch_size)
+                    except Exception as e:
+                        # SSH and network errors are raised as they are
+                        if writer.error is not None:
+                            raise writer.error
+                        raise ValueError(f"Failed to convert DataFrame to {upload_file_extension}: {e}")
+                    n_bytes = remote_file.tell()
+            finally:
+                self.channels.put(sftp)
+
+        result = MFTUploadResult(path=upload_path, rows=n_rows, bytes=n_bytes, seconds=time.perf_counter() - start)
+        print(
+            f"Successfully uploaded {n_rows} rows to {upload_path} "
+            f"({n_bytes / 1e6:.1f} MB in {result.seconds:.1f}s, {result.mb_per_second:.1f} MB/s)"
+        )
+        return result
+
+    def upload_many(
+        self,
+        uploads: dict[str, pl.DataFrame | pl.LazyFrame],
+        batch_size: int = 100_000
+    ) -> list[MFTUploadResult]:
+        """Upload many frames at once, up to `max_channels` at a time
+
+        Parameters
+        ----------
+        uploads : dict[str, polars.DataFrame | polars.LazyFrame]
+            The frame to upload to each remote path, by path (e.g.
+            'outbound/partner/report.csv'). The extension of the path sets the
+            file format.
+        batch_size : int, optional
+            Number of rows written at a time. Default is 100,000.
+
+        Returns
+        -------
+        list[MFTUploadResult]
+            The path, rows, bytes and duration of each upload, in the order
+            of `uploads`.
+        """
+        def upload_path(path, upload):
+            path = PurePosixPath(path)
+            return self.upload(upload, str(path.parent), path.stem, path.suffix, batch_size)
+
+        with ThreadPoolExecutor(max_workers=self.max_channels) as executor:
+            results = list(executor.map(upload_path, uploads.keys(), uploads.values()))
+
+        total_bytes = sum(result.bytes for result in results)
+        print(f"Uploaded {len(results)} files ({total_bytes / 1e6:.1f} MB) to {self.host}")
+        return results
+
+    def list_files(self, pattern: str) -> dict[str, 'paramiko.SFTPAttributes']:
+        """List the remote files matching a glob pattern
+
+        Parameters
+        ----------
+        pattern : str
+            A directory and a file name pattern, e.g. 'inbound/labs/*.csv'.
+            The pattern applies to file names (`fnmatch` syntax); the
+            directory is taken as-is.
+
+        Returns
+        -------
+        dict[str, paramiko.SFTPAttributes]
+            The attributes (size, mtime) of each matching file, by path,
+            sorted by path.
+        """
+        path = PurePosixPath(pattern)
+        sftp = self.channels.get()
+        try:
+            files = sftp.listdir_attr(str(path.parent))
+        finally:
+            self.channels.put(sftp)
+        return {
+            f"{path.parent}/{file.filename}": file
+            for file in sorted(files, key=lambda file: file.filename)
+            if fnmatch.fnmatch(file.filename, path.name)
+        }
+
+    def download(self, path: str, lazy: bool = False, **kwargs) -> pl.DataFrame | pl.LazyFrame:
+        """Read a remote file into a DataFrame
+
+        The file is read over a free channel with paramiko's prefetching,
+        which requests the whole file up front instead of one block per
+        round trip, and copied block by block to a local spool file, so it
+        is never held in memory whole before polars parses it.
+
+        Parameters
+        ----------
+        path : str
+            The remote file path. Its extension ('.csv', '.json', '.parquet'
+            or '.xlsx') sets the file format.
+        lazy : bool, optional
+            Return '.csv' and '.parquet' files as LazyFrames scanning the
+            spool file, which is kept until the process exits. JSON and Excel
+            files are always read into memory. Default is False.
+        **kwargs
+            Passed on to the polars reader or scanner (e.g. `schema_overrides`).
+
+        Returns
+        -------
+        polars.DataFrame | polars.LazyFrame
+            The contents of the file.
+        """
+        extension = PurePosixPath(path).suffix
+        readers = {'.csv': pl.read_csv, '.json': pl.read_json, '.parquet': pl.read_parquet, '.xlsx': pl.read_excel}
+        if extension not in readers:
+            raise ValueError(
+                f"Unsupported file type: {extension}. "
+                f"Supported formats: {', '.join(sorted(readers))}"
+            )
+
+        start = time.perf_counter()
+        spool = _spill_dir() / f'{time.time_ns()}-{threading.get_ident()}{extension}'
+        sftp = self.channels.get()
+        try:
+            with sftp.open(path, 'rb', bufsize=MFT_BUFFER_SIZE) as remote_file, open(spool, 'wb') as local_file:
+                remote_file.prefetch()
+                shutil.copyfileobj(remote_file, local_file, MFT_BUFFER_SIZE)
+        except OSError as e:
+            spool.unlink(missing_ok=True)
+            raise OSError(f"Failed to download {path}. Verify the file exists and is accessible. Error: {e}")
+        finally:
+            self.channels.put(sftp)
+
+        seconds = time.perf_counter() - start
+        n_bytes = spool.stat().st_size
+        transfer = f"({n_bytes / 1e6:.1f} MB in {seconds:.1f}s, {n_bytes / 1e6 / seconds if seconds else 0.0:.1f} MB/s)"
+        scanners = {'.csv': pl.scan_csv, '.parquet': pl.scan_parquet}
+        if lazy and extension in scanners:
+            print(f"Successfully downloaded {path} {transfer}")
+            return scanners[extension](spool, **kwargs)
+        try:
+            df = readers[extension](spool, **kwargs)
+        finally:
+            spool.unlink()
+        print(f"Successfully downloaded {df.height} rows from {path} {transfer}")
+        return df
+
+    def download_many(
+        self,
+        pattern: str,
+        seen: dict[str, list[int]] = None,
+        lazy: bool = False,
+        **kwargs
+    ) -> dict[str, pl.DataFrame | pl.LazyFrame]:
+        """Read every remote file matching a pattern, up to `max_channels` at a time
+
+        Parameters
+        ----------
+        pattern : str
+            A directory and a file name pattern, e.g. 'inbound/labs/*.csv'
+            (see `list_files`).
+        seen : dict[str, list[int]], optional
+            The `[size, mtime]` of files already fetched, by path. Files whose
+            size and mtime are unchanged are skipped, and the entries of the
+            downloaded files are updated in place, so passing the same dict
+            to repeated polls only moves new or changed files.
+        lazy : bool, optional
+            Scan '.csv' and '.parquet' files lazily (see `download`).
+            Default is False.
+        **kwargs
+            Passed on to the polars reader.
+
+        Returns
+        -------
+        dict[str, polars.DataFrame | polars.LazyFrame]
+            The contents of each downloaded file, by path.
+        """
+        files = self.list_files(pattern)
+        if seen is not None:
+            files = {
+                path: file for path, file in files.items()
+                if seen.get(path) != [file.st_size, file.st_mtime]
+            }
+
+        with ThreadPoolExecutor(max_workers=self.max_channels) as executor:
+            frames = dict(zip(files, executor.map(lambda path: self.download(path, lazy, **kwargs), files)))
+
+        if seen is not None:
+            seen.update({path: [file.st_size, file.st_mtime] for path, file in files.items()})
+        return frames
+
+
+def mft_download(
+    pattern: str,
+    username: str,
+    password: str,
+    host: str = "mft.wa.gov",
+    seen_file: str | Path = None,
+    max_channels: int = 4,
+    lazy: bool = False,
+    **kwargs
+) -> dict[str, pl.DataFrame | pl.LazyFrame]:
+    """Download files from Washington State MFT server into DataFrames
+
+    Read the files matching a glob pattern from the Managed File Transfer
+    (MFT) server into Polars DataFrames, several files at a time over one
+    authenticated connection. Each file is copied to a temporary local file
+    that polars reads, rather than being held in memory whole.
+
+    Usage
+    -----
+    Use this function to pull inbound files, e.g. lab feeds, from the MFT
+    server. With `seen_file`, the size and modification time of each
+    downloaded file is saved, and files that have not changed since are
+    skipped, so a scheduled poll only downloads new data.
+
+    Parameters
+    ----------
+    pattern : str
+        A directory and a file name pattern, e.g. 'inbound/labs/*.csv'.
+        Supported formats: '.csv', '.json', '.parquet', '.xlsx'.
+    username : str
+        MFT server username.
+    password : str
+        MFT server password.
+    host : str, optional
+        MFT server hostname. Default is 'mft.wa.gov'.
+    seen_file : str | Path, optional
+        A JSON file recording the files already downloaded. Created if it
+        does not exist. Default is None (download every matching file).
+    max_channels : int, optional
+        Number of files downloaded at the same time. Default is 4.
+    lazy : bool, optional
+        Return '.csv' and '.parquet' files as LazyFrames scanning the local
+        copies, which are removed when the process exits. Default is False.
+    **kwargs
+        Passed on to the polars reader (e.g. `schema_overrides`).
+
+    Returns
+    -------
+    dict[str, polars.DataFrame | polars.LazyFrame]
+        The contents of each downloaded file, by remote path.
+
+    Raises
+    ------
+    ConnectionError
+        If authentication or the SSH connection fails.
+    OSError
+        If a file cannot be read.
+
+    Examples
+    --------
+    ```python
+    from wadoh_raccoon.utils.helpers import mft_download
+
+    new_files = mft_download(
+        pattern='inbound/labs/*_results.csv',
+        username=mft_user,
+        password=mft_pass,
+        seen_file='mft_seen.json'
+    )
+    for path, df in new_files.items():
+        print(path, df.height)
+    ```
+    """
+    seen = None
+    if seen_file is not None:
+        seen_file = Path(seen_file)
+        seen = json.loads(seen_file.read_text()) if seen_file.exists() else {}
+
+    with MFTSession(username, password, host, max_channels) as session:
+        frames = session.download_many(pattern, seen, lazy, **kwargs)
+
+    if seen_file is not None:
+        seen_file.write_text(json.dumps(seen, indent=2))
+    return frames
+
+
 def mft_upload(
-    upload: pl.DataFrame,
+    upload: pl.DataFrame | pl.LazyFrame,
     dir: str,
     upload_file_name: str,
     upload_file_extension: str,
     username: str,
     password: str,
-    host: str = "mft.wa.gov"
+    host: str = "mft.wa.gov",
+    batch_size: int = 100_000
 ) -> None:
     """Upload files to Washington State MFT server
 
@@ -398,11 +1187,21 @@ def mft_upload(
     Use this function to upload processed surveillance data, reports, or other 
     DataFrames to the MFT server for sharing with partners. 
     The function handles file format conversion.
+
+    CSV, JSON and Parquet files are written straight into the remote file in
+    batches of `batch_size` rows, over a pipelined SFTP handle with a large
+    buffer, so the encoded file is never held in memory. LazyFrames are first
+    sunk (streamed) into a temporary Parquet file and then read back one batch
+    at a time, so peak memory does not depend on the size of the file. Excel
+    workbooks are still built in memory.
+
+    Each call connects and authenticates once for a single file. Use
+    `MFTSession` to upload many files over one connection.
     
     Parameters
     ----------
-    upload : polars.DataFrame
-        The Polars DataFrame to upload.
+    upload : polars.DataFrame | polars.LazyFrame
+        The Polars DataFrame or LazyFrame to upload.
     dir : str
         Target directory path on the MFT server (e.g., '/outbound/partner').
     upload_file_name : str
@@ -416,6 +1215,9 @@ def mft_upload(
         MFT server password.
     host : str, optional
         MFT server hostname. Default is 'mft.wa.gov'.
+    batch_size : int, optional
+        Number of rows written at a time (and rows per Parquet row group).
+        Default is 100,000.
     
     Returns
     -------
@@ -425,7 +1227,7 @@ def mft_upload(
     Raises
     ------
     TypeError
-        If upload is not a Polars DataFrame.
+        If upload is not a Polars DataFrame or LazyFrame.
     ValueError
         If upload is empty, required parameters are missing, or 
         upload_file_extension is not supported.
@@ -474,89 +1276,16 @@ def mft_upload(
     )
     ```
     """
-    
-    # Input validation
-    if not isinstance(upload, pl.DataFrame):
-        raise TypeError(f"upload must be a Polars DataFrame, got {type(upload)}")
-    
-    if upload.is_empty():
-        raise ValueError("Cannot upload empty DataFrame")
-    
-    if not dir or not upload_file_name:
-        raise ValueError("dir and upload_file_name cannot be empty")
-    
-    # Supported file extensions
-    supported_extensions = {'.csv', '.xlsx', '.json', '.parquet'}
-    if upload_file_extension not in supported_extensions:
-        raise ValueError(
-            f"Unsupported file type: {upload_file_extension}. "
-            f"Supported formats: {', '.join(sorted(supported_extensions))}"
-        )
-    
-    # Convert DataFrame to bytes based on extension
-    try:
-        if upload_file_extension == ".csv":
-            upload_file = upload.write_csv().encode('utf-8')
-        elif upload_file_extension == ".xlsx":
-            buffer = BytesIO()
-            upload.write_excel(buffer)
-            upload_file = buffer.getvalue()
-        elif upload_file_extension == ".json":
-            upload_file = upload.write_json().encode('utf-8')
-        elif upload_file_extension == ".parquet":
-            buffer = BytesIO()
-            upload.write_parquet(buffer)
-            upload_file = buffer.getvalue()
-        else:
-            # Should never reach here due to earlier validation
-            raise ValueError(f"Unsupported extension: {upload_file_extension}")
-    except Exception as e:
-        raise ValueError(f"Failed to convert DataFrame to {upload_file_extension}: {e}")
-    
-    # Establish SFTP connection and upload
-    client = paramiko.SSHClient()
-    
+
+    # Connect, upload and disconnect; the session validates the input
     try:
-        # Automatically add host keys
-        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-        
-        # Connect to MFT server
-        client.connect(
-            hostname=host,
-            username=username,
-            password=password
-        )
-        
-        # Open SFTP session
-        sftp = client.open_sftp()
-        
-        try:
-            # Define upload path
-            upload_path = f"{dir}/{upload_file_name}{upload_file_extension}"
-            
-            # Write file to remote server (binary mode)
-            with sftp.open(upload_path, 'wb') as remote_file:
-                remote_file.write(upload_file)
-            
-            print(f"Successfully uploaded {upload.shape[0]} rows to {upload_path}")
-            
-        except (OSError, IOError) as e:
-            raise OSError(
-                f"Failed to upload to {upload_path}. "
-                f"Verify directory '{dir}' exists and is accessible. Error: {e}"
-            )
-        finally:
-            sftp.close()
-            
-    except paramiko.AuthenticationException:
-        raise ConnectionError("Authentication failed. Check username and password.")
-    except paramiko.SSHException as e:
-        raise ConnectionError(f"SSH connection error: {e}")
+        with MFTSession(username, password, host, max_channels=1) as session:
+            session.upload(upload, dir, upload_file_name, upload_file_extension, batch_size)
+    except (ConnectionError, ValueError):
+        raise
     except Exception as e:
         raise ConnectionError(f"Unexpected error during SFTP upload: {e}")
-    finally:
-        client.close()
-        
+
 def lazy_height(lf: pl.DataFrame | pl.LazyFrame):
     """Output the height of a polars frame regardless of it being lazy or eager"""
     if isinstance(lf, pl.LazyFrame):
@@ -564,3 +1293,147 @@ def lazy_height(lf: pl.DataFrame | pl.LazyFrame):
     else:
         return lf.height
 
+
+def sink_frame(df: pl.LazyFrame, path: str | Path, format: str = 'parquet', **kwargs) -> None:
+    """
+    Write a LazyFrame to a 'parquet', 'csv' or 'ipc' file, streaming it when the polars streaming engine
+    supports every step of its plan, and collecting it first otherwise. `kwargs` are passed on to the
+    `sink_*` or `write_*` method.
+    """
+    try:
+        with warnings.catch_warnings():
+            # polars warns that its streaming engine is being replaced, which callers cannot act on
+            warnings.simplefilter('ignore', DeprecationWarning)
+            getattr(df, f'sink_{format}')(path, **kwargs)
+    except pl.exceptions.InvalidOperationError:
+        getattr(df.collect(), f'write_{format}')(path, **kwargs)
+
+
+def sink_parquet(df: pl.LazyFrame, path: str | Path, row_group_size: int | None = None) -> None:
+    """
+    Write a LazyFrame to Parquet with `sink_frame`. `row_group_size` is the number of rows per row group.
+    """
+    sink_frame(df, path, 'parquet', row_group_size=row_group_size)
+
+
+def scan_file(path: str | Path) -> pl.LazyFrame:
+    """
+    Lazily scan a Parquet, CSV or Arrow IPC file, chosen by its extension ('.parquet', '.csv', '.ipc',
+    '.arrow' or '.feather'). Globs are allowed.
+
+    Raises ValueError for other extensions. A missing file raises FileNotFoundError when the scan is collected,
+    or right away for paths without a glob.
+    """
+    scanners = {'.parquet': pl.scan_parquet, '.csv': pl.scan_csv, '.ipc': pl.scan_ipc, '.arrow': pl.scan_ipc,
+                '.feather': pl.scan_ipc}
+    suffix = Path(path).suffix.lower()
+    if suffix not in scanners:
+        raise ValueError(f"unsupported file type '{suffix}' for {path}; use one of {', '.join(scanners)}")
+    return scanners[suffix](path)
+
+
+# Directory for Arrow streams written to disk by to_polars and files spooled by MFTSession.download,
+# removed when the process exits
+_SPILL_DIR = None
+_SPILL_LOCK = threading.Lock()
+
+
+def _spill_dir() -> Path:
+    # The spill directory, created on first use; downloads running in threads may ask for it at once
+    global _SPILL_DIR
+    with _SPILL_LOCK:
+        if _SPILL_DIR is None:
+            _SPILL_DIR = tempfile.TemporaryDirectory(prefix='wadoh-raccoon-')
+    return Path(_SPILL_DIR.name)
+
+
+def to_polars(data, batch_size: int = 100_000) -> pl.DataFrame | pl.LazyFrame:
+    """
+    Convert Arrow and DuckDB data to a polars frame, without copying where the layouts allow.
+
+    - polars frames are returned as they are.
+    - `pyarrow.Table` and `pyarrow.RecordBatch` become a DataFrame sharing the Arrow buffers.
+    - DuckDB relations become a LazyFrame that runs the relation each time it is collected, streaming
+      record batches of `batch_size` rows and pushing the selected columns down to DuckDB.
+    - `pyarrow.RecordBatchReader` and other Arrow C stream objects (`__arrow_c_stream__`) can only be read
+      once, so their batches are written one at a time to a temporary Arrow IPC file, which is scanned
+      lazily (memory-mapped) and removed when the process exits.
+
+    Dictionary-encoded (categorical) columns are cast to strings, the only copy made.
+
+    Parameters
+    ----------
+    data:
+        A polars frame, pyarrow Table, RecordBatch or RecordBatchReader, DuckDB relation, or any object
+        with `__arrow_c_stream__`.
+    batch_size: int
+        The number of rows per batch read from a DuckDB relation.
+
+    Returns
+    -------
+    pl.DataFrame | pl.LazyFrame
+        the data as a polars frame
+
+    Raises
+    ------
+    TypeError:
+        if the data is none of the above
+    """
+    module = type(data).__module__.split('.')[0]
+    if isinstance(data, (pl.DataFrame, pl.LazyFrame)):
+        return data
+    if module == 'duckdb' and hasattr(data, 'limit'):
+        df = _duckdb_frame(data, batch_size)
+    elif module == 'pyarrow' and type(data).__name__ in ('Table', 'RecordBatch'):
+        df = pl.from_arrow(data, rechunk=False)
+    elif hasattr(data, '__arrow_c_stream__'):
+        df = _spill_arrow_stream(data)
+    else:
+        raise TypeError(
+            f"Expected a polars frame, Arrow table or stream, or DuckDB relation. Got: {type(data).__name__}"
+        )
+    categorical = [col for col, dtype in df.collect_schema().items() if dtype in (pl.Categorical, pl.Enum)]
+    return df.with_columns(pl.col(categorical).cast(pl.String)) if categorical else df
+
+
+def _duckdb_frame(relation, batch_size: int) -> pl.LazyFrame:
+    # A LazyFrame re-running the relation on every collect, so it can be scanned more than once
+    from polars.io.plugins import register_io_source
+
+    def arrow_reader(rel):
+        # to_arrow_reader replaced fetch_arrow_reader in duckdb 1.4
+        read = getattr(rel, 'to_arrow_reader', None) or rel.fetch_arrow_reader
+        return read(batch_size)
+
+    schema = pl.from_arrow(arrow_reader(relation.limit(0)).read_all()).schema
+
+    def source(with_columns, predicate, n_rows, _batch_size):
+        rel = relation
+        if with_columns:
+            rel = rel.project(', '.join('"{}"'.format(col.replace('"', '""')) for col in with_columns))
+        if n_rows is not None and predicate is None:
+            rel = rel.limit(n_rows)
+        for batch in arrow_reader(rel):
+            df = pl.from_arrow(batch, rechunk=False)
+            if predicate is not None:
+                df = df.filter(predicate)
+            if n_rows is not None:
+                df = df.head(n_rows)
+                n_rows -= df.height
+            yield df
+            if n_rows == 0:
+                break
+
+    return register_io_source(source, schema=schema)
+
+
+def _spill_arrow_stream(stream) -> pl.LazyFrame:
+    # Write a one-shot Arrow stream to an IPC file batch by batch and scan it
+    pa = import_optional('pyarrow', 'arrow')
+    ipc = importlib.import_module('pyarrow.ipc')
+    reader = stream if isinstance(stream, pa.RecordBatchReader) else pa.RecordBatchReader.from_stream(stream)
+    path = _spill_dir() / f'{time.time_ns()}-{threading.get_ident()}.arrow'
+    with ipc.new_file(path, reader.schema) as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+    return pl.scan_ipc(path, memory_map=True)
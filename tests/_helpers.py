@@ -0,0 +1,9 @@
+from polars.testing import assert_frame_equal
+from wadoh_raccoon.dataframe_matcher import RESULT_SETS
+
+
+def assert_results_equal(output, expected):
+    """Check that two DataFrameMatcherResults (eager or lazy) hold the same rows in every result set"""
+    for name in RESULT_SETS:
+        assert_frame_equal(getattr(output, name).lazy().collect(), getattr(expected, name).lazy().collect(),
+                           check_row_order=False)
@@ -0,0 +1,59 @@
+import random
+import polars as pl
+import pytest
+from datetime import date, timedelta
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+
+FIRST_NAMES = ['JOHN', 'MARY', 'JAMES', 'PATRICIA', 'ROBERT', 'JENNIFER', 'MICHAEL', 'LINDA', 'ANNE-MARIE']
+LAST_NAMES = ['SMITH', 'JOHNSON', 'WILLIAMS', 'BROWN', 'GARCIA', 'MILLER', 'XIONG', 'VAN DER BILT']
+
+
+@pytest.fixture
+def data():
+    """Reference cases and submissions; the first 100 submissions are (sometimes misspelled) cases"""
+    rng = random.Random(1)
+
+    def typo(name):
+        if rng.random() < 0.5:
+            return name
+        i = rng.randrange(len(name))
+        return name[:i] + rng.choice('AEIOU') + name[i + 1:]
+
+    def collection_date():
+        return date(2024, 1, 1) + timedelta(days=rng.randrange(300))
+
+    dobs = [date(1980, 1, 1) + timedelta(days=rng.randrange(30)) for _ in range(300)]
+    ref = [
+        (i, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), dobs[i], collection_date(), rng.choice('AB'))
+        for i in range(300)
+    ]
+    src = [
+        (i, typo(first), typo(last), dob, spec_date + timedelta(days=rng.randrange(40)), county)
+        for i, first, last, dob, spec_date, county in ref[:100]
+    ] + [
+        (i, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), rng.choice(dobs + [None]), collection_date(),
+         rng.choice('AB'))
+        for i in range(100, 200)
+    ]
+    columns = ['first_name', 'last_name', 'dob', 'collection_date']
+    return (
+        pl.DataFrame(src, schema=['submission_number'] + columns + ['county'], orient='row'),
+        pl.DataFrame(ref, schema=['case_id'] + columns + ['case_county'], orient='row')
+    )
+
+
+@pytest.fixture
+def make_matcher():
+    """A function building a DataFrameMatcher over the columns of `data`, keyed by submission number"""
+    def matcher(src, ref, **kwargs):
+        return DataFrameMatcher(
+            df_src=src,
+            df_ref=ref,
+            first_name='first_name',
+            last_name='last_name',
+            dob='dob',
+            spec_col_date='collection_date',
+            key='submission_number',
+            **kwargs
+        )
+    return matcher
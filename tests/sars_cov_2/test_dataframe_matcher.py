@@ -5,7 +5,8 @@ from pathlib import Path
 import itertools
 
 # Import the DataFrameMatcher class
-from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher, MatchReference
+from wadoh_raccoon.utils import helpers
 
 # Path to test data directory
 TEST_DATA_DIR = Path(__file__).parent / "data"
@@ -192,3 +193,82 @@ class TestDataFrameMatcher:
         assert_frame_equal(output.no_demo, no_demo_test_exp_results_df)
         assert_frame_equal(output.fuzzy_matched, fuzzy_matched_test_exp_results_blocked_df)
         assert_frame_equal(output.fuzzy_unmatched, fuzzy_unmatched_test_exp_results_blocked_df)
+
+    @pytest.mark.parametrize('lazy', ['lazy', 'eager'])
+    def test_multiple_references(self,
+                                 fuzzy_match_test_df,
+                                 match_to_test_df,
+                                 exact_matched_test_exp_results_df,
+                                 fuzzy_matched_test_exp_results_df,
+                                 fuzzy_unmatched_test_exp_results_df,
+                                 no_demo_test_exp_results_df,
+                                 lazy):
+        """Test matching against several named references in one pass."""
+
+        # A second reference holding the same cases under different column names
+        registry_df = match_to_test_df.rename({
+            'FIRST_NAME': 'GIVEN_NAME',
+            'LAST_NAME': 'SURNAME',
+            'PATIENT_DOB': 'BIRTH_DATE',
+            'SPECIMEN__COLLECTION__DTTM': 'COLLECTION_DATE'
+        })
+
+        if lazy == 'lazy':
+            fuzzy_match_test_df = fuzzy_match_test_df.lazy()
+            match_to_test_df = match_to_test_df.lazy()
+            registry_df = registry_df.lazy()
+
+        references = {
+            'wdrs': match_to_test_df,
+            'registry': MatchReference(
+                df=registry_df,
+                first_name='GIVEN_NAME',
+                last_name='SURNAME',
+                dob='BIRTH_DATE',
+                spec_col_date='COLLECTION_DATE'
+            )
+        }
+
+        def matcher():
+            return DataFrameMatcher(
+                df_src=fuzzy_match_test_df,
+                df_ref=references,
+                first_name='FIRST_NAME',
+                last_name='LAST_NAME',
+                dob=('DOB', 'PATIENT_DOB'),
+                spec_col_date=('SEQUENCE_SPECIMEN_COLLECTION_DATE', 'SPECIMEN__COLLECTION__DTTM'),
+                key='submission_number'
+            )
+
+        def collect(df):
+            return df.collect() if isinstance(df, pl.LazyFrame) else df
+
+        # Results per reference match a single reference run
+        output = matcher().match()
+        wdrs = output['wdrs']
+        assert list(output) == ['wdrs', 'registry']
+        assert_frame_equal(collect(wdrs.exact_matched), exact_matched_test_exp_results_df, check_row_order=False)
+        assert_frame_equal(collect(wdrs.fuzzy_matched), fuzzy_matched_test_exp_results_df, check_row_order=False)
+        assert_frame_equal(collect(wdrs.fuzzy_unmatched), fuzzy_unmatched_test_exp_results_df,
+                           check_row_order=False)
+        assert_frame_equal(collect(wdrs.no_demo), no_demo_test_exp_results_df)
+        assert_frame_equal(collect(output['registry'].no_demo), no_demo_test_exp_results_df)
+        assert helpers.lazy_height(output['registry'].fuzzy_matched) == 2
+
+        # Each reference is cleaned on its own, by name
+        ref_prep, _ = matcher().clean_all()
+        assert list(ref_prep) == ['wdrs', 'registry']
+        assert_frame_equal(collect(ref_prep['registry']), collect(matcher().clean_ref('registry')))
+        with pytest.raises(ValueError, match='clean_ref'):
+            matcher().clean_ref()
+
+        # Combined results keep the best match per record, tied on the first listed reference
+        combined = matcher().match(combine=True)
+        for result, expected in [
+            (combined.exact_matched, exact_matched_test_exp_results_df),
+            (combined.fuzzy_matched, fuzzy_matched_test_exp_results_df),
+            (combined.fuzzy_unmatched, fuzzy_unmatched_test_exp_results_df),
+        ]:
+            result = collect(result)
+            assert result['reference_source'].to_list() == ['wdrs'] * result.height
+            assert_frame_equal(result.select(expected.columns), expected, check_row_order=False)
@@ -0,0 +1,88 @@
+import polars as pl
+import pytest
+from datetime import date
+from polars.testing import assert_frame_equal
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+from wadoh_raccoon.utils import helpers
+from tests._helpers import assert_results_equal
+
+pa = pytest.importorskip('pyarrow')
+
+
+@pytest.fixture
+def data():
+    src = pl.DataFrame({
+        'id': [1, 2, 3, 4],
+        'first_name': ['MARY', 'JOHN', 'ANNE', None],
+        'last_name': ['JONES', 'BROWN', 'SMITH', 'SMITH'],
+        'dob': [date(1980, 1, 1), date(1990, 1, 1), date(1970, 5, 5), date(1990, 1, 1)],
+        'collection_date': [date(2024, 3, 1), date(2024, 4, 15), date(2024, 3, 20), date(2024, 3, 1)],
+    })
+    ref = pl.DataFrame({
+        'case_id': [10, 11, 12],
+        'first_name': ['MARY', 'JON', 'ANN'],
+        'last_name': ['JONES', 'BROWN', 'SMITH'],
+        'dob': [date(1980, 1, 1), date(1990, 1, 1), date(1970, 5, 5)],
+        'collection_date': [date(2024, 3, 1), date(2024, 4, 12), date(2024, 3, 21)],
+    })
+    return src, ref
+
+
+def assert_same_results(src, ref, expected_src, expected_ref):
+    def match(df_src, df_ref):
+        return DataFrameMatcher(
+            df_src, df_ref, 'first_name', 'last_name', 'dob', 'collection_date', key='id', threshold=70
+        ).match(verbose=False)
+
+    assert_results_equal(match(src, ref), match(expected_src, expected_ref))
+
+
+def test_arrow_table(data):
+    """Test matching pyarrow Tables, which share their buffers with polars"""
+    src, ref = data
+    assert_same_results(src.to_arrow(), ref.to_arrow(), src, ref)
+
+    table = ref.to_arrow()
+    df = helpers.to_polars(table)
+    assert isinstance(df, pl.DataFrame)
+    assert df['case_id']._get_buffer_info()[0] == table['case_id'].chunk(0).buffers()[1].address
+
+
+def test_record_batch_reader(data):
+    """Test matching one-shot record batch streams, read batch by batch"""
+    src, ref = data
+    reader = pa.RecordBatchReader.from_batches(ref.to_arrow().schema, ref.to_arrow().to_batches(max_chunksize=1))
+    assert_same_results(src, reader, src, ref)
+
+    # any object implementing the Arrow C stream interface
+    class Stream:
+        def __arrow_c_stream__(self, requested_schema=None):
+            return src.to_arrow().__arrow_c_stream__(requested_schema)
+
+    df = helpers.to_polars(Stream())
+    assert isinstance(df, pl.LazyFrame)
+    assert_frame_equal(df.collect(), src)
+
+
+def test_duckdb_relation(data):
+    """Test matching DuckDB relations, which stay lazy and can be scanned more than once"""
+    duckdb = pytest.importorskip('duckdb')
+    src, ref = data
+    conn = duckdb.connect()
+    conn.register('src_table', src.to_arrow())
+    conn.register('ref_table', ref.to_arrow())
+    assert_same_results(conn.sql('select * from src_table'), conn.sql('select * from ref_table'), src, ref)
+
+    lf = helpers.to_polars(conn.sql('select * from ref_table'))
+    assert isinstance(lf, pl.LazyFrame)
+    assert lf.select('case_id').collect()['case_id'].to_list() == [10, 11, 12]
+    assert lf.filter(pl.col('case_id') > 10).collect().height == 2
+    assert lf.head(1).collect().height == 1
+
+
+def test_to_polars_coercion():
+    """Test that dictionary-encoded strings become plain strings and other inputs are refused"""
+    table = pa.table({'first_name': pa.array(['MARY', 'JOHN']).dictionary_encode()})
+    assert helpers.to_polars(table).schema['first_name'] == pl.String
+    with pytest.raises(TypeError):
+        helpers.to_polars([{'first_name': 'MARY'}])
@@ -1,5 +1,8 @@
+import io
 import pytest
 import socket
+import polars as pl
+from polars.testing import assert_frame_equal
 from pathlib import Path
 import tempfile
 from azure.storage.blob import BlobServiceClient
@@ -151,7 +154,7 @@ def test_blob_delete_recursive(credential, container_client):
     assert sc_names == exp_names, ("recursive blob_delete sanity check failed:"
                                    f"\nExpected: `{exp_names}`"
                                    f"\nActual: `{sc_names}`")
-    azure.blob_delete(
+    results = azure.blob_delete(
         account=AZURITE_URL,
         container_name=CONTAINER,
         blob_path=BLOB_DIR,
@@ -164,3 +167,145 @@ def test_blob_delete_recursive(credential, container_client):
     assert blob_names == [BLOB_3], ("recursive blob_delete failed."
                                     f"\nExpected: `{[BLOB_3]}`"
                                     f"\nActual: `{blob_names}`")
+    assert results.deleted == 2 and results.failed == 0
+
+
+def test_blob_delete_batches(credential, container_client):
+    """Test recursive deletion of more blobs than fit in one batch"""
+    names = [f"{BLOB_DIR}/sub_{i % 3}/test_{i}.txt" for i in range(azure.BATCH_SIZE + 10)]
+    for name in names:
+        container_client.get_blob_client(name).upload_blob(BLOB_DATA)
+    container_client.get_blob_client(BLOB_3).upload_blob(BLOB_DATA)
+
+    results = azure.blob_delete(
+        account=AZURITE_URL,
+        container_name=CONTAINER,
+        blob_path=BLOB_DIR,
+        credential=credential,
+        recursive=True,
+        account_is_url=True,
+        max_batches=2
+    )
+    assert results.deleted == len(names)
+    assert results.failures == {}
+    assert list(container_client.list_blob_names()) == [BLOB_3]
+
+
+@pytest.mark.parametrize('use_mmap', [False, True])
+def test_blob_chunked_transfer(tmp_path, credential, container_client, use_mmap):
+    """Test uploading and downloading a file in parallel blocks"""
+    # Several blocks of 1 KiB, with a partial last block
+    data = bytes(range(256)) * 20
+    upload_file = tmp_path / 'upload.bin'
+    upload_file.write_bytes(data)
+    azure.blob_upload(
+        account=AZURITE_URL,
+        container_name=CONTAINER,
+        blob_path=BLOB,
+        file_path=str(upload_file),
+        credential=credential,
+        account_is_url=True,
+        max_concurrency=4,
+        block_size=1024
+    )
+    # The upload should have been staged as separate blocks
+    blocks, _ = container_client.get_blob_client(BLOB).get_block_list()
+    assert len(blocks) == 5
+
+    download_file = tmp_path / 'download.bin'
+    azure.blob_download(
+        account=AZURITE_URL,
+        container_name=CONTAINER,
+        blob_path=BLOB,
+        file_path=str(download_file),
+        credential=credential,
+        account_is_url=True,
+        max_concurrency=4,
+        block_size=1024,
+        use_mmap=use_mmap
+    )
+    assert download_file.read_bytes() == data
+
+
+def test_session_reuse(local_file, credential, container_client):
+    """Test that calls to the same account share one session"""
+    azure.clear_sessions()
+    for blob in [BLOB, BLOB_2]:
+        azure.blob_upload(
+            account=AZURITE_URL,
+            container_name=CONTAINER,
+            blob_path=blob,
+            file_path=local_file,
+            credential=credential,
+            account_is_url=True
+        )
+    session = azure.get_session(AZURITE_URL, credential, account_is_url=True)
+    assert list(azure._SESSIONS.values()) == [session]
+
+    # The session can also be used directly
+    with azure.BlobSession(AZURITE_URL, credential, account_is_url=True) as own_session:
+        own_session.delete(CONTAINER, BLOB_DIR, recursive=True)
+    assert list(container_client.list_blob_names()) == []
+    azure.clear_sessions()
+
+
+@pytest.mark.parametrize('extension', ['parquet', 'csv', 'ipc'])
+def test_blob_frame_round_trip(credential, container_client, extension):
+    """Test writing a frame straight to a blob and reading it back"""
+    df = pl.DataFrame({'case_id': range(5000), 'last_name': ['SMITH', 'JONES'] * 2500})
+    blob_path = f"{BLOB_DIR}/frame.{extension}"
+    azure.blob_write_frame(
+        df.lazy(),
+        account=AZURITE_URL,
+        container_name=CONTAINER,
+        blob_path=blob_path,
+        credential=credential,
+        account_is_url=True,
+        block_size=4096
+    )
+    # The frame should have been staged as several blocks
+    blocks, _ = container_client.get_blob_client(blob_path).get_block_list()
+    assert len(blocks) > 1
+
+    result = azure.blob_read_frame(
+        account=AZURITE_URL,
+        container_name=CONTAINER,
+        blob_path=blob_path,
+        credential=credential,
+        account_is_url=True
+    )
+    assert_frame_equal(result, df)
+
+
+def test_blob_frame_failed_write(credential, container_client):
+    """Test that a write that fails partway leaves the existing blob as it was"""
+    blob_path = f"{BLOB_DIR}/frame.parquet"
+    blob_client = container_client.get_blob_client(blob_path)
+    blob_client.upload_blob(BLOB_DATA)
+    with pytest.raises(RuntimeError):
+        with azure._BlobWriter(blob_client, block_size=4, max_concurrency=2) as writer:
+            writer.write(b'partial data')
+            raise RuntimeError('failed while writing')
+    assert blob_client.download_blob().readall() == BLOB_DATA
+
+
+def test_blob_scan_parquet(credential, container_client):
+    """Test lazily scanning a parquet blob with a filter and projection"""
+    df = pl.DataFrame({'case_id': range(5000), 'last_name': ['SMITH', 'JONES'] * 2500})
+    data = io.BytesIO()
+    df.write_parquet(data)
+    container_client.get_blob_client(f"{BLOB_DIR}/frame.parquet").upload_blob(data.getvalue())
+    result = (
+        azure.blob_scan_parquet(
+            account=AZURITE_URL,
+            container_name=CONTAINER,
+            blob_path=f"{BLOB_DIR}/*.parquet",
+            credential=credential,
+            account_is_url=True
+        )
+        .filter(pl.col('case_id') < 10)
+        .select('case_id')
+        .collect()
+    )
+    assert result['case_id'].to_list() == list(range(10))
+
@@ -0,0 +1,109 @@
+import asyncio
+import pytest
+import socket
+from azure.storage.blob import BlobServiceClient
+from azure.core.exceptions import ResourceNotFoundError
+from wadoh_raccoon.utils import azure_aio
+
+# These tests rely on an active azurite session listening at http://127.0.0.1:10000
+# See tests/test_azure.py for details on running azurite.
+
+# Constants for testing
+AZURITE_HOST = "127.0.0.1"
+AZURITE_PORT = 10000
+AZURITE_URL = f"http://{AZURITE_HOST}:{AZURITE_PORT}/devstoreaccount1"
+CONTAINER = "testcontaineraio"
+BLOB_DIR = "blob"
+BLOB_DATA = b"Testing Blob Upload"
+CONNECTION_STRING = (
+    # Use Azurite default dev credentials
+    "DefaultEndpointsProtocol=http;"
+    "AccountName=devstoreaccount1;"
+    "AccountKey=Eby8vdM02xNOcqFlqUwJPLlmEtlCDXJ1OUzFT50uSRZ6IFsuFq2UVErCz4I6tq/K1SZFPTOtr/KBHBeksoGMGw==;"
+    "BlobEndpoint=http://127.0.0.1:10000/devstoreaccount1;"
+)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def check_azurite():
+    """Test whether azurite is listening as the specified host and port"""
+    try:
+        with socket.create_connection((AZURITE_HOST, AZURITE_PORT), timeout=5):
+            pass  # Connection succeeded
+    except Exception as e:
+        pytest.fail(f"Could not connect to Azurite at {AZURITE_HOST}:{AZURITE_PORT}. Error: \n{e}")
+
+@pytest.fixture(scope="module")
+def service_client():
+    """Create a (synchronous) service client object to set up and check the azure tests"""
+    return BlobServiceClient.from_connection_string(conn_str=CONNECTION_STRING)
+
+@pytest.fixture(scope="module")
+def credential(service_client):
+    """Create a credentials object to be shared by all the azure tests"""
+    return service_client.credential
+
+@pytest.fixture
+def container_client(service_client):
+    """Create a container client for each test"""
+    service_client.create_container(CONTAINER)
+    yield service_client.get_container_client(CONTAINER)
+    try:
+        service_client.delete_container(CONTAINER)
+    except ResourceNotFoundError:
+        pass
+
+
+def test_bulk_transfers(tmp_path, credential, container_client):
+    """Test uploading, downloading and deleting many blobs over one session"""
+    files = {}
+    for i in range(50):
+        path = tmp_path / f"upload_{i}.txt"
+        path.write_bytes(BLOB_DATA + str(i).encode())
+        files[f"{BLOB_DIR}/test_{i}.txt"] = str(path)
+    downloads = {blob_path: str(tmp_path / f"download_{i}.txt") for i, blob_path in enumerate(files)}
+
+    async def transfer():
+        async with azure_aio.AsyncBlobSession(AZURITE_URL, credential, account_is_url=True, max_transfers=8) as session:
+            await session.upload_many(CONTAINER, files)
+            await session.download_many(CONTAINER, downloads)
+            return await session.delete(CONTAINER, BLOB_DIR, recursive=True)
+
+    results = asyncio.run(transfer())
+    for blob_path, file_path in files.items():
+        assert open(downloads[blob_path], 'rb').read() == open(file_path, 'rb').read()
+    assert results.deleted == len(files)
+    assert list(container_client.list_blob_names()) == []
+
+
+def test_cancel_transfers(tmp_path, credential, container_client):
+    """Test that cancelling a bulk transfer cancels the transfers in flight"""
+    path = tmp_path / "upload.txt"
+    path.write_bytes(BLOB_DATA * 100_000)
+    files = {f"{BLOB_DIR}/test_{i}.txt": str(path) for i in range(20)}
+
+    async def transfer():
+        async with azure_aio.AsyncBlobSession(AZURITE_URL, credential, account_is_url=True, max_transfers=2) as session:
+            task = asyncio.create_task(session.upload_many(CONTAINER, files))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+    asyncio.run(transfer())
+    assert len(list(container_client.list_blob_names())) < len(files)
+
+
+def test_blob_upload(tmp_path, credential, container_client):
+    """Test the single-call async upload"""
+    path = tmp_path / "upload.txt"
+    path.write_bytes(BLOB_DATA)
+    asyncio.run(azure_aio.blob_upload(
+        account=AZURITE_URL,
+        container_name=CONTAINER,
+        blob_path=f"{BLOB_DIR}/test.txt",
+        file_path=str(path),
+        credential=credential,
+        account_is_url=True
+    ))
+    assert container_client.get_blob_client(f"{BLOB_DIR}/test.txt").download_blob().readall() == BLOB_DATA
@@ -0,0 +1,123 @@
+import json
+import subprocess
+import sys
+import polars as pl
+import pytest
+from datetime import date
+from polars.testing import assert_frame_equal
+from wadoh_raccoon import cli
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Source and reference files with different column names"""
+    src = pl.DataFrame({
+        'submission_number': [1, 1, 2, 3, 4, 5, 6],
+        'first_name': ['DAVIS', 'DAVIS', 'GRANT', 'MARY', 'JOHN', None, 'ALICE'],
+        'last_name': ['SMITHDAVIS', 'SMITHDAVIS', 'MITHCELL', 'JONES', 'BROWN', 'SMITH', 'ZED'],
+        'sub_collection_date': [date(2024, 11, 29)] * 7,
+        'birth_date': [date(1989, 7, 15), date(1989, 7, 15), date(1990, 6, 21), date(1980, 1, 1),
+                       date(1970, 5, 5), date(1990, 1, 1), date(2000, 2, 2)],
+    })
+    ref = pl.DataFrame({
+        'CASE_ID': [100, 101, 102, 103],
+        'first_name_reference': ['DAVID', 'TRASH', 'MARY', 'JON'],
+        'last_name_reference': ['SMITDAVIS', 'PANDA', 'JONES', 'BROWN'],
+        'ref_collection_date': [date(2024, 11, 29), date(2024, 8, 31), date(2024, 11, 29), date(2024, 11, 20)],
+        'birth_date': [date(1989, 7, 15), date(1990, 6, 21), date(1980, 1, 1), date(1970, 5, 5)],
+    })
+    src.write_parquet(tmp_path / 'src.parquet')
+    ref.write_csv(tmp_path / 'ref.csv')
+    return tmp_path
+
+
+def args(files, *extra):
+    return [
+        'match', str(files / 'src.parquet'), str(files / 'ref.csv'),
+        '--first-name', 'first_name:first_name_reference',
+        '--last-name', 'last_name:last_name_reference',
+        '--dob', 'birth_date',
+        '--spec-col-date', 'sub_collection_date:ref_collection_date',
+        '--key', 'submission_number',
+        *extra
+    ]
+
+
+def test_cli_match(files, capsys):
+    """Test that the CLI writes the four result sets and a JSON summary"""
+    cli.main(args(files, '--output', str(files / 'out')))
+    summary = json.loads(capsys.readouterr().out)
+
+    assert summary['counts'] == {'exact_matched': 1, 'fuzzy_matched': 2, 'fuzzy_unmatched': 2, 'no_demo': 1}
+    for name in cli.RESULTS:
+        assert pl.read_parquet(summary['output'][name]).height == summary['counts'][name]
+    assert set(summary['seconds']) == {'scan', 'match', 'write', 'total'}
+
+
+def test_cli_chunks(files, capsys):
+    """Test that matching in chunks gives the same results"""
+    cli.main(args(files, '--output', str(files / 'whole')))
+    cli.main(args(files, '--output', str(files / 'chunked'), '--chunk-size', '2'))
+    summaries = [json.loads(out) for out in capsys.readouterr().out.replace('}\n{', '}\n\x00{').split('\x00')]
+    assert summaries[1]['chunks'] == 4
+
+    for name in cli.RESULTS:
+        assert_frame_equal(
+            pl.read_parquet(files / 'whole' / f'{name}.parquet'),
+            pl.read_parquet(files / 'chunked' / f'{name}.parquet'),
+            check_row_order=False
+        )
+
+
+@pytest.mark.parametrize('key', [None, ['k']])
+def test_chunks(tmp_path, key):
+    """Test that chunks cover the source once, with every row of a key in one chunk"""
+    src = pl.LazyFrame({'k': [1, 1, 2, 3, 4, 5, 6], 'v': range(7)})
+    source_chunks = cli.chunks(src, key, 2, tmp_path / 'source')
+    assert len(source_chunks) == 4
+    frames = [chunk.collect() for chunk in source_chunks]
+    assert all(frame.columns == ['k', 'v'] for frame in frames)
+    assert sorted(v for frame in frames for v in frame['v']) == list(range(7))
+    assert sum(1 in frame['k'] for frame in frames) == 1
+
+
+def test_cli_threads(files):
+    """Test that --threads sizes the polars thread pool, which must happen before polars is imported"""
+    code = f"from wadoh_raccoon import cli; cli.main({args(files, '--output', str(files / 'out'), '--threads', '2')!r})"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    assert json.loads(out)['threads'] == 2
+
+
+@pytest.mark.parametrize(('value', 'expected'), [('8G', 8 * 1024 ** 3), ('512M', 512 * 1024 ** 2), ('1024', 1024)])
+def test_memory_size(value, expected):
+    assert cli.memory_size(value) == expected
+
+
+def test_column():
+    assert cli.column('dob') == 'dob'
+    assert cli.column('a:b') == ('a', 'b')
+
+
+def test_holiday():
+    assert cli.holiday('us_wa') == 'us_wa'
+    assert cli.holiday('2024-12-24') == date(2024, 12, 24)
+
+
+def test_cli_distributed(files, capsys):
+    """Test that partition, worker and merge give the same results as match"""
+    cli.main(args(files, '--output', str(files / 'whole')))
+    match_args = args(files)[1:]
+    cli.main(['partition', *match_args[:2], str(files / 'shared'), *match_args[2:], '--partitions', '3'])
+    cli.main(['worker', str(files / 'shared')])
+    cli.main(['merge', str(files / 'shared'), '--output', str(files / 'merged')])
+    summaries = [json.loads(out) for out in capsys.readouterr().out.replace('}\n{', '}\n\x00{').split('\x00')]
+    assert summaries[1]['n_partitions'] == 3
+    assert summaries[2]['partitions'] == [0, 1, 2]
+    assert summaries[3]['counts'] == summaries[0]['counts']
+
+    for name in cli.RESULTS:
+        assert_frame_equal(
+            pl.read_parquet(files / 'whole' / f'{name}.parquet'),
+            pl.read_parquet(files / 'merged' / f'{name}.parquet'),
+            check_row_order=False
+        )
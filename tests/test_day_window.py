@@ -0,0 +1,81 @@
+import polars as pl
+import pytest
+from datetime import date
+from wadoh_raccoon import scorers
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+
+
+@pytest.mark.parametrize('lazy', ['lazy', 'eager'])
+@pytest.mark.parametrize('window', [{'day_max': 7}, {'business_day_max': 5}], ids=['day_max', 'business_day_max'])
+@pytest.mark.parametrize('backend', ['polars', 'duckdb'])
+def test_out_of_window_candidates_are_not_scored(lazy, window, backend):
+    """Test that candidates outside the day window never reach the scorer, with either backend"""
+    if backend == 'duckdb':
+        pytest.importorskip('duckdb')
+    scored = []
+
+    def counting_ratio(left, right):
+        scored.extend(right.to_list())
+        return scorers.get_scorer('ratio')(left, right)
+
+    src = pl.DataFrame({
+        'id': [1, 2],
+        'first_name': ['MARY', 'JOHN'],
+        'last_name': ['JONES', 'BROWN'],
+        'dob': [date(1980, 1, 1), date(1990, 1, 1)],
+        'collection_date': [date(2024, 3, 1), date(2024, 3, 1)],
+    })
+    ref = pl.DataFrame({
+        'case_id': [10, 11, 12],
+        'first_name': ['MARIE', 'MARYE', 'JON'],
+        'last_name': ['JONES', 'JONES', 'BROWN'],
+        'dob': [date(1980, 1, 1), date(1980, 1, 1), date(1990, 1, 1)],
+        'collection_date': [date(2024, 3, 4), date(2022, 1, 1), date(2023, 3, 1)],
+    })
+    if lazy == 'lazy':
+        src, ref = src.lazy(), ref.lazy()
+    output = DataFrameMatcher(
+        src, ref, 'first_name', 'last_name', 'dob', 'collection_date', key='id', threshold=70,
+        scorer={'first_name': counting_ratio}, backend=backend, **window
+    ).match(verbose=False)
+
+    fuzzy_matched = output.fuzzy_matched.lazy().collect()
+    assert fuzzy_matched['case_id'].to_list() == [10]
+
+    # JOHN's only candidate is a year away: unmatched without a candidate
+    fuzzy_unmatched = output.fuzzy_unmatched.lazy().collect()
+    assert fuzzy_unmatched['id'].to_list() == [2]
+    assert fuzzy_unmatched['case_id'].to_list() == [None]
+    assert fuzzy_unmatched['match_ratio'].to_list() == [0.0]
+
+    assert 'MARIE' in scored
+    assert 'JON' not in scored
+    assert 'MARYE' not in scored
+
+
+@pytest.mark.parametrize('lazy', ['lazy', 'eager'])
+def test_unmatched_ties_broken_by_days(lazy):
+    """Test that an unmatched record keeps its best scoring candidate, the closest in time among ties"""
+    src = pl.DataFrame({
+        'id': [1],
+        'first_name': ['MARY'],
+        'last_name': ['JONES'],
+        'dob': [date(1980, 1, 1)],
+        'collection_date': [date(2024, 3, 1)],
+    })
+    ref = pl.DataFrame({
+        'case_id': [10, 11, 12],
+        'first_name': ['MARIE', 'MARIE', 'MAXX'],
+        'last_name': ['JONES', 'JONES', 'JONES'],
+        'dob': [date(1980, 1, 1)] * 3,
+        'collection_date': [date(2024, 3, 20), date(2024, 3, 5), date(2024, 3, 1)],
+    })
+    if lazy == 'lazy':
+        src, ref = src.lazy(), ref.lazy()
+    output = DataFrameMatcher(
+        src, ref, 'first_name', 'last_name', 'dob', 'collection_date', key='id', threshold=99
+    ).match(verbose=False)
+
+    fuzzy_unmatched = output.fuzzy_unmatched.lazy().collect()
+    assert fuzzy_unmatched['case_id'].to_list() == [11]
+    assert '___day_count___' not in fuzzy_unmatched.columns
@@ -0,0 +1,57 @@
+import json
+import multiprocessing
+import polars as pl
+import pytest
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher, RESULT_SETS
+from tests._helpers import assert_results_equal
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'block': ('county', 'case_county'), 'day_max': 10}], ids=['default', 'block'])
+def test_worker_processes(data, make_matcher, tmp_path, kwargs):
+    """Test that worker processes sharing a directory match every partition once, like match()"""
+    src, ref = data
+    instance = make_matcher(src.lazy(), ref.lazy(), **kwargs)
+    expected = instance.match(verbose=False)
+
+    manifest = instance.partition(tmp_path, n_partitions=9, chunk_size=40)
+    assert json.loads((tmp_path / 'manifest.json').read_text()) == manifest
+    assert manifest['source_rows'] > 0 and manifest['reference_rows'] > 0
+
+    with multiprocessing.get_context('spawn').Pool(3) as pool:
+        matched = pool.map(DataFrameMatcher.run_worker, [tmp_path] * 3)
+    assert sorted(i for partitions in matched for i in partitions) == list(range(9))
+
+    output = DataFrameMatcher.merge_partitions(tmp_path)
+    assert all(isinstance(getattr(output, name), pl.LazyFrame) for name in RESULT_SETS)
+    assert_results_equal(output, expected)
+
+
+def test_claims(data, make_matcher, tmp_path):
+    """Test that claimed partitions are skipped, and the merge waits for every partition"""
+    src, ref = data
+    instance = make_matcher(src, ref)
+    instance.partition(tmp_path, n_partitions=4)
+    (tmp_path / 'claims').mkdir()
+    (tmp_path / 'claims' / 'partition-00002').touch()
+
+    assert DataFrameMatcher.run_worker(tmp_path) == [0, 1, 3]
+    assert DataFrameMatcher.run_worker(tmp_path) == []
+    with pytest.raises(ValueError, match='1 of 4 partitions'):
+        DataFrameMatcher.merge_partitions(tmp_path)
+
+    # the claim of a stopped worker is removed, and another worker takes the partition
+    (tmp_path / 'claims' / 'partition-00002').unlink()
+    assert DataFrameMatcher.run_worker(tmp_path) == [2]
+    assert_results_equal(DataFrameMatcher.merge_partitions(tmp_path, verbose=False), instance.match(verbose=False))
+
+
+def test_not_partitioned(tmp_path):
+    """Test that workers need a manifest, and the settings must be picklable"""
+    with pytest.raises(FileNotFoundError):
+        DataFrameMatcher.run_worker(tmp_path)
+
+    src = pl.DataFrame({'first_name': ['A'], 'last_name': ['B'], 'dob': ['2000-01-01'], 'date': ['2024-01-01']})
+    instance = DataFrameMatcher(src, src, 'first_name', 'last_name', 'dob', 'date', scorer=lambda a, b: 100)
+    with pytest.raises(ValueError, match='pickle'):
+        instance.partition(tmp_path)
+    assert not (tmp_path / 'manifest.json').exists()
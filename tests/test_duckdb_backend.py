@@ -0,0 +1,144 @@
+import polars as pl
+import pytest
+from pathlib import Path
+from polars.testing import assert_frame_equal
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher, RESULT_SETS
+from wadoh_raccoon.duckdb_backend import DuckDBBackend
+from wadoh_raccoon.probabilistic import FellegiSunterModel
+from tests._helpers import assert_results_equal
+
+pytest.importorskip('duckdb')
+
+SARS_COV_2_DATA = Path(__file__).parent / 'sars_cov_2' / 'data'
+
+
+@pytest.fixture
+def sars_cov_2_data():
+    return (
+        pl.read_parquet(SARS_COV_2_DATA / 'fuzzy_match_test_df.parquet'),
+        pl.read_parquet(SARS_COV_2_DATA / 'match_to_test_df.parquet')
+    )
+
+
+def matcher(src, ref, **kwargs):
+    return DataFrameMatcher(
+        df_src=src,
+        df_ref=ref,
+        first_name='FIRST_NAME',
+        last_name='LAST_NAME',
+        dob=('DOB', 'PATIENT_DOB'),
+        spec_col_date=('SEQUENCE_SPECIMEN_COLLECTION_DATE', 'SPECIMEN__COLLECTION__DTTM'),
+        **kwargs
+    )
+
+
+def assert_same_as_polars(src, ref, **kwargs):
+    expected = matcher(src, ref, **kwargs).match(verbose=False)
+    # the summary also runs the leak check; polars cannot run it on lazy results without a key
+    verbose = 'key' in kwargs
+    output = matcher(src, ref, backend=DuckDBBackend(batch_size=7), **kwargs).match(verbose=verbose)
+    for name in RESULT_SETS:
+        assert isinstance(getattr(output, name), type(getattr(expected, name)))
+        assert_frame_equal(
+            getattr(output, name).lazy().collect(), getattr(expected, name).lazy().collect(),
+            check_row_order=False
+        )
+
+
+@pytest.mark.parametrize('lazy', ['lazy', 'eager'])
+@pytest.mark.parametrize('kwargs', [
+    {'key': 'submission_number'},
+    {'key': 'submission_number', 'day_max': 10},
+    {'key': 'submission_number', 'business_day_max': 5, 'holidays': 'us_wa'},
+    {'key': 'submission_number', 'block': ('SEQUENCE_LAB', 'LAB')},
+    {'key': 'submission_number', 'scorer': {'first_name': 'token_sort_ratio', 'last_name': 'jaro_winkler'}},
+    {},
+], ids=['default', 'day_max', 'business_day_max', 'block', 'scorers', 'no_key'])
+def test_same_as_polars(sars_cov_2_data, lazy, kwargs):
+    """Test that the duckdb backend gives the same results as the polars backend"""
+    src, ref = sars_cov_2_data
+    if lazy == 'lazy':
+        src, ref = src.lazy(), ref.lazy()
+    assert_same_as_polars(src, ref, **kwargs)
+
+
+@pytest.mark.parametrize('batch_size', [5, 100_000])
+@pytest.mark.parametrize('kwargs', [{}, {'day_max': 10}, {'block': ('county', 'case_county')}])
+def test_same_as_polars_with_ties(data, make_matcher, batch_size, kwargs):
+    """Test records with many candidates tied on their scores, which only the collection dates separate"""
+    src, ref = data
+    expected = make_matcher(src, ref, **kwargs).match(verbose=False)
+    output = make_matcher(src, ref, backend=DuckDBBackend(batch_size=batch_size), **kwargs).match(verbose=False)
+    assert_results_equal(output, expected)
+
+
+def test_probabilistic(sars_cov_2_data):
+    """Test probabilistic scoring with a fitted model, and that an unfitted model is refused"""
+    src, ref = sars_cov_2_data
+    model = FellegiSunterModel(term_frequency=False)
+    matcher(src, ref, key='submission_number', scoring='probabilistic', model=model).match(verbose=False)
+    assert_same_as_polars(src, ref, key='submission_number', scoring='probabilistic', threshold=90, model=model)
+
+    with pytest.raises(ValueError):
+        matcher(src, ref, key='submission_number', scoring='probabilistic', backend='duckdb').match(verbose=False)
+
+
+def test_temp_directory(sars_cov_2_data, tmp_path):
+    """Test that the database is written to and removed from the given directory"""
+    src, ref = sars_cov_2_data
+    backend = DuckDBBackend(temp_directory=tmp_path, memory_limit='256MB', threads=2)
+    matcher(src, ref, key='submission_number', backend=backend).match(verbose=False)
+    assert list(tmp_path.iterdir()) == []
+
+    with pytest.raises(ValueError):
+        matcher(src, ref, backend='spark')
+
+
+def test_cleaning_same_as_polars():
+    """Test that names and dates cleaned in DuckDB are the ones helpers.clean_name and helpers.date_format give"""
+    import duckdb
+    from wadoh_raccoon import duckdb_backend
+    from wadoh_raccoon.utils import helpers
+
+    df = pl.DataFrame({
+        'name': ['A$AP rocky', "O'Brien-Smith", '50', None, 'Zoë'],
+        'date': ['2024-10-30', '30/10/2024', 'Oct 30, 2024', None, '45496'],
+    })
+    dates = pl.DataFrame({'date': [
+        '2024-10-30', ' 2024-10-30', '2024-10-30 ', '2024-1-3', '2024-02-30', '2022-12-27 08:26:49',
+        '2022-12-27T08:26:49', '10/20/24', '10/20/68', '10/20/69', '10/20/70', '10/20/1969', '10-30-2024',
+        '31-12-2024', '1/2/2024', '30/10/2024', 'October 30, 2024', 'october 3, 2024', 'Oct 30, 2024',
+        'Sun Jul  8 00:34:59 2001', '45496', '', None
+    ]})
+    df = pl.concat([df, dates.with_columns(name=pl.lit('x'))], how='diagonal')
+    expected = df.select(helpers.clean_name('name'), helpers.date_format(df, 'date'))
+
+    con = duckdb.connect()
+    con.register('df', df.to_arrow())
+    output = duckdb_backend.fetch_table(con, f"""
+        SELECT {duckdb_backend.clean_name('name')} AS name, {duckdb_backend.date_format('date', pl.String)} AS date
+        FROM df
+    """)
+    assert_frame_equal(output, expected)
+
+    df = df.select(date=pl.datetime(2024, 10, 30, 8))
+    con.register('df', df.to_arrow())
+    output = duckdb_backend.fetch_table(
+        con, f"SELECT {duckdb_backend.date_format('date', pl.Datetime)} AS date FROM df"
+    )
+    assert_frame_equal(output, df.select(helpers.date_format(df, 'date')))
+
+
+@pytest.mark.parametrize('backend', [None, 'duckdb'])
+def test_exact_match_ties(make_matcher, backend):
+    """Test that an exact match tied on collection dates goes to the first reference record in both backends"""
+    src = pl.DataFrame({
+        'submission_number': [1], 'first_name': ['ANN'], 'last_name': ['LEE'], 'dob': ['1980-01-01'],
+        'collection_date': ['2024-01-10']
+    })
+    ref = pl.DataFrame({
+        'case_id': [3, 2, 1], 'first_name': ['ANN'] * 3, 'last_name': ['LEE'] * 3, 'dob': ['1980-01-01'] * 3,
+        'collection_date': ['2024-01-01', '2024-01-13', '2024-01-07']
+    })
+    output = make_matcher(src, ref, backend=backend).match(verbose=False)
+    assert output.exact_matched['case_id'].to_list() == [2]
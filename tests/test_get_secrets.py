@@ -0,0 +1,61 @@
+import time
+import azure.identity
+import azure.keyvault.secrets
+import pytest
+from wadoh_raccoon.utils import helpers
+
+
+class FakeSecretClient:
+    """An in-memory stand-in for azure.keyvault.secrets.SecretClient"""
+    secrets = {}
+    calls = []
+    clients = 0
+
+    def __init__(self, vault_url, credential):
+        FakeSecretClient.clients += 1
+
+    def get_secret(self, key):
+        FakeSecretClient.calls.append(key)
+        time.sleep(0.05)
+        return type('Secret', (), {'value': FakeSecretClient.secrets[key]})
+
+
+@pytest.fixture(autouse=True)
+def vault(monkeypatch):
+    """Replace the key vault client and start each test with an empty cache"""
+    monkeypatch.setattr(azure.keyvault.secrets, 'SecretClient', FakeSecretClient)
+    monkeypatch.setattr(azure.identity, 'DefaultAzureCredential', lambda: object())
+    FakeSecretClient.secrets = {'db-username': 'user', 'db-password': 'pass', 'api-key': 'key'}
+    FakeSecretClient.calls = []
+    FakeSecretClient.clients = 0
+    helpers.clear_secrets()
+    yield 'https://vault'
+    helpers.clear_secrets()
+
+
+def test_get_secrets_cached(vault):
+    """Test that secrets are fetched once and shared between calls"""
+    assert helpers.get_secrets(vault, 'db-password') == 'pass'
+    start = time.perf_counter()
+    assert helpers.get_secrets(vault, ['db-username', 'db-password', 'api-key']) == ('user', 'pass', 'key')
+    # the two missing keys are fetched concurrently
+    assert time.perf_counter() - start < 0.09
+    assert helpers.get_secrets(vault, ['api-key']) == ('key',)
+
+    assert sorted(FakeSecretClient.calls) == ['api-key', 'db-password', 'db-username']
+    assert FakeSecretClient.clients == 1
+
+
+def test_get_secrets_refresh(vault):
+    """Test that rotated secrets are fetched again on refresh, clear or expiry"""
+    assert helpers.get_secrets(vault, 'db-password') == 'pass'
+    FakeSecretClient.secrets['db-password'] = 'rotated'
+    assert helpers.get_secrets(vault, 'db-password') == 'pass'
+    assert helpers.get_secrets(vault, 'db-password', refresh=True) == 'rotated'
+
+    FakeSecretClient.secrets['db-password'] = 'rotated again'
+    helpers.clear_secrets(vault, 'db-password')
+    assert helpers.get_secrets(vault, 'db-password') == 'rotated again'
+
+    FakeSecretClient.secrets['db-password'] = 'expired'
+    assert helpers.get_secrets(vault, 'db-password', ttl=0) == 'expired'
@@ -0,0 +1,35 @@
+import polars as pl
+import pytest
+from great_tables import GT
+from wadoh_raccoon.utils import helpers
+
+
+@pytest.mark.parametrize('lazy', ['lazy', 'eager'])
+def test_gt_style_max_rows(lazy):
+    """Test that only max_rows rows are shown, with their original row numbers"""
+    df = pl.DataFrame({'x': range(1000)})
+    if lazy == 'lazy':
+        df = df.lazy()
+
+    table = helpers.gt_style(df, max_rows=10)
+    assert table._tbl_data['index'].to_list() == list(range(10))
+    assert table._source_notes == ['Showing 10 of 1,000 rows']
+
+    table = helpers.gt_style(df, max_rows=5, sample='head_tail')
+    assert table._tbl_data['index'].to_list() == [0, 1, 2, 998, 999]
+
+
+def test_gt_style_small_frame():
+    """Test that frames within max_rows are shown in full, without a note"""
+    table = helpers.gt_style(pl.LazyFrame({'x': [1, 2]}), max_rows=10)
+    assert isinstance(table, GT)
+    assert table._tbl_data.height == 2
+    assert table._source_notes == []
+
+
+def test_gt_style_pages():
+    """Test splitting the rows into several tables"""
+    tables = helpers.gt_style(pl.DataFrame({'x': range(25)}), page_size=10, index_inp=False)
+    assert [table._tbl_data.height for table in tables] == [10, 10, 5]
+    assert tables[0]._tbl_data.columns == ['x']
+    assert tables[2]._source_notes == ['Page 3 of 3']
@@ -0,0 +1,63 @@
+import polars as pl
+import pytest
+from datetime import date
+from wadoh_raccoon import holidays
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+
+
+def test_us_federal():
+    """Test the 2024 federal holidays, including the Monday holidays"""
+    assert holidays.us_federal(2024) == [
+        date(2024, 1, 1), date(2024, 1, 15), date(2024, 2, 19), date(2024, 5, 27), date(2024, 6, 19),
+        date(2024, 7, 4), date(2024, 9, 2), date(2024, 10, 14), date(2024, 11, 11), date(2024, 11, 28),
+        date(2024, 12, 25)
+    ]
+
+
+def test_wa_state():
+    """Test that Washington adds the day after Thanksgiving and skips Columbus Day"""
+    days = holidays.wa_state(2024)
+    assert date(2024, 11, 29) in days
+    assert date(2024, 10, 14) not in days
+    assert len(days) == 11
+
+
+def test_observed():
+    """Test that weekend holidays move to the nearest weekday"""
+    assert date(2021, 12, 31) in holidays.us_federal(2022)  # New Year's Day 2022 was a Saturday
+    assert date(2023, 1, 2) in holidays.us_federal(2023)  # New Year's Day 2023 was a Sunday
+
+
+def test_holiday_dates():
+    """Test combining calendars and extra dates"""
+    days = holidays.holiday_dates(['us_wa', date(2024, 12, 24), date(2024, 12, 25)])
+    assert days == sorted(set(days))
+    assert {date(2024, 10, 14), date(2024, 11, 29), date(2024, 12, 24)} <= set(days)
+    assert holidays.holiday_dates(None) == []
+    with pytest.raises(ValueError):
+        holidays.holiday_dates('mars')
+
+
+@pytest.mark.parametrize('lazy', ['lazy', 'eager'])
+@pytest.mark.parametrize('calendar, matched', [(None, False), ('us_wa', True), ('us_federal', False)])
+def test_business_day_max_over_thanksgiving(lazy, calendar, matched):
+    """Test that Thanksgiving and the day after do not count as business days"""
+    src = pl.DataFrame({
+        'id': [1], 'first_name': ['MARY'], 'last_name': ['JONES'],
+        'dob': [date(1980, 1, 1)], 'collection_date': [date(2024, 11, 27)]
+    })
+    ref = src.with_columns(first_name=pl.lit('MARIE'), collection_date=pl.lit(date(2024, 12, 2)))
+    if lazy == 'lazy':
+        src, ref = src.lazy(), ref.lazy()
+    instance = DataFrameMatcher(
+        src, ref, 'first_name', 'last_name', 'dob', 'collection_date', key='id', threshold=70,
+        business_day_max=1, holidays=calendar
+    )
+    output = instance.match(verbose=False)
+    fuzzy_matched = output.fuzzy_matched.lazy().collect()
+    assert fuzzy_matched.height == int(matched)
+    if matched:
+        assert fuzzy_matched['business_day_count'].to_list() == [1]
+    assert instance.lookup('MARY', 'JONES', date(1980, 1, 1), date(2024, 11, 27)).match_category == (
+        'fuzzy_matched' if matched else 'fuzzy_unmatched'
+    )
@@ -0,0 +1,74 @@
+import pytest
+from datetime import date
+from wadoh_raccoon.dataframe_matcher import RESULT_SETS
+from wadoh_raccoon.probabilistic import FellegiSunterModel
+
+
+def assert_lookup_same_as_match(instance, src, blocks=()):
+    """Check every record's lookup against its row in the match results"""
+    output = instance.match(verbose=False)
+    expected = {
+        row['submission_number']: (name, row)
+        for name in RESULT_SETS
+        for row in getattr(output, name).lazy().collect().to_dicts()
+    }
+    for row in src.to_dicts():
+        result = instance.lookup(
+            row['first_name'], row['last_name'], row['dob'], row['collection_date'],
+            **{col: row[col] for col in blocks}
+        )
+        category, expected_row = expected[row['submission_number']]
+        assert result.match_category == category
+        for col, value in result.record.items():
+            expected_value = pytest.approx(value) if isinstance(value, float) else value
+            assert expected_row[col] == expected_value, (row['submission_number'], col)
+
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'day_max': 10},
+    {'business_day_max': 5, 'threshold': 70},
+    {'scorer': {'first_name': 'jaro_winkler', 'last_name': 'token_sort_ratio'}},
+    {'block': ('county', 'case_county')},
+], ids=['default', 'day_max', 'business_day_max', 'scorers', 'block'])
+def test_lookup_same_as_match(data, make_matcher, kwargs):
+    """Test that a lookup finds the same result as matching the record"""
+    src, ref = data
+    assert_lookup_same_as_match(make_matcher(src, ref, **kwargs), src, ['county'] if 'block' in kwargs else [])
+
+
+def test_lookup_probabilistic(data, make_matcher):
+    """Test that a lookup scores with a fitted model"""
+    src, ref = data
+    # surname frequencies come from the candidates being scored, so only match a whole batch without them
+    model = FellegiSunterModel(term_frequency=False)
+    instance = make_matcher(src, ref, scoring='probabilistic', threshold=90, model=model)
+    instance.match(verbose=False)  # fits the model
+    assert_lookup_same_as_match(instance, src)
+
+
+def test_lookup_prepared(data, make_matcher):
+    """Test that the index is built from the prepared reference, and string dates are read"""
+    src, ref = data
+    instance = make_matcher(src.head(0), ref).prepare()
+    case = ref.row(0, named=True)
+    result = instance.lookup(case['first_name'].lower(), case['last_name'], case['dob'].isoformat(),
+                             case['collection_date'].strftime('%m/%d/%Y'))
+    assert result.match_category == 'exact_matched'
+    assert result.record['case_id'] == 0
+    assert result.candidates >= 1
+
+
+def test_lookup_missing(data, make_matcher):
+    """Test lookups without demographics, candidates or block values"""
+    src, ref = data
+    instance = make_matcher(src, ref)
+    assert instance.lookup('JOHN', None, date(1980, 1, 1), date(2024, 1, 1)).match_category == 'no_demo'
+
+    result = instance.lookup('JOHN', 'SMITH', date(1900, 1, 1), date(2024, 1, 1))
+    assert result.match_category == 'fuzzy_unmatched'
+    assert result.record['case_id'] is None
+    assert result.candidates == 0
+
+    with pytest.raises(ValueError):
+        make_matcher(src, ref, block='county').lookup('JOHN', 'SMITH', date(1980, 1, 1), date(2024, 1, 1))
@@ -0,0 +1,193 @@
+import io
+import json
+import paramiko
+import polars as pl
+import pytest
+from polars.testing import assert_frame_equal
+from wadoh_raccoon.utils import helpers
+
+
+class FakeRemoteFile(io.BytesIO):
+    """An in-memory stand-in for a paramiko SFTPFile"""
+    def __init__(self, files, path):
+        super().__init__()
+        self.files = files
+        self.path = path
+        self.writes = 0
+
+    def set_pipelined(self, pipelined=True):
+        self.pipelined = pipelined
+
+    def write(self, data):
+        self.writes += 1
+        return super().write(data)
+
+    def close(self):
+        self.files[self.path] = self
+        self.data = self.getvalue()
+        self.mtime = len(self.files)
+        super().close()
+
+
+class FakeSSHClient:
+    """An in-memory stand-in for paramiko.SSHClient, keeping the uploaded files"""
+    files = {}
+    connections = 0
+
+    def set_missing_host_key_policy(self, policy):
+        pass
+
+    def connect(self, **kwargs):
+        FakeSSHClient.connections += 1
+
+    def open_sftp(self):
+        return self
+
+    def open(self, path, mode, bufsize=-1):
+        if mode == 'rb':
+            remote_file = FakeRemoteFile({}, path)
+            remote_file.write(self.files[path].data)
+            remote_file.seek(0)
+            remote_file.prefetch = lambda file_size=None: None
+            return remote_file
+        return FakeRemoteFile(self.files, path)
+
+    def listdir_attr(self, path):
+        attrs = []
+        for file_path, remote_file in self.files.items():
+            if file_path.rsplit('/', 1)[0] == path:
+                attr = paramiko.SFTPAttributes()
+                attr.filename = file_path.rsplit('/', 1)[1]
+                attr.st_size = len(remote_file.data)
+                attr.st_mtime = remote_file.mtime
+                attrs.append(attr)
+        return attrs
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def sftp(monkeypatch):
+    """Replace the SSH client with the in-memory one"""
+    FakeSSHClient.files = {}
+    FakeSSHClient.connections = 0
+    monkeypatch.setattr(paramiko, 'SSHClient', FakeSSHClient)
+    return FakeSSHClient.files
+
+
+@pytest.fixture
+def df():
+    return pl.DataFrame({
+        'case_id': range(2500),
+        'pathogen': ['Salmonella', 'E. coli', 'Campylobacter', 'Listeria', None] * 500
+    })
+
+
+@pytest.mark.parametrize('lazy', ['lazy', 'eager'])
+@pytest.mark.parametrize('extension', ['.csv', '.json', '.parquet', '.xlsx'])
+def test_mft_upload_formats(sftp, df, lazy, extension):
+    """Test that every format is written in batches and reads back as the original frame"""
+    upload = df.lazy() if lazy == 'lazy' else df
+    helpers.mft_upload(upload, 'DEV_TESTING', 'report', extension, 'user', 'pass', batch_size=1000)
+
+    remote_file = sftp[f'DEV_TESTING/report{extension}']
+    assert remote_file.pipelined
+    data = io.BytesIO(remote_file.data)
+    if extension == '.csv':
+        assert remote_file.writes > 1
+        result = pl.read_csv(data, schema=df.schema)
+    elif extension == '.json':
+        assert remote_file.writes > 1
+        result = pl.DataFrame(json.load(data), schema=df.schema)
+    elif extension == '.parquet':
+        result = pl.read_parquet(data)
+    else:
+        # xlsx files are zip archives
+        assert remote_file.data[:2] == b'PK'
+        return
+    assert_frame_equal(result, df)
+
+
+def test_mft_upload_json_matches_write_json(sftp, df):
+    """Test that the batched JSON is the same document as DataFrame.write_json"""
+    helpers.mft_upload(df, 'DEV_TESTING', 'report', '.json', 'user', 'pass', batch_size=1000)
+    assert sftp['DEV_TESTING/report.json'].data.decode('utf-8') == df.write_json()
+
+
+def test_mft_upload_unstreamable(sftp):
+    """Test that lazy plans the streaming engine cannot run are collected instead"""
+    upload = pl.LazyFrame({'a': [3, 1, 2], 'b': [1, 1, 2]}).with_columns(c=pl.col('a').rank().over('b'))
+    helpers.mft_upload(upload, 'DEV_TESTING', 'report', '.parquet', 'user', 'pass')
+    assert_frame_equal(pl.read_parquet(io.BytesIO(sftp['DEV_TESTING/report.parquet'].data)), upload.collect())
+
+
+@pytest.mark.parametrize('extension', ['.csv', '.parquet'])
+def test_mft_upload_transfer_error(sftp, df, monkeypatch, extension):
+    """Test that SSH errors while writing are raised as they are, not as conversion errors"""
+    def write(self, data):
+        raise paramiko.SSHException('connection lost')
+    monkeypatch.setattr(FakeRemoteFile, 'write', write)
+    with helpers.MFTSession('user', 'pass') as session:
+        with pytest.raises(paramiko.SSHException, match='connection lost'):
+            session.upload(df.lazy(), 'DEV_TESTING', 'report', extension, batch_size=1000)
+
+
+def test_mft_upload_empty(sftp):
+    """Test that empty frames are rejected"""
+    with pytest.raises(ValueError):
+        helpers.mft_upload(pl.LazyFrame({'a': []}), 'DEV_TESTING', 'report', '.csv', 'user', 'pass')
+
+
+def test_mft_session_upload_many(sftp, df):
+    """Test uploading many files over one connection"""
+    uploads = {
+        f'DEV_TESTING/report_{pathogen}.csv': df.lazy().filter(pl.col('pathogen') == pathogen)
+        for pathogen in ['Salmonella', 'E. coli', 'Campylobacter', 'Listeria']
+    }
+    with helpers.MFTSession('user', 'pass', max_channels=2) as session:
+        results = session.upload_many(uploads, batch_size=100)
+
+    assert FakeSSHClient.connections == 1
+    assert [result.path for result in results] == list(uploads)
+    for result in results:
+        assert result.rows == 500
+        assert result.bytes == len(sftp[result.path].data)
+        assert_frame_equal(pl.read_csv(io.BytesIO(sftp[result.path].data), schema=df.schema),
+                           uploads[result.path].collect())
+
+
+def test_mft_download(sftp, df, tmp_path):
+    """Test downloading files by pattern, skipping files already seen"""
+    with helpers.MFTSession('user', 'pass') as session:
+        session.upload(df, 'inbound', 'labs_1', '.csv')
+        session.upload(df.lazy().head(10), 'inbound', 'labs_2', '.parquet')
+        session.upload(df, 'inbound', 'other', '.csv')
+
+    seen_file = tmp_path / 'seen.json'
+    frames = helpers.mft_download('inbound/labs_*', 'user', 'pass', seen_file=seen_file)
+    assert list(frames) == ['inbound/labs_1.csv', 'inbound/labs_2.parquet']
+    assert_frame_equal(frames['inbound/labs_1.csv'], df, check_dtypes=False)
+    assert_frame_equal(frames['inbound/labs_2.parquet'], df.head(10))
+
+    # only new or changed files are downloaded by the next poll
+    assert helpers.mft_download('inbound/labs_*', 'user', 'pass', seen_file=seen_file) == {}
+    with helpers.MFTSession('user', 'pass') as session:
+        session.upload(df.head(5), 'inbound', 'labs_1', '.csv')
+    frames = helpers.mft_download('inbound/labs_*', 'user', 'pass', seen_file=seen_file)
+    assert list(frames) == ['inbound/labs_1.csv']
+    assert frames['inbound/labs_1.csv'].height == 5
+
+
+def test_mft_download_lazy(sftp, df):
+    """Test that csv and parquet files can be scanned lazily from their local copies"""
+    with helpers.MFTSession('user', 'pass') as session:
+        session.upload(df, 'inbound', 'labs', '.parquet')
+        session.upload(df, 'inbound', 'labs', '.csv')
+        session.upload(df, 'inbound', 'labs', '.json')
+    frames = helpers.mft_download('inbound/labs.*', 'user', 'pass', lazy=True)
+    assert isinstance(frames['inbound/labs.parquet'], pl.LazyFrame)
+    assert isinstance(frames['inbound/labs.csv'], pl.LazyFrame)
+    assert isinstance(frames['inbound/labs.json'], pl.DataFrame)
+    assert_frame_equal(frames['inbound/labs.parquet'].collect(), df)
+    assert_frame_equal(frames['inbound/labs.csv'].collect(), df, check_dtypes=False)
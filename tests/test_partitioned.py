@@ -0,0 +1,69 @@
+import polars as pl
+import pytest
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher, RESULT_SETS
+from wadoh_raccoon.probabilistic import FellegiSunterModel
+from tests._helpers import assert_results_equal
+
+
+@pytest.mark.parametrize('lazy', ['lazy', 'eager'])
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'day_max': 10},
+    {'business_day_max': 5, 'threshold': 70},
+    {'block': ('county', 'case_county')},
+    {'key': None},
+], ids=['default', 'day_max', 'business_day_max', 'block', 'no_key'])
+def test_same_as_match(data, make_matcher, lazy, kwargs):
+    """Test that matching bucket by bucket gives the same results as matching at once"""
+    src, ref = data
+    if lazy == 'lazy':
+        src, ref = src.lazy(), ref.lazy()
+    if 'key' in kwargs:
+        instance = DataFrameMatcher(
+            src.drop('submission_number'), ref, 'first_name', 'last_name', 'dob', 'collection_date', **kwargs
+        )
+    else:
+        instance = make_matcher(src, ref, **kwargs)
+    expected = instance.match(verbose=False)
+    # the leak check runs in the summary; without a key it compares whole rows
+    output = instance.match_partitioned(n_buckets=7, max_workers=3, chunk_size=50, verbose=True)
+    assert all(isinstance(getattr(output, name), pl.DataFrame) for name in RESULT_SETS)
+    assert_results_equal(output, expected)
+
+
+def test_directory(data, make_matcher, tmp_path):
+    """Test that results written to a directory are scanned lazily, and a rerun replaces them"""
+    src, ref = data
+    instance = make_matcher(src, ref)
+    expected = instance.match(verbose=False)
+    instance.match_partitioned(n_buckets=8, directory=tmp_path, verbose=False)
+    output = instance.match_partitioned(n_buckets=4, directory=tmp_path, verbose=False)
+    assert all(isinstance(getattr(output, name), pl.LazyFrame) for name in RESULT_SETS)
+    assert len(list((tmp_path / 'results' / 'fuzzy_matched').iterdir())) == 4
+    assert_results_equal(output, expected)
+
+
+def test_probabilistic(data, make_matcher):
+    """Test that probabilistic scoring needs a fitted model without term frequencies"""
+    src, ref = data
+    model = FellegiSunterModel(term_frequency=False)
+    instance = make_matcher(src, ref, scoring='probabilistic', threshold=90, model=model)
+    expected = instance.match(verbose=False)  # fits the model
+    assert_results_equal(instance.match_partitioned(n_buckets=5, verbose=False), expected)
+
+    with pytest.raises(ValueError):
+        make_matcher(src, ref, scoring='probabilistic').match_partitioned(verbose=False)
+
+
+def test_key_split_across_buckets(data, make_matcher, tmp_path):
+    """Test that the rows of a key must share a date of birth and block values to be matched in buckets"""
+    src, ref = data
+    src = pl.concat([src, src.head(1).with_columns(pl.col('dob').dt.offset_by('1d'))])
+    with pytest.raises(ValueError, match='1 keys'):
+        make_matcher(src, ref).match_partitioned(verbose=False)
+
+    src = pl.concat([src.head(1).with_columns(county=pl.lit('C')), data[0]])
+    with pytest.raises(ValueError, match='county'):
+        make_matcher(src, ref, block=('county', 'case_county')).partition(tmp_path)
+    assert not (tmp_path / 'manifest.json').exists()
+    make_matcher(src, ref).partition(tmp_path)
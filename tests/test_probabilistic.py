@@ -0,0 +1,153 @@
+import random
+import polars as pl
+import pytest
+from datetime import date, timedelta
+from polars.testing import assert_frame_equal
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+from wadoh_raccoon.probabilistic import FellegiSunterModel
+
+
+FIRST_NAMES = ['JOHN', 'MARY', 'JAMES', 'PATRICIA', 'ROBERT', 'JENNIFER', 'MICHAEL', 'LINDA', 'DAVID', 'ELIZABETH']
+# SMITH is far more common than any other surname
+LAST_NAMES = ['SMITH'] * 8 + ['JOHNSON', 'WILLIAMS', 'BROWN', 'GARCIA', 'MILLER', 'XIONG', 'OKONKWO', 'VANDERBILT']
+
+
+@pytest.fixture
+def data():
+    """Reference cases and submissions; the first 150 submissions are (sometimes misspelled) cases"""
+    rng = random.Random(0)
+
+    def typo(name):
+        if rng.random() < 0.5:
+            return name
+        i = rng.randrange(len(name))
+        return name[:i] + rng.choice('AEIOU') + name[i + 1:]
+
+    def collection_date():
+        return date(2024, 1, 1) + timedelta(days=rng.randrange(300))
+
+    dobs = [date(1980, 1, 1) + timedelta(days=rng.randrange(40)) for _ in range(400)]
+    ref = [(i, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), dobs[i], collection_date()) for i in range(400)]
+    src = [
+        (i, typo(first), typo(last), dob, spec_date + timedelta(days=rng.randrange(5)))
+        for i, first, last, dob, spec_date in ref[:150]
+    ] + [
+        (i, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES), rng.choice(dobs), collection_date())
+        for i in range(150, 300)
+    ]
+    columns = ['first_name', 'last_name', 'dob', 'collection_date']
+    return (
+        pl.DataFrame(src, schema=['submission_number'] + columns, orient='row'),
+        pl.DataFrame(ref, schema=['case_id'] + columns, orient='row')
+    )
+
+
+def matcher(src, ref, **kwargs):
+    return DataFrameMatcher(
+        df_src=src,
+        df_ref=ref,
+        first_name='first_name',
+        last_name='last_name',
+        dob='dob',
+        spec_col_date='collection_date',
+        key='submission_number',
+        scoring='probabilistic',
+        threshold=90,
+        **kwargs
+    )
+
+
+@pytest.mark.parametrize('lazy', ['lazy', 'eager'])
+def test_probabilistic_match(data, lazy):
+    """Test that EM separates matches from non-matches"""
+    src, ref = data
+    if lazy == 'lazy':
+        src, ref = src.lazy(), ref.lazy()
+
+    instance = matcher(src, ref)
+    output = instance.match(verbose=False)
+    fuzzy_matched = output.fuzzy_matched.lazy().collect()
+
+    # every fuzzy match is a true match
+    assert fuzzy_matched.height > 50
+    assert (fuzzy_matched['submission_number'] == fuzzy_matched['case_id']).all()
+
+    # name agreement is much more likely among matches than non-matches
+    model = instance.model
+    assert model.is_fitted
+    assert model.m['first_name_level'][-1] > model.u['first_name_level'][-1]
+    assert model.m['last_name_level'][0] < model.u['last_name_level'][0]
+
+
+def test_rare_surname_weight(data):
+    """Test that an exact match on a rare surname counts for more than on a common one"""
+    src, ref = data
+    instance = matcher(src, ref)
+    instance.match(verbose=False)
+
+    # identical comparisons apart from how common the reference surname is
+    surnames = ['SMITH'] * 8 + ['VANDERBILT']
+    pairs = pl.DataFrame({
+        'first_name_clean_right': ['MARY'] * 9,
+        'last_name_clean_right': surnames,
+        'first_name_result': [100] * 9,
+        'last_name_result': [100] * 9,
+        'reverse_first_name_result': [0] * 9,
+        'reverse_last_name_result': [0] * 9,
+        'match_ratio': [100.0] * 9,
+        'reverse_match_ratio': [0.0] * 9,
+        'submitted_collection_date': [date(2024, 1, 1)] * 9,
+        'reference_collection_date': [date(2024, 1, 3)] * 9,
+    })
+    model = instance.model
+    scored = model.score(model.comparison_vectors(pairs))
+    weights = dict(zip(scored['last_name_clean_right'], scored['match_weight']))
+
+    assert weights['SMITH'] < weights['VANDERBILT']
+
+
+def test_no_candidates_never_match():
+    """Test that records without any candidate are not matched"""
+    src = pl.DataFrame({
+        'submission_number': [1, 2],
+        'first_name': ['MARY', 'JOHN'],
+        'last_name': ['SMITH', 'BROWN'],
+        'dob': [date(1980, 1, 1), date(1990, 1, 1)],
+        'collection_date': [date(2024, 1, 1), date(2024, 1, 1)],
+    })
+    # only the first submission has a candidate (with a misspelled first name)
+    ref = src.head(1).rename({'submission_number': 'case_id'}).with_columns(pl.col('first_name').str.replace('Y', 'IE'))
+    output = matcher(src, ref, model=FellegiSunterModel(term_frequency=False)).match(verbose=False)
+    unmatched = output.fuzzy_unmatched.filter(pl.col('submission_number') == 2)
+    assert unmatched.height == 1
+    assert unmatched['match_probability'].to_list() == [None]
+
+
+def test_save_and_load(data, tmp_path, monkeypatch):
+    """Test that a saved model scores the same without re-estimating"""
+    src, ref = data
+    instance = matcher(src, ref)
+    output = instance.match(verbose=False)
+    instance.model.save(tmp_path / 'model.json')
+
+    # loading a fitted model must skip EM
+    def fail_fit(self, pairs):
+        raise AssertionError("A fitted model should not be re-estimated")
+    monkeypatch.setattr(FellegiSunterModel, 'fit', fail_fit)
+
+    reloaded = matcher(src, ref, model=tmp_path / 'model.json').match(verbose=False)
+    assert_frame_equal(output.fuzzy_matched, reloaded.fuzzy_matched, check_row_order=False)
+    assert FellegiSunterModel.load(tmp_path / 'model.json').to_dict() == instance.model.to_dict()
+
+
+def test_unfitted_model_cannot_score():
+    """Test that scoring requires a fitted model"""
+    with pytest.raises(ValueError):
+        FellegiSunterModel().score(pl.DataFrame())
+
+
+def test_unknown_scoring():
+    """Test that only known scoring modes are accepted"""
+    df = pl.DataFrame({'name': ['A'], 'dob': [date(2000, 1, 1)]})
+    with pytest.raises(ValueError):
+        DataFrameMatcher(df, df, 'name', 'name', 'dob', 'dob', scoring='bayesian')
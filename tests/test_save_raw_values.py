@@ -1,3 +1,4 @@
+import sys
 import pytest
 import polars as pl
 from datetime import date
@@ -21,3 +22,51 @@ def test_save_raw_values():
     # Check that the output DataFrame has the expected columns
     expected_columns = ["submission_number", "internal_create_date", "raw_inbound_submission"]
     assert result_df.columns == expected_columns, f"Expected columns {expected_columns}, but got {result_df.columns}"
+
+
+@pytest.mark.parametrize('lazy', ['lazy', 'eager'])
+def test_save_raw_values_compact(lazy):
+    data = pl.DataFrame({
+        "lab_name": ["PHL", "MFT", "PHL", "PHL"],
+        "first_name": ["Alice", "Bob", "Alice", "Alice"],
+        "WA_ID": [1, 2, 1, 1]
+    })
+    if lazy == 'lazy':
+        data = data.lazy()
+
+    submissions, payloads = helpers.save_raw_values(df_inp=data, primary_key_col="WA_ID", compact=True)
+    if lazy == 'lazy':
+        assert isinstance(submissions, pl.LazyFrame) and isinstance(payloads, pl.LazyFrame)
+        submissions, payloads = submissions.collect(), payloads.collect()
+
+    assert submissions.columns == ["submission_number", "internal_create_date", "raw_hash"]
+    assert payloads.columns == ["raw_hash", "raw_inbound_submission"]
+
+    # resubmitted rows share a hash, and each distinct row is stored once
+    assert submissions["raw_hash"].n_unique() == 2
+    assert payloads.height == 2
+    assert set(submissions["raw_hash"]) == set(payloads["raw_hash"])
+    assert payloads["raw_inbound_submission"].struct.field("first_name").to_list() == ["Alice", "Bob"]
+
+
+def test_raw_hash_stable():
+    """The hash depends only on the values, not on the process or run"""
+    df = pl.DataFrame({"lab_name": ["PHL"], "WA_ID": [1]})
+    hashes = df.select(helpers.raw_hash(pl.struct(pl.all()))).to_series().to_list()
+    # md5 of '{"lab_name":"PHL","WA_ID":1}'
+    assert hashes == ["77aa5ca8ac875d7c7cb9ca5d32524dce"]
+
+
+def test_raw_hash_without_duckdb(monkeypatch):
+    """Hashing in Python when duckdb is not installed gives the same digests"""
+    df = pl.DataFrame({"lab_name": ["PHL", "MFT", None], "WA_ID": [1, 2, 3]})
+    expected = df.select(helpers.raw_hash(pl.struct(pl.all()))).to_series()
+    monkeypatch.setitem(sys.modules, "duckdb", None)
+    assert df.select(helpers.raw_hash(pl.struct(pl.all()))).to_series().to_list() == expected.to_list()
+
+
+def test_save_raw_values_known_payloads():
+    data = pl.DataFrame({"lab_name": ["PHL", "MFT"], "WA_ID": [1, 2]})
+    _, archived = helpers.save_raw_values(df_inp=data.head(1), primary_key_col="WA_ID", compact=True)
+    _, payloads = helpers.save_raw_values(df_inp=data, primary_key_col="WA_ID", compact=True, known_payloads=archived)
+    assert payloads["raw_inbound_submission"].struct.field("lab_name").to_list() == ["MFT"]
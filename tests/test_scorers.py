@@ -0,0 +1,98 @@
+import polars as pl
+import pytest
+from datetime import date
+from wadoh_raccoon import scorers
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+
+
+@pytest.fixture
+def names():
+    """Pairs of names to score"""
+    return (
+        pl.Series('left', ['SMITH', 'DAVID', None, 'JONES SMITH', 'MARTHA', '']),
+        pl.Series('right', ['SMITH', 'DAVIS', 'SMITH', 'SMITH JONES', 'MARHTA', ''])
+    )
+
+
+def test_builtin_scorers_registered():
+    """Test that the built-in scorers can be selected by name"""
+    for name in ['ratio', 'jaro_winkler', 'token_sort_ratio', 'damerau_levenshtein']:
+        assert name in scorers.list_scorers()
+
+
+@pytest.mark.parametrize(
+    ('scorer', 'expected'),
+    [
+        ('ratio', [100, 80, 0, 45, 83, 100]),
+        ('jaro_winkler', [100, 92, 0, 52, 96, 100]),
+        ('token_sort_ratio', [100, 80, 0, 100, 83, 100]),
+        ('damerau_levenshtein', [100, 80, 0, 9, 83, 100]),
+    ]
+)
+def test_builtin_scores(names, scorer, expected):
+    """Test scores of the built-in scorers, including null names"""
+    result = scorers.apply_scorer(scorer, *names)
+    assert result.dtype == pl.Int64
+    assert result.to_list() == expected
+
+
+def test_round_half_to_even():
+    """Test that float scores are rounded the same way as python's round()"""
+    result = scorers.apply_scorer(
+        lambda left, right: pl.Series([0.5, 1.5, 2.5, 72.5]),
+        pl.Series(['a'] * 4),
+        pl.Series(['a'] * 4)
+    )
+    assert result.to_list() == [0, 2, 2, 72]
+
+
+def test_unknown_scorer():
+    """Test that unknown scorer names raise an error"""
+    with pytest.raises(ValueError):
+        scorers.get_scorer('not_a_scorer')
+
+
+def test_register_scorer():
+    """Test registering a custom batch scorer and selecting it per comparison"""
+
+    @scorers.register_scorer('first_letter_test', overwrite=True)
+    def first_letter(left, right):
+        return (left.str.slice(0, 1) == right.str.slice(0, 1)).fill_null(False).cast(pl.Int64) * 100
+
+    with pytest.raises(ValueError):
+        scorers.register_scorer('first_letter_test', first_letter)
+
+    src = pl.DataFrame({
+        'first_name': ['DAVIS'],
+        'last_name': ['SMITH-JONES'],
+        'dob': [date(1989, 7, 15)],
+        'collection_date': [date(2024, 11, 29)],
+    })
+    ref = pl.DataFrame({
+        'first_name': ['DANIEL'],
+        'last_name': ['JONES SMITH'],
+        'dob': [date(1989, 7, 15)],
+        'collection_date': [date(2024, 11, 30)],
+    })
+
+    matcher = DataFrameMatcher(
+        df_src=src,
+        df_ref=ref,
+        first_name='first_name',
+        last_name='last_name',
+        dob='dob',
+        spec_col_date='collection_date',
+        scorer={'first_name': 'first_letter_test', 'last_name': 'token_sort_ratio'}
+    )
+    output = matcher.match(verbose=False)
+
+    # first letters match and the hyphenated surname matches in either order
+    assert output.fuzzy_matched['first_name_result'].to_list() == [100]
+    assert output.fuzzy_matched['last_name_result'].to_list() == [100]
+
+
+def test_unknown_comparison():
+    """Test that scorers can only be chosen for known comparisons"""
+    df = pl.DataFrame({'name': ['A'], 'dob': [date(2000, 1, 1)]})
+    with pytest.raises(ValueError):
+        DataFrameMatcher(df, df, 'name', 'name', 'dob', 'dob', scorer={'middle_name': 'ratio'})
@@ -0,0 +1,121 @@
+import json
+import threading
+import urllib.request
+import polars as pl
+import pytest
+from datetime import date
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher
+from wadoh_raccoon.server import MatchService, make_server
+from tests._helpers import assert_results_equal
+
+OPTIONS = dict(
+    first_name=('first_name', 'first_name_reference'),
+    last_name=('last_name', 'last_name_reference'),
+    dob='birth_date',
+    spec_col_date=('sub_collection_date', 'ref_collection_date'),
+    key='submission_number'
+)
+
+
+@pytest.fixture
+def data():
+    src = pl.DataFrame({
+        'submission_number': [1, 2, 3, 4],
+        'first_name': ['DAVIS', 'GRANT', 'MARY', None],
+        'last_name': ['SMITHDAVIS', 'MITHCELL', 'JONES', 'SMITH'],
+        'sub_collection_date': [date(2024, 11, 29)] * 4,
+        'birth_date': [date(1989, 7, 15), date(1990, 6, 21), date(1980, 1, 1), date(1990, 1, 1)],
+    })
+    ref = pl.DataFrame({
+        'CASE_ID': [100, 101, 102],
+        'first_name_reference': ['DAVID', 'TRASH', 'MARY'],
+        'last_name_reference': ['SMITDAVIS', 'PANDA', 'JONES'],
+        'ref_collection_date': [date(2024, 11, 29), date(2024, 8, 31), date(2024, 11, 29)],
+        'birth_date': [date(1989, 7, 15), date(1990, 6, 21), date(1980, 1, 1)],
+    })
+    return src, ref
+
+
+@pytest.fixture
+def server(data):
+    service = MatchService(data[1], **OPTIONS)
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(), headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+@pytest.mark.parametrize('lazy', ['lazy', 'eager'])
+def test_prepared_matcher(data, lazy):
+    """Test that a prepared matcher gives the same results for a new source"""
+    src, ref = data
+    if lazy == 'lazy':
+        src, ref = src.lazy(), ref.lazy()
+    expected = DataFrameMatcher(df_src=src, df_ref=ref, **OPTIONS).match(verbose=False)
+
+    prepared = DataFrameMatcher(df_src=src.head(0), df_ref=ref, **OPTIONS).prepare()
+    output = prepared.with_source(src).match(verbose=False)
+    assert_results_equal(output, expected)
+
+
+def test_service_match(data):
+    """Test that the service matches single records and micro-batches"""
+    src, ref = data
+    service = MatchService(ref, **OPTIONS)
+    records = src.to_dicts()
+
+    batch = service.match(records)
+    assert [len(batch[name]) for name in ['exact_matched', 'fuzzy_matched', 'fuzzy_unmatched', 'no_demo']] == [1, 1, 1, 1]
+    assert batch['exact_matched'][0]['CASE_ID'] == 102
+
+    single = service.match(records[0])
+    assert single['fuzzy_matched'][0]['CASE_ID'] == 100
+
+
+def test_service_missing_columns(data):
+    """Test that records without some demographics are sent to no_demo"""
+    service = MatchService(data[1], **OPTIONS)
+    result = service.match({'submission_number': 9, 'first_name': 'MARY', 'last_name': 'JONES'})
+    assert len(result['no_demo']) == 1
+
+
+def test_http_match_and_reload(data, server, tmp_path):
+    """Test the HTTP endpoints, including swapping in a new reference snapshot"""
+    src, ref = data
+    record = src.row(2, named=True)
+    record['sub_collection_date'] = str(record['sub_collection_date'])
+    record['birth_date'] = str(record['birth_date'])
+
+    assert post(f'{server}/match', record)['exact_matched'][0]['CASE_ID'] == 102
+
+    ref.filter(pl.col('CASE_ID') != 102).write_parquet(tmp_path / 'ref.parquet')
+    assert post(f'{server}/reload', {'path': str(tmp_path / 'ref.parquet')})['reference_rows'] == 2
+    assert post(f'{server}/match', record)['exact_matched'] == []
+
+    with urllib.request.urlopen(f'{server}/health') as response:
+        assert json.loads(response.read())['reference_rows'] == 2
+
+
+def test_http_bad_request(server):
+    """Test that malformed requests get a 400"""
+    with pytest.raises(urllib.error.HTTPError) as error:
+        post(f'{server}/match', 'not a record')
+    assert error.value.code == 400
+
+
+@pytest.mark.parametrize('path', ['missing.parquet', 'ref.txt'])
+def test_http_bad_reload(server, tmp_path, path):
+    """Test that a missing or unsupported snapshot gets a 400 and keeps the current reference"""
+    with pytest.raises(urllib.error.HTTPError) as error:
+        post(f'{server}/reload', {'path': str(tmp_path / path)})
+    assert error.value.code == 400
+    with urllib.request.urlopen(f'{server}/health') as response:
+        assert json.loads(response.read())['reference_rows'] == 3
@@ -0,0 +1,106 @@
+import polars as pl
+import pytest
+from datetime import date
+from polars.testing import assert_frame_equal
+from wadoh_raccoon.dataframe_matcher import DataFrameMatcher, DataFrameMatcherResults, RESULT_SETS
+
+
+@pytest.fixture
+def data():
+    src = pl.DataFrame({
+        'id': [1, 2, 3, 4, 5],
+        'first_name': ['MARY', 'JOHN', 'ANNE', None, 'LINDA'],
+        'last_name': ['JONES', 'BROWN', 'SMITH', 'SMITH', 'GARCIA'],
+        'dob': [date(1980, 1, 1), date(1990, 1, 1), date(1970, 5, 5), date(1990, 1, 1), date(1960, 2, 2)],
+        'collection_date': [date(2024, 3, 1), date(2024, 4, 15), date(2024, 3, 20), None, date(2024, 4, 2)],
+    })
+    ref = pl.DataFrame({
+        'case_id': [10, 11, 12],
+        'first_name': ['MARY', 'JON', 'ANN'],
+        'last_name': ['JONES', 'BROWN', 'SMITH'],
+        'dob': [date(1980, 1, 1), date(1990, 1, 1), date(1970, 5, 5)],
+        'collection_date': [date(2024, 3, 1), date(2024, 4, 12), date(2024, 3, 21)],
+    })
+    return src, ref
+
+
+def match(src, ref, lazy):
+    if lazy == 'lazy':
+        src, ref = src.lazy(), ref.lazy()
+    return DataFrameMatcher(
+        src, ref, 'first_name', 'last_name', 'dob', 'collection_date', key='id', threshold=70
+    ).match(verbose=False)
+
+
+@pytest.mark.parametrize('lazy', ['lazy', 'eager'])
+def test_sink_and_load(data, lazy, tmp_path):
+    """Test that sinking and loading the results gives them back, partitioned by month"""
+    src, ref = data
+    output = match(src, ref, lazy)
+    counts = output.sink(tmp_path)
+    assert counts == {'exact_matched': 1, 'fuzzy_matched': 2, 'fuzzy_unmatched': 1, 'no_demo': 1}
+    assert sorted(p.name for p in (tmp_path / 'match_category=fuzzy_matched').iterdir()) == [
+        'collection_month=2024-03', 'collection_month=2024-04'
+    ]
+    assert not list(tmp_path.glob('.sink-*'))
+
+    loaded = DataFrameMatcherResults.load(tmp_path)
+    for name in RESULT_SETS:
+        assert isinstance(getattr(loaded, name), pl.LazyFrame)
+        assert_frame_equal(
+            getattr(loaded, name).collect().drop('match_category', 'collection_month'),
+            getattr(output, name).lazy().collect(),
+            check_row_order=False, check_column_order=False
+        )
+    march = loaded.fuzzy_matched.filter(pl.col('collection_month') == '2024-03').collect()
+    assert march['case_id'].to_list() == [12]
+    assert loaded.no_demo.collect()['collection_month'].to_list() == [None]
+
+
+def test_sink_appends_runs(data, tmp_path):
+    """Test that runs add to the dataset and all-null columns keep the type of the first run"""
+    src, ref = data
+    match(src, ref, 'lazy').sink(tmp_path)
+
+    # No fuzzy candidates, so the reference columns of fuzzy_unmatched are all null
+    unmatched_only = src.filter(pl.col('id') == 5)
+    match(unmatched_only, ref, 'lazy').sink(tmp_path)
+
+    loaded = DataFrameMatcherResults.load(tmp_path)
+    assert loaded.fuzzy_unmatched.collect()['id'].sort().to_list() == [5, 5]
+    assert loaded.exact_matched.select(pl.len()).collect().item() == 1
+
+    match(unmatched_only, ref, 'lazy').sink(tmp_path, overwrite=True)
+    assert DataFrameMatcherResults.load(tmp_path).fuzzy_unmatched.select(pl.len()).collect().item() == 1
+
+
+def test_sink_widens_null_columns(tmp_path):
+    """Test that columns all null in the previous runs take the type of a later run"""
+    def results(note):
+        df = pl.DataFrame({'id': [1], 'submitted_collection_date': [date(2024, 3, 1)], 'note': note})
+        return DataFrameMatcherResults(**{name: df for name in RESULT_SETS})
+
+    results(pl.Series([None])).sink(tmp_path)
+    assert DataFrameMatcherResults.load(tmp_path).exact_matched.collect_schema()['note'] == pl.String
+
+    results(pl.Series([1.5])).sink(tmp_path)
+    exact_matched = DataFrameMatcherResults.load(tmp_path).exact_matched.collect()
+    assert exact_matched.schema['note'] == pl.Float64
+    assert exact_matched['note'].sort(nulls_last=True).to_list() == [1.5, None]
+
+    with pytest.raises(ValueError, match='different types'):
+        results(pl.Series(['a'])).sink(tmp_path)
+
+
+def test_sink_schema_mismatch(data, tmp_path):
+    """Test that a run with different columns is refused"""
+    src, ref = data
+    match(src, ref, 'eager').sink(tmp_path)
+    with pytest.raises(ValueError):
+        match(src.with_columns(county=pl.lit('KING')), ref, 'eager').sink(tmp_path)
+
+
+def test_load_empty(tmp_path):
+    """Test loading a directory without results"""
+    loaded = DataFrameMatcherResults.load(tmp_path)
+    assert loaded.exact_matched.collect().height == 0
@@ -0,0 +1,49 @@
+import json
+import subprocess
+import sys
+import pytest
+from wadoh_raccoon.utils import helpers
+
+# Seconds that importing the matcher may add on top of polars itself
+IMPORT_BUDGET = 0.5
+OPTIONAL = ['paramiko', 'great_tables', 'azure', 'aiohttp']
+# Modules that only the methods using them import
+LAZY = ['numpy', 'socket', 'pickle', 'rapidfuzz', 'wadoh_raccoon.duckdb_backend', 'wadoh_raccoon.scorers',
+        'wadoh_raccoon.probabilistic']
+
+
+def test_import_matcher_is_fast():
+    """Test that importing the matcher stays within budget and skips the optional dependencies"""
+    code = (
+        "import json, sys, time\n"
+        "import polars\n"
+        "start = time.perf_counter()\n"
+        "import wadoh_raccoon.dataframe_matcher\n"
+        "seconds = time.perf_counter() - start\n"
+        f"print(json.dumps({{'seconds': seconds, 'loaded': [m for m in {OPTIONAL!r} if m in sys.modules]}}))\n"
+    )
+    # the best of a few runs, so a busy machine does not fail the test
+    runs = [json.loads(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout)
+            for _ in range(3)]
+    assert all(run['loaded'] == [] for run in runs)
+    assert min(run['seconds'] for run in runs) < IMPORT_BUDGET
+
+
+def test_import_matcher_is_lazy():
+    """Test that importing the matcher leaves the scorers, the model, the duckdb backend and their imports
+    to the methods that use them (polars itself may import some of them, e.g. socket)"""
+    code = (
+        "import json, sys\n"
+        "import polars\n"
+        "before = set(sys.modules)\n"
+        "import wadoh_raccoon.dataframe_matcher\n"
+        f"print(json.dumps([m for m in {LAZY!r} if m in sys.modules and m not in before]))\n"
+    )
+    loaded = json.loads(subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout)
+    assert loaded == []
+
+
+def test_import_optional_missing():
+    """Test that a missing optional dependency names the extra to install"""
+    with pytest.raises(ImportError, match=r"wadoh-raccoon\[mft\]"):
+        helpers.import_optional('not_a_real_module', 'mft')